@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+
+"""
+This script measures the wall-clock time of an invocation of the bot
+with the sequential Nagato.run and with nagato_async.run
+against a local stub server which delays every response.
+
+    python3 benchmarks/bench_async_microblog.py --delay 0.2 --repeat 5
+"""
+
+import argparse
+import asyncio
+import datetime
+import http.server
+import os
+import statistics
+import sys
+import threading
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import nagato  # noqa: E402
+import nagato_async  # noqa: E402
+from microblog import microblog_status  # noqa: E402
+from microblog import microblog_user  # noqa: E402
+from tests.stub_book_search import StubBookSearch  # noqa: E402
+from tests.stub_keyword_extraction import StubKeywordExtraction  # noqa: E402
+from tests.stub_microblog_api import StubMicroblogApi  # noqa: E402
+
+
+def create_server(delay):
+    class DelayingHandler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay)
+            body = b'{}'
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), DelayingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class HttpStubMicroblogApi(StubMicroblogApi):
+    """
+    A stub microblog API which sends a request to the stub server before every retrieval.
+    """
+
+    def __init__(self, url):
+        super().__init__()
+        self.url = url
+
+    def request(self, path):
+        with urllib.request.urlopen(self.url + path) as response:
+            response.read()
+
+    def get_home_statuses(self, since_id=None):
+        self.request('/home_statuses')
+        return super().get_home_statuses(since_id)
+
+    def get_user_statuses(self, user_id, max_id=None, since_id=None):
+        self.request('/user_statuses')
+        return super().get_user_statuses(user_id, max_id, since_id)
+
+    def get_replies(self, since_id=None):
+        self.request('/replies')
+        return super().get_replies(since_id)
+
+    def get_received_messages(self, since_id):
+        self.request('/received_messages')
+        return super().get_received_messages(since_id)
+
+    def get_sent_messages(self):
+        self.request('/sent_messages')
+        return super().get_sent_messages()
+
+
+def create_nagato(url):
+    microblog = HttpStubMicroblogApi(url)
+    me = microblog.me
+    user = microblog_user.MicroblogUser(1, 'kyon')
+    status = microblog_status.MicroblogStatus
+    now = datetime.datetime.now(datetime.timezone.utc)
+    microblog.user_statuses[me.id] = [status(20, '@kyon ...', me, now, 10, 1)]
+    microblog.home_statuses = [status(30, 'Nagato is cute.', user, now, None, None)]
+    return nagato.Nagato(microblog, StubBookSearch(), StubKeywordExtraction())
+
+
+def measure(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compares Nagato.run with nagato_async.run.')
+    parser.add_argument('--delay', type=float, default=0.2, help='Seconds to delay every response.')
+    parser.add_argument('--repeat', type=int, default=5, help='The number of invocations to measure.')
+    args = parser.parse_args()
+
+    server = create_server(args.delay)
+    url = 'http://127.0.0.1:%d' % server.server_address[1]
+    try:
+        sequential = measure(lambda: create_nagato(url).run(), args.repeat)
+        concurrent = measure(lambda: asyncio.run(nagato_async.run(create_nagato(url))), args.repeat)
+    finally:
+        server.shutdown()
+
+    print('run:      %.3f s' % sequential)
+    print('nagato_async.run: %.3f s' % concurrent)
+    print('speedup:  %.2fx' % (sequential / concurrent))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+
+"""
+This script measures the cold start of handler.py for each operation
+as the import time reported by python -X importtime and the wall-clock time
+of a fresh interpreter which imports handler.py and creates a Nagato instance
+for a Mastodon deployment served by a local stub server.
+
+    python3 benchmarks/bench_handler_startup.py --repeat 5
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPOSITORY_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, REPOSITORY_DIRECTORY)
+
+from tests.stub_mastodon_server import StubMastodonServer  # noqa: E402
+
+# Whether each operation responds to users, which needs the book search and the keyword extraction.
+OPERATIONS = {
+    'post': False,
+    'refollow': False,
+    'reply': True,
+    'run': True,
+}
+
+IMPORT_TIME_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$')
+
+
+def run_handler(repo, operation, env):
+    """
+    Returns the total import time in microseconds, the wall-clock time in seconds
+    and the set of imported top-level modules.
+    """
+
+    code = 'import handler; handler.create_nagato(%r)' % OPERATIONS[operation]
+    start = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=repo, env=env, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+    seconds = time.perf_counter() - start
+
+    total = 0
+    modules = set()
+    for line in process.stderr.splitlines():
+        match = IMPORT_TIME_RE.match(line)
+        if match:
+            modules.add(match.group(4).split('.')[0])
+            # Only top-level imports are summed since their cumulative times include nested ones.
+            if not match.group(3):
+                total += int(match.group(2))
+    return (total, seconds, modules)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measures the cold start of handler.py per operation.')
+    parser.add_argument('--repeat', type=int, default=5, help='The number of interpreters per operation.')
+    args = parser.parse_args()
+
+    server = StubMastodonServer()
+    server.start()
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            env = dict(
+                os.environ,
+                MASTODON_ACCESS_TOKEN='token',
+                MASTODON_API_BASE_URL=server.url,
+                YAHOO_APPLICATION_ID='appid',
+                NAGATO_STATE_FILE=os.path.join(directory, 'state.json'))
+            for operation in OPERATIONS:
+                results = [run_handler(REPOSITORY_DIRECTORY, operation, env) for _ in range(args.repeat)]
+                modules = results[-1][2]
+                print('%-8s import %7.1f ms  wall %7.1f ms  twitter=%s yahoo_api=%s' % (
+                    operation,
+                    statistics.median(result[0] for result in results) / 1000,
+                    statistics.median(result[1] for result in results) * 1000,
+                    'twitter' in modules,
+                    'yahoo_api' in modules))
+    finally:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+"""
+This script measures the per-message cost of classifying the intent of mentions
+with the intent router and with the sequential regular expression checks.
+
+    python3 benchmarks/bench_intent_router.py mentions.txt
+
+The corpus is a text file with a mention per line.
+A few sample mentions are used if no corpus is specified.
+"""
+
+import argparse
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import nagato  # noqa: E402
+
+SAMPLE_MENTIONS = [
+    '@nagato お勧めの本は？',
+    '@nagato おはよう',
+    '@nagato こんばんは、今日も寒いね',
+    '@nagato 流速は？',
+    '@nagato 長門は俺の嫁',
+    '@nagato 面白い本を教えて',
+    '@nagato 明日の天気はどうかな。雨が降らないといいんだけど。',
+]
+
+
+def classify_sequentially(text):
+    # The sequential checks with string patterns looked up in the regular expression cache.
+    if re.search(nagato.BOOK_RECOMMENDATION_PATTERN, text):
+        return 'book_recommendation'
+    elif re.search(nagato.GREETING_PATTERN, text):
+        return 'greeting'
+    elif re.search(nagato.TIMELINE_SPEED_PATTERN, text):
+        return 'timeline_speed'
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('corpus', nargs='?', help='a text file with a mention per line')
+    parser.add_argument('-n', '--number', type=int, default=100, help='the number of passes over the corpus')
+    args = parser.parse_args()
+
+    if args.corpus:
+        with open(args.corpus, mode='r', encoding='utf-8') as corpus:
+            mentions = [line.strip() for line in corpus if line.strip()]
+    else:
+        mentions = SAMPLE_MENTIONS
+
+    intent_router = nagato.create_intent_router()
+    for mention in mentions:
+        assert intent_router.classify(mention) == classify_sequentially(mention), mention
+
+    for (name, classify) in [('sequential', classify_sequentially), ('router', intent_router.classify)]:
+        seconds = min(timeit.repeat(
+            lambda: [classify(mention) for mention in mentions], number=args.number, repeat=5))
+        print('%-10s %.3f us/message' % (name, seconds / args.number / len(mentions) * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+
+"""
+This script compares the in-process TF-IDF keyword extractor with Yahoo! API
+in latency and overlap of top key phrases on recorded fixtures.
+
+Record Yahoo! API results for sentences (one per line) first:
+
+    YAHOO_APPLICATION_ID=... python3 benchmarks/bench_keyword_extraction.py record sentences.txt fixtures.jsonl
+
+Then run the benchmark on the recorded fixtures:
+
+    python3 benchmarks/bench_keyword_extraction.py run fixtures.jsonl --samples home_timeline.txt
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from keyword_extraction.tfidf_keyword_extraction import TfidfKeywordExtraction  # noqa: E402
+from keyword_extraction.yahoo_keyword_extraction import YahooKeywordExtraction  # noqa: E402
+from yahoo_api import YahooApi  # noqa: E402
+
+
+def read_lines(path):
+    with open(path, mode='r', encoding='utf-8') as lines:
+        return [line.strip() for line in lines if line.strip()]
+
+
+def record(args):
+    extraction = YahooKeywordExtraction(YahooApi(os.environ['YAHOO_APPLICATION_ID']))
+    with open(args.fixtures, mode='w', encoding='utf-8') as fixtures:
+        for sentence in read_lines(args.sentences):
+            start = time.perf_counter()
+            key_phrases = extraction.extract(sentence)
+            seconds = time.perf_counter() - start
+            fixtures.write(json.dumps(
+                {'sentence': sentence, 'yahoo': key_phrases, 'yahoo_seconds': seconds},
+                ensure_ascii=False) + '\n')
+
+
+def run(args):
+    with open(args.fixtures, mode='r', encoding='utf-8') as fixtures:
+        fixtures = [json.loads(line) for line in fixtures if line.strip()]
+
+    extraction = TfidfKeywordExtraction()
+    if args.samples:
+        extraction.learn(read_lines(args.samples))
+
+    seconds = []
+    overlaps = []
+    for fixture in fixtures:
+        start = time.perf_counter()
+        key_phrases = extraction.extract(fixture['sentence'])
+        seconds.append(time.perf_counter() - start)
+        expected = set(key_phrase.lower() for key_phrase in fixture['yahoo'][:args.k])
+        if expected:
+            overlaps.append(len(expected & set(key_phrases[:args.k])) / len(expected))
+
+    yahoo_seconds = [fixture['yahoo_seconds'] for fixture in fixtures if 'yahoo_seconds' in fixture]
+    print('Fixtures: %d' % len(fixtures))
+    print('TF-IDF latency: mean %.3f ms, max %.3f ms' % (
+        statistics.mean(seconds) * 1000, max(seconds) * 1000))
+    if yahoo_seconds:
+        print('Yahoo! latency: mean %.3f ms, max %.3f ms' % (
+            statistics.mean(yahoo_seconds) * 1000, max(yahoo_seconds) * 1000))
+    if overlaps:
+        print('Top-%d overlap with Yahoo!: mean %.1f%%' % (args.k, statistics.mean(overlaps) * 100))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    record_parser = subparsers.add_parser('record', help='record Yahoo! API results')
+    record_parser.add_argument('sentences', help='a text file with a sentence per line')
+    record_parser.add_argument('fixtures', help='a JSONL file to write fixtures')
+    record_parser.set_defaults(function=record)
+    run_parser = subparsers.add_parser('run', help='run the benchmark')
+    run_parser.add_argument('fixtures', help='a JSONL file with recorded fixtures')
+    run_parser.add_argument('--samples', help='a text file with sample sentences to learn beforehand')
+    run_parser.add_argument('-k', type=int, default=10, help='the number of top key phrases to compare')
+    run_parser.set_defaults(function=run)
+    args = parser.parse_args()
+    args.function(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+"""
+This script measures the construction time and the memory of Tweet pages
+with the slotted lazy model and with the previous dict-backed eager model.
+
+    python3 benchmarks/bench_status_model.py statuses.json
+
+The recorded page is a JSON array of tweet objects as returned by the home timeline API.
+A synthetic page of 200 tweets is used if no page is specified.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+
+import pytz
+import twitter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from microblog.twitter_status import Tweet  # noqa: E402
+
+
+class EagerUser(object):
+    def __init__(self, user_object):
+        self.id = user_object.id
+        self.screen_name = user_object.screen_name
+
+
+class EagerTweet(object):
+    # The previous model which decodes every field in the constructor.
+    def __init__(self, tweet_object):
+        self.id = tweet_object.id
+        self.text = tweet_object.text
+        self.user = EagerUser(tweet_object.user)
+        self.created_at = datetime.datetime.fromtimestamp(
+            tweet_object.created_at_in_seconds,
+            tz=pytz.timezone('Asia/Tokyo'))
+        self.in_reply_to_status_id = tweet_object.in_reply_to_status_id
+        self.in_reply_to_user_id = tweet_object.in_reply_to_user_id
+
+
+def create_page(count):
+    return [{
+        'id': 1000000 + i,
+        'text': '長門有希の%d冊目の本' % i,
+        'created_at': 'Fri Jan 01 10:%02d:00 +0000 2021' % (i % 60),
+        'user': {'id': i % 17, 'screen_name': 'user%d' % (i % 17)},
+        'in_reply_to_status_id': None,
+        'in_reply_to_user_id': None,
+    } for i in range(count)]
+
+
+def measure_memory(model, tweet_objects):
+    tracemalloc.start()
+    statuses = [model(tweet_object) for tweet_object in tweet_objects]
+    (size, _) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(statuses) == len(tweet_objects)
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compares the slotted lazy model with the eager model.')
+    parser.add_argument('page', nargs='?', help='A JSON file of recorded tweet objects.')
+    parser.add_argument('--count', type=int, default=200, help='The number of synthetic tweets.')
+    parser.add_argument('--number', type=int, default=200, help='The number of pages to construct.')
+    args = parser.parse_args()
+
+    if args.page:
+        with open(args.page, encoding='UTF-8') as f:
+            page = json.load(f)
+    else:
+        page = create_page(args.count)
+    tweet_objects = [twitter.Status.NewFromJsonDict(tweet) for tweet in page]
+
+    for (name, model) in [('eager', EagerTweet), ('lazy', Tweet)]:
+        seconds = timeit.timeit(lambda: [model(tweet_object) for tweet_object in tweet_objects], number=args.number)
+        print('%-5s %8.1f us/page %8d bytes/page' % (
+            name, seconds / args.number * 1e6, measure_memory(model, tweet_objects)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+
+"""
+This script measures the cost of preparing 200 statuses for key phrase extraction
+with the text normalization pipeline and with the previous split-and-urlparse code.
+
+    python3 benchmarks/bench_text_normalization.py --mastodon toots.json --twitter tweets.json
+
+Each fixture is a JSON array of status texts.
+Synthetic Mastodon and Twitter statuses are used if no fixture is specified.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import timeit
+import urllib.parse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from text_normalization import prepare_text  # noqa: E402
+
+MASTODON_TEMPLATE = (
+    '<p><span class="h-card"><a href="https://example.com/@kyon" class="u-url mention">@<span>kyon</span></a></span> '
+    '長門有希の%d冊目の本を読んだ。&quot;面白い&quot;と思う。 '
+    '<a href="https://example.com/tags/book" class="mention hashtag" rel="tag">#<span>book</span></a> '
+    '<a href="https://example.com/books/%d" rel="nofollow"><span class="invisible">https://</span>'
+    '<span class="">example.com/books/%d</span></a></p>')
+
+TWITTER_TEMPLATE = 'RT @kyon: 長門有希の%d冊目の本を読んだ。"面白い"と思う。 #book https://t.co/%d @haruhi'
+
+
+def is_url(text):
+    try:
+        return bool(urllib.parse.urlparse(text).scheme)
+    except Exception:
+        return False
+
+
+def prepare_text_previously(texts):
+    text = ' '.join(texts)
+    text = re.sub(r'<[^>]*>', '', text)
+    words = [word for word in re.split(r'\s', text)
+             if word and (word[0] != '@') and (not is_url(word))]
+    return ' '.join(words)
+
+
+def load_texts(path, template, count):
+    if path:
+        with open(path, encoding='UTF-8') as f:
+            return json.load(f)
+    # Every tenth status is repeated as bots and retweets often do.
+    return [template % (((i - 9 if i % 10 == 9 else i),) * template.count('%d')) for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compares the text normalization pipeline with the previous code.')
+    parser.add_argument('--mastodon', help='A JSON file of recorded Mastodon status contents.')
+    parser.add_argument('--twitter', help='A JSON file of recorded tweet texts.')
+    parser.add_argument('--count', type=int, default=200, help='The number of synthetic statuses.')
+    parser.add_argument('--number', type=int, default=200, help='The number of preparations to measure.')
+    args = parser.parse_args()
+
+    fixtures = [
+        ('mastodon', load_texts(args.mastodon, MASTODON_TEMPLATE, args.count)),
+        ('twitter', load_texts(args.twitter, TWITTER_TEMPLATE, args.count)),
+    ]
+    for (name, texts) in fixtures:
+        for (method, prepare) in [('previous', prepare_text_previously), ('pipeline', prepare_text)]:
+            seconds = timeit.timeit(lambda: prepare(texts), number=args.number)
+            output = prepare(texts)
+            print('%-8s %-8s %8.1f us/timeline %7d bytes' % (
+                name, method, seconds / args.number * 1e6, len(output.encode('UTF-8'))))
+
+
+if __name__ == '__main__':
+    main()
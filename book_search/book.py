@@ -1,4 +1,6 @@
 class Book():
-    def __init__(self, name, url):
+    def __init__(self, name, url, description=''):
         self.name = name
         self.url = url
+        # The description is used to rank books found by a search by key phrases.
+        self.description = description
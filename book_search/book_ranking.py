@@ -0,0 +1,33 @@
+"""
+Functions to rank books found by a search locally by key phrases.
+"""
+
+import unicodedata
+
+
+def normalize(text):
+    return unicodedata.normalize('NFKC', text).lower()
+
+
+def get_matched_key_phrase_count(book, key_phrases):
+    """
+    Gets the number of key phrases which the name or the description of the book contains.
+    """
+
+    text = normalize(book.name + '\n' + (book.description or ''))
+    return sum(1 for key_phrase in key_phrases if normalize(key_phrase) in text)
+
+
+def rank_books(books, key_phrases):
+    """
+    Sorts books in the descending order of matched key phrases
+    while keeping the order of search results for the same number of matches.
+    Books with the same URL are merged.
+    """
+
+    unique_books = {}
+    for book in books:
+        unique_books.setdefault(book.url, book)
+    return sorted(
+        unique_books.values(),
+        key=lambda book: -get_matched_key_phrase_count(book, key_phrases))
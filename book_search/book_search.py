@@ -6,3 +6,13 @@ class BookSearch(ABC):
     @abstractmethod
     def search(self, queries):
         pass
+
+    def search_many(self, queries, max_results=50):
+        """
+        Searches books matching all the queries
+        and returns a list of at most max_results books and the number of available results.
+        Backends which can return multiple hits in a single search should override this.
+        """
+
+        (book, result_count) = self.search(queries)
+        return ([book] if book else [], result_count)
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+
+"""
+A book search backend with a local inverted index built from a catalog file.
+
+Build an index from a CSV or JSONL catalog with name, url, description and popularity fields:
+
+    python3 -m book_search.local_book_search catalog.jsonl books.idx
+"""
+
+import array
+import bisect
+import csv
+import json
+import mmap
+import struct
+import sys
+import unicodedata
+from .book import Book
+from .book_search import BookSearch
+
+MAGIC = b'NGTBIDX1'
+# The magic and offsets of terms, term offsets, posting offsets, postings, books and book offsets
+# followed by the number of terms and the number of books.
+HEADER = struct.Struct('<8s6QQQ')
+
+
+def normalize(text):
+    return unicodedata.normalize('NFKC', text).lower()
+
+
+def get_terms(text):
+    """
+    Gets character unigrams and bigrams of the specified text,
+    so that any substring of a text can be looked up.
+    """
+
+    text = normalize(text)
+    terms = set()
+    for word in text.split():
+        terms.update(word)
+        terms.update(word[i:i + 2] for i in range(len(word) - 1))
+    return terms
+
+
+def get_query_terms(query):
+    """
+    Gets the smallest set of terms which all texts containing the query contain.
+    """
+
+    terms = set()
+    for word in normalize(query).split():
+        if len(word) == 1:
+            terms.add(word)
+        else:
+            terms.update(word[i:i + 2] for i in range(len(word) - 1))
+    return terms
+
+
+def read_catalog(path):
+    """
+    Reads books from the specified CSV or JSONL catalog file.
+    Books with the same URL are merged by summing their popularity.
+    """
+
+    books = {}
+    with open(path, mode='r', encoding='utf-8', newline='') as catalog:
+        if path.endswith('.csv'):
+            records = csv.DictReader(catalog)
+        else:
+            records = (json.loads(line) for line in catalog if line.strip())
+        for record in records:
+            url = record['url']
+            if url in books:
+                books[url]['popularity'] += float(record.get('popularity') or 0)
+            else:
+                books[url] = {
+                    'name': record['name'],
+                    'url': url,
+                    'description': record.get('description') or '',
+                    'popularity': float(record.get('popularity') or 0),
+                }
+    return books.values()
+
+
+def contains(postings, number):
+    index = bisect.bisect_left(postings, number)
+    return index < len(postings) and postings[index] == number
+
+
+def pad(data):
+    return data + b'\0' * (-len(data) % 8)
+
+
+def build_index(catalog_path, index_path):
+    """
+    Builds an index file from the specified catalog file.
+    Books are numbered in the descending order of popularity
+    so that postings sorted by book numbers are ranked by popularity.
+    """
+
+    books = sorted(read_catalog(catalog_path), key=lambda book: -book['popularity'])
+    postings = {}
+    book_data = bytearray()
+    book_offsets = array.array('Q', [0])
+    for (number, book) in enumerate(books):
+        for term in get_terms(book['name'] + ' ' + book['description']):
+            postings.setdefault(term.encode('utf-8'), array.array('I')).append(number)
+        book_data += json.dumps(
+            [book['name'], book['url'], book['description']], ensure_ascii=False).encode('utf-8')
+        book_offsets.append(len(book_data))
+
+    terms = sorted(postings)
+    term_data = bytearray()
+    term_offsets = array.array('Q', [0])
+    posting_data = array.array('I')
+    posting_offsets = array.array('Q', [0])
+    for term in terms:
+        term_data += term
+        term_offsets.append(len(term_data))
+        posting_data.extend(postings[term])
+        posting_offsets.append(len(posting_data))
+
+    sections = [pad(bytes(term_data)), term_offsets.tobytes(), posting_offsets.tobytes(),
+                pad(posting_data.tobytes()), pad(bytes(book_data)), book_offsets.tobytes()]
+    offsets = []
+    offset = HEADER.size
+    for section in sections:
+        offsets.append(offset)
+        offset += len(section)
+    with open(index_path, mode='wb') as index:
+        index.write(HEADER.pack(MAGIC, *offsets, len(terms), len(books)))
+        for section in sections:
+            index.write(section)
+
+
+class LocalBookSearch(BookSearch):
+    """
+    A book search backend with a memory-mapped inverted index.
+    Queries are combined with AND and matched as substrings of names and descriptions.
+    """
+
+    def __init__(self, index_path):
+        with open(index_path, mode='rb') as index:
+            self.mmap = mmap.mmap(index.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self.mmap)
+        (magic, terms, term_offsets, posting_offsets, postings, books, book_offsets, term_count, book_count) = \
+            HEADER.unpack_from(self.mmap)
+        assert magic == MAGIC, 'The index file is broken.'
+        self.term_count = term_count
+        self.terms = view[terms:term_offsets]
+        self.term_offsets = view[term_offsets:term_offsets + (term_count + 1) * 8].cast('Q')
+        self.posting_offsets = view[posting_offsets:posting_offsets + (term_count + 1) * 8].cast('Q')
+        self.postings = view[postings:books].cast('I')
+        self.books = view[books:book_offsets]
+        self.book_offsets = view[book_offsets:book_offsets + (book_count + 1) * 8].cast('Q')
+        view.release()
+
+    def close(self):
+        for view in (self.terms, self.term_offsets, self.posting_offsets, self.postings, self.books, self.book_offsets):
+            view.release()
+        self.mmap.close()
+
+    def get_term(self, index):
+        return bytes(self.terms[self.term_offsets[index]:self.term_offsets[index + 1]])
+
+    def get_postings(self, term):
+        """
+        Gets book numbers containing the specified term by a binary search of the sorted terms.
+        """
+
+        term = term.encode('utf-8')
+        (low, high) = (0, self.term_count)
+        while low < high:
+            middle = (low + high) // 2
+            if self.get_term(middle) < term:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.term_count and self.get_term(low) == term:
+            return self.postings[self.posting_offsets[low]:self.posting_offsets[low + 1]]
+        return None
+
+    def get_book(self, number):
+        return json.loads(bytes(self.books[self.book_offsets[number]:self.book_offsets[number + 1]]))
+
+    def find(self, queries):
+        """
+        Gets numbers of books matching all the specified queries in the order of popularity.
+        """
+
+        terms = set()
+        for query in queries:
+            terms.update(get_query_terms(query))
+        if not terms:
+            return []
+
+        postings = []
+        for term in terms:
+            term_postings = self.get_postings(term)
+            if term_postings is None:
+                return []
+            postings.append(term_postings)
+        # Intersect postings from the shortest one with binary searches in the longer ones.
+        postings.sort(key=len)
+        candidates = postings[0].tolist()
+        for term_postings in postings[1:]:
+            candidates = [number for number in candidates if contains(term_postings, number)]
+            if not candidates:
+                return []
+
+        # Bigrams may match texts which don't contain the whole query.
+        queries = [normalize(query).split() for query in queries]
+        numbers = []
+        for number in candidates:
+            (name, url, description) = self.get_book(number)
+            text = normalize(name + ' ' + description)
+            if all(word in text for query in queries for word in query):
+                numbers.append(number)
+        return numbers
+
+    def search(self, queries):
+        numbers = self.find(queries)
+        if numbers:
+            (name, url, description) = self.get_book(numbers[0])
+            return (Book(name, url, description), len(numbers))
+        return (None, 0)
+
+    def search_many(self, queries, max_results=50):
+        numbers = self.find(queries)
+        return ([Book(*self.get_book(number)) for number in numbers[:max_results]], len(numbers))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        print('Usage: python3 -m book_search.local_book_search CATALOG INDEX', file=sys.stderr)
+        sys.exit(1)
+    build_index(sys.argv[1], sys.argv[2])
@@ -0,0 +1,55 @@
+import json
+import threading
+from .book_search import BookSearch
+
+
+class TieredBookSearch(BookSearch):
+    """
+    A book search backend which looks up the primary backend first
+    and falls back to the secondary one when the primary one has nothing.
+    """
+
+    def __init__(self, primary, secondary, catalog_path=None):
+        """
+        Initializes a new instance which appends books found by the secondary backend
+        to the JSONL catalog file at catalog_path if specified
+        so that the primary index can be rebuilt with them.
+        """
+
+        self.primary = primary
+        self.secondary = secondary
+        self.catalog_path = catalog_path
+        self.lock = threading.Lock()
+
+    def search(self, queries):
+        (book, result_count) = self.primary.search(queries)
+        if result_count:
+            return (book, result_count)
+
+        (book, result_count) = self.secondary.search(queries)
+        if book:
+            self.learn([book])
+        return (book, result_count)
+
+    def search_many(self, queries, max_results=50):
+        (books, result_count) = self.primary.search_many(queries, max_results)
+        if result_count:
+            return (books, result_count)
+
+        (books, result_count) = self.secondary.search_many(queries, max_results)
+        self.learn(books)
+        return (books, result_count)
+
+    def learn(self, books):
+        """
+        Appends books found by the secondary backend to the catalog file if specified.
+        """
+
+        if not self.catalog_path or not books:
+            return
+        with self.lock:
+            with open(self.catalog_path, mode='a', encoding='utf-8') as catalog:
+                for book in books:
+                    catalog.write(json.dumps(
+                        {'name': book.name, 'url': book.url, 'description': book.description, 'popularity': 1},
+                        ensure_ascii=False) + '\n')
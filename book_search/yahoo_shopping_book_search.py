@@ -3,23 +3,31 @@ from .book_search import BookSearch
 
 
 class YahooShoppingBookSearch(BookSearch):
+    API_URL = 'https://shopping.yahooapis.jp/ShoppingWebService/V3/itemSearch'
+
+    # The maximum number of results which the API returns in a single request.
+    MAX_RESULTS = 100
+
     def __init__(self, yapi):
         self.yapi = yapi
 
     def search(self, queries):
-        api_url = 'https://shopping.yahooapis.jp/ShoppingWebService/V3/itemSearch'
-        response = self.yapi.api(api_url, {
+        (books, available_result_count) = self.search_many(queries, 1)
+        if books:
+            return (books[0], available_result_count)
+        return (None, 0)
+
+    def search_many(self, queries, max_results=50):
+        response = self.yapi.api(self.API_URL, {
             'query': ' '.join(queries),
             'genre_category_id': 10002,
-            'results': 1,
+            'results': min(max_results, self.MAX_RESULTS),
         })
 
         if response:
             available_result_count = int(response['totalResultsAvailable'])
-            returned_result_count = int(response['totalResultsReturned'])
-            if returned_result_count:
-                best_result = response['hits'][0]
-                best_book = Book(best_result['name'], best_result['url'])
-                return (best_book, available_result_count)
+            books = [Book(hit['name'], hit['url'], hit.get('description') or '') for hit in response['hits']]
+            if books:
+                return (books, available_result_count)
 
-        return (None, 0)
+        return ([], 0)
@@ -0,0 +1,122 @@
+import collections
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+
+class MemoryCache:
+    """
+    An in-memory LRU cache of API responses.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.entries = collections.OrderedDict()
+
+    def get(self, key, now):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        (expires, response) = entry
+        if expires <= now:
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return response
+
+    def put(self, key, response, expires):
+        self.entries[key] = (expires, response)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+
+class SqliteCache:
+    """
+    An LRU cache of API responses saved in a SQLite database
+    so that responses survive between invocations.
+    """
+
+    def __init__(self, max_size, path):
+        self.max_size = max_size
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.connection:
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                'key TEXT PRIMARY KEY, response TEXT, expires REAL, accessed REAL)')
+            self.connection.execute(
+                'CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)')
+
+    def get(self, key, now):
+        row = self.connection.execute(
+            'SELECT response, expires FROM responses WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        (response, expires) = row
+        with self.connection:
+            if expires <= now:
+                self.connection.execute('DELETE FROM responses WHERE key = ?', (key,))
+                return None
+            self.connection.execute('UPDATE responses SET accessed = ? WHERE key = ?', (now, key))
+        return json.loads(response)
+
+    def put(self, key, response, expires):
+        with self.connection:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)',
+                (key, json.dumps(response, ensure_ascii=False), expires, time.time()))
+            self.connection.execute(
+                'DELETE FROM responses WHERE key IN ('
+                'SELECT key FROM responses ORDER BY accessed DESC LIMIT -1 OFFSET ?)',
+                (self.max_size,))
+
+
+class CachedYahooApi:
+    """
+    A wrapper of YahooApi which caches responses by the endpoint and the request parameters.
+    """
+
+    def __init__(self, yapi, ttls=None, default_ttl=3600, max_size=1024, path=None):
+        """
+        Initializes a new instance with TTLs in seconds for each API URL.
+        Responses are saved in the SQLite database at the path if specified,
+        otherwise they are kept in memory.
+        """
+
+        self.yapi = yapi
+        self.ttls = ttls or {}
+        self.default_ttl = default_ttl
+        self.cache = SqliteCache(max_size, path) if path else MemoryCache(max_size)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_key(self, apiurl, params, method):
+        # Normalize parameters so that equivalent requests share the same entry
+        # and hash them not to keep long texts such as user timelines in keys.
+        normalized_params = {
+            key: ' '.join(str(value).split())
+            for (key, value) in params.items()
+            if key != 'appid'}
+        request = json.dumps([method, apiurl, normalized_params], ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(request.encode('UTF-8')).hexdigest()
+
+    def api(self, apiurl, params, method='GET'):
+        ttl = self.ttls.get(apiurl, self.default_ttl)
+        if ttl <= 0:
+            return self.yapi.api(apiurl, params, method)
+
+        key = self.get_key(apiurl, params, method)
+        with self.lock:
+            response = self.cache.get(key, time.time())
+            if response is not None:
+                self.hits += 1
+                return response
+            self.misses += 1
+
+        response = self.yapi.api(apiurl, dict(params), method)
+        with self.lock:
+            self.cache.put(key, response, time.time() + ttl)
+        return response
@@ -0,0 +1,57 @@
+"""
+An executor whose worker threads never keep the process alive.
+"""
+
+import concurrent.futures
+import queue
+import threading
+
+
+class DaemonThreadPoolExecutor(concurrent.futures.Executor):
+    """
+    A thread pool executor which runs calls in daemon threads.
+    Unlike ThreadPoolExecutor, whose threads are joined when the interpreter exits,
+    calls which are still running are abandoned at the exit
+    so that an invocation finishes within its time limit.
+    """
+
+    def __init__(self, max_workers=1):
+        self.max_workers = max(max_workers, 1)
+        self.work_queue = queue.SimpleQueue()
+        self.threads = []
+        self.lock = threading.Lock()
+        self.is_shutdown = False
+
+    def submit(self, fn, *args, **kwargs):
+        with self.lock:
+            if self.is_shutdown:
+                raise RuntimeError('cannot schedule new futures after shutdown')
+            future = concurrent.futures.Future()
+            self.work_queue.put((future, fn, args, kwargs))
+            if len(self.threads) < self.max_workers:
+                thread = threading.Thread(target=self.work, daemon=True)
+                thread.start()
+                self.threads.append(thread)
+        return future
+
+    def work(self):
+        while True:
+            item = self.work_queue.get()
+            if item is None:
+                return
+            (future, fn, args, kwargs) = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def shutdown(self, wait=True):
+        with self.lock:
+            self.is_shutdown = True
+            for _ in self.threads:
+                self.work_queue.put(None)
+        if wait:
+            for thread in self.threads:
+                thread.join()
@@ -2,18 +2,16 @@
 
 """
 This script has the entry point for the invocation as an AWS Lambda function.
+
+Since import time is a part of every invocation,
+backends are imported only when the operation and the environment need them.
 """
 
 import logging
 import os
 import sys
-from book_search import yahoo_shopping_book_search
-from keyword_extraction import yahoo_keyword_extraction
-from microblog import mastodon_api
-from microblog import twitter_api
+import time
 from nagato import Nagato
-from slack_log_handler import SlackLogHandler
-from yahoo_api import YahooApi
 
 
 def setup_logger(nagato):
@@ -23,6 +21,7 @@ def setup_logger(nagato):
     # Add a Slack logger
     slack_webhook_url = os.getenv('SLACK_WEBHOOK_URL')
     if slack_webhook_url:
+        from slack_log_handler import SlackLogHandler
         slack_handler = SlackLogHandler(
             slack_webhook_url, format='%(levelname)s: %(message)s')
         slack_handler.setLevel(logging.WARNING)
@@ -35,7 +34,16 @@ def setup_logger(nagato):
         logger.addHandler(stream_handler)
 
 
-def create_twitter_api():
+def create_identity_cache(state_store):
+    if state_store:
+        from microblog.identity_cache import IdentityCache
+        return IdentityCache(state_store, float(os.getenv('NAGATO_IDENTITY_TTL', str(7 * 24 * 60 * 60))))
+    else:
+        return None
+
+
+def create_twitter_api(state_store=None):
+    from microblog import twitter_api
     twitter_consumer_key = os.getenv('TWITTER_CONSUMER_KEY')
     twitter_consumer_secret = os.getenv('TWITTER_CONSUMER_SECRET')
     twitter_access_token = os.getenv('TWITTER_ACCESS_TOKEN')
@@ -48,60 +56,209 @@ def create_twitter_api():
             twitter_consumer_key,
             twitter_consumer_secret,
             twitter_access_token,
-            twitter_access_token_secret)
+            twitter_access_token_secret,
+            create_identity_cache(state_store))
 
 
-def create_mastodon_api():
+def create_mastodon_api(state_store=None):
+    from microblog import mastodon_api
     mastodon_access_token = os.getenv('MASTODON_ACCESS_TOKEN')
     mastodon_api_base_url = os.getenv('MASTODON_API_BASE_URL')
     assert mastodon_access_token
     assert mastodon_api_base_url
     return mastodon_api.MastodonApi(
             mastodon_access_token,
-            mastodon_api_base_url)
+            mastodon_api_base_url,
+            state_store,
+            create_identity_cache(state_store))
 
 
 def create_yahoo_api():
+    from book_search import yahoo_shopping_book_search
+    from cached_yahoo_api import CachedYahooApi
+    from keyword_extraction import yahoo_keyword_extraction
+    from yahoo_api import YahooApi
     yahoo_application_id = os.getenv('YAHOO_APPLICATION_ID')
     assert yahoo_application_id
-    return YahooApi(yahoo_application_id)
+    # Book search results rarely change while key phrases follow user timelines.
+    return CachedYahooApi(
+        YahooApi(yahoo_application_id),
+        ttls={
+            yahoo_shopping_book_search.YahooShoppingBookSearch.API_URL: 24 * 60 * 60,
+            yahoo_keyword_extraction.YahooKeywordExtraction.API_URL: 60 * 60,
+        },
+        max_size=int(os.getenv('NAGATO_YAHOO_CACHE_SIZE', '4096')),
+        path=os.getenv('NAGATO_YAHOO_CACHE_FILE'))
+
+
+def create_book_search(yapi):
+    from book_search import yahoo_shopping_book_search
+    book_search = yahoo_shopping_book_search.YahooShoppingBookSearch(yapi)
+    book_index_file = os.getenv('NAGATO_BOOK_INDEX_FILE')
+    if book_index_file:
+        from book_search import local_book_search
+        from book_search import tiered_book_search
+        return tiered_book_search.TieredBookSearch(
+            local_book_search.LocalBookSearch(book_index_file),
+            book_search,
+            os.getenv('NAGATO_BOOK_CATALOG_FILE'))
+    else:
+        return book_search
+
+
+def create_keyword_extraction(yapi, max_bytes):
+    from keyword_extraction.budgeted_keyword_extraction import BudgetedKeywordExtraction
+    if os.getenv('NAGATO_KEYWORD_EXTRACTION') == 'tfidf':
+        from keyword_extraction import tfidf_keyword_extraction
+        keyword_extraction = tfidf_keyword_extraction.TfidfKeywordExtraction(os.getenv('NAGATO_TFIDF_FILE'))
+    else:
+        from keyword_extraction import yahoo_keyword_extraction
+        keyword_extraction = yahoo_keyword_extraction.YahooKeywordExtraction(yapi)
+    # Bound the payload so that the extraction latency does not depend on how much users post.
+    return BudgetedKeywordExtraction(
+        keyword_extraction,
+        max_bytes=max_bytes,
+        logger=logging.getLogger(Nagato.__module__))
+
+
+def create_key_phrase_cache(state_store):
+    key_phrase_similarity = os.getenv('NAGATO_KEYPHRASE_SIMILARITY')
+    if key_phrase_similarity:
+        from keyword_extraction.key_phrase_cache import KeyPhraseCache
+        return KeyPhraseCache(
+            state_store,
+            threshold=float(key_phrase_similarity),
+            merges=bool(os.getenv('NAGATO_KEYPHRASE_MERGE')))
+    else:
+        return None
+
+
+def create_state_store():
+    state_file = os.getenv('NAGATO_STATE_FILE')
+    if state_file:
+        from state_store.json_state_store import JsonStateStore
+        return JsonStateStore(state_file)
+    else:
+        return None
 
 
-def create_microblog_api():
+def create_action_scheduler(mapi, state_store):
+    from microblog.action_scheduler import ActionScheduler
+    # Follow and remove actions per hour, which can burst up to the capacity.
+    action_rate = float(os.getenv('NAGATO_ACTION_RATE', '400')) / (60 * 60)
+    return ActionScheduler(
+        mapi,
+        state_store,
+        capacity=int(os.getenv('NAGATO_ACTION_CAPACITY', '100')),
+        rate=action_rate,
+        time_limit=float(os.getenv('NAGATO_ACTION_TIME_LIMIT', '0')),
+        logger=logging.getLogger(Nagato.__module__))
+
+
+def create_microblog_api(state_store=None):
     if os.getenv('MASTODON_API_BASE_URL'):
-        return create_mastodon_api()
+        return create_mastodon_api(state_store)
     else:
-        return create_twitter_api()
+        return create_twitter_api(state_store)
 
 
-def create_nagato():
-    mapi = create_microblog_api()
-    yapi = create_yahoo_api()
-    book_search = yahoo_shopping_book_search.YahooShoppingBookSearch(yapi)
-    keyword_extraction = yahoo_keyword_extraction.YahooKeywordExtraction(yapi)
-    nagato = Nagato(mapi, book_search, keyword_extraction)
+def create_nagato(responds=True, memoizes=True, refollows=False):
+    """
+    Creates a Nagato instance.
+    The book search and the keyword extraction are not created unless it responds to users,
+    and the action scheduler is not created unless it refollows.
+    Reads of the microblog API are memoized within the invocation if memoizes is true,
+    and the operation should close nagato.microblog when it finishes.
+    """
+
+    state_store = create_state_store()
+    mapi = create_microblog_api(state_store)
+    # The same budget bounds both the texts prepared by Nagato and the payload of the keyword extraction.
+    key_phrase_max_bytes = int(os.getenv('NAGATO_KEYPHRASE_MAX_BYTES', '8192'))
+    if memoizes:
+        from microblog.memoizing_microblog_api import MemoizingMicroblogApi
+        mapi = MemoizingMicroblogApi(mapi, logging.getLogger(Nagato.__module__))
+    if responds:
+        from microblog.user_timeline_cache import UserTimelineCache
+        yapi = create_yahoo_api()
+        book_search = create_book_search(yapi)
+        keyword_extraction = create_keyword_extraction(yapi, key_phrase_max_bytes)
+        timeline_cache = UserTimelineCache(mapi, os.getenv('NAGATO_TIMELINE_CACHE_FILE'))
+        key_phrase_cache = create_key_phrase_cache(state_store)
+    else:
+        book_search = None
+        keyword_extraction = None
+        timeline_cache = None
+        key_phrase_cache = None
+    search_max_queries = os.getenv('NAGATO_SEARCH_MAX_QUERIES')
+    search_time_limit = os.getenv('NAGATO_SEARCH_TIME_LIMIT')
+    search_rerank_results = os.getenv('NAGATO_SEARCH_RERANK_RESULTS')
+    nagato = Nagato(
+        mapi,
+        book_search,
+        keyword_extraction,
+        max_workers=int(os.getenv('NAGATO_MAX_WORKERS', '1')),
+        state_store=state_store,
+        search_concurrency=int(os.getenv('NAGATO_SEARCH_CONCURRENCY', '1')),
+        search_max_queries=int(search_max_queries) if search_max_queries else None,
+        search_time_limit=float(search_time_limit) if search_time_limit else None,
+        timeline_cache=timeline_cache,
+        action_scheduler=create_action_scheduler(mapi, state_store) if refollows else None,
+        search_rerank_results=int(search_rerank_results) if search_rerank_results else None,
+        key_phrase_cache=key_phrase_cache,
+        key_phrase_max_bytes=key_phrase_max_bytes)
     setup_logger(nagato)
     return nagato
 
 
 def post(event, context):
-    nagato = create_nagato()
-    nagato.postRandomPhrase()
+    nagato = create_nagato(responds=False)
+    with nagato.microblog:
+        nagato.postRandomPhrase()
 
 
 def refollow(event, context):
-    nagato = create_nagato()
-    nagato.refollow()
+    nagato = create_nagato(responds=False, refollows=True)
+    with nagato.microblog:
+        nagato.refollow()
 
 
 def reply(event, context):
     nagato = create_nagato()
-    nagato.respondNewReply()
+    # Respond to all the pending replies in a single invocation
+    # while finishing before the next scheduled invocation starts.
+    max_count = os.getenv('NAGATO_REPLY_MAX_COUNT')
+    time_limit = float(os.getenv('NAGATO_REPLY_TIME_LIMIT', '240'))
+    with nagato.microblog, nagato.keyword_extraction:
+        nagato.respondNewReplies(
+            int(max_count) if max_count else None,
+            time.monotonic() + time_limit)
 
 
 def run(event, context):
+    import asyncio
+    import nagato_async
+    from microblog.async_microblog_api import ExecutorAsyncMicroblogApi
     nagato = create_nagato()
-    nagato.run()
+    # Independent requests are sent concurrently through the same microblog API
+    # so that they share the credential and the state of replies.
+    with nagato.microblog, nagato.keyword_extraction:
+        asyncio.run(nagato_async.run(nagato, ExecutorAsyncMicroblogApi(nagato.microblog)))
+
+
+def daemon(event, context):
+    from nagato_daemon import NagatoDaemon
+    # Reads are not memoized since the daemon keeps running.
+    nagato = create_nagato(memoizes=False, refollows=True)
+    # Tasks executed periodically in seconds while replies are streamed.
+    tasks = [
+        (float(os.getenv('NAGATO_REFOLLOW_INTERVAL', '3600')), nagato.refollow),
+        (float(os.getenv('NAGATO_POST_INTERVAL', '86400')), nagato.postRandomPhrase),
+        (float(os.getenv('NAGATO_TIMELINE_SPEED_INTERVAL', '300')), nagato.updateTimelineSpeed),
+    ]
+    poll_interval = float(os.getenv('NAGATO_REPLY_POLL_INTERVAL', '60'))
+    with nagato.keyword_extraction:
+        NagatoDaemon(nagato, tasks, poll_interval=poll_interval).run()
 
 
 if __name__ == '__main__':
@@ -115,5 +272,7 @@ if __name__ == '__main__':
             refollow(None, None)
         elif operation == 'reply':
             reply(None, None)
+        elif operation == 'daemon':
+            daemon(None, None)
         else:
             raise Exception('Unsupported operation: %s' % operation)
@@ -0,0 +1,60 @@
+import re
+
+
+class IntentRouter:
+    """
+    A classifier which finds the intent of a text
+    with all the registered patterns combined into a single regular expression.
+    """
+
+    def __init__(self):
+        self.intents = []
+        self.priorities = {}
+        self.regex = None
+        self.intent_regexes = None
+
+    def register(self, name, pattern):
+        """
+        Registers an intent with the specified name and regular expression pattern.
+        Intents registered earlier take precedence when a text matches several intents.
+        """
+
+        assert name.isidentifier(), 'The intent name must be an identifier.'
+        assert name not in self.priorities, 'The intent %s is already registered.' % name
+        self.intents.append((name, pattern))
+        self.priorities = {name: priority for (priority, (name, pattern)) in enumerate(self.intents)}
+        self.regex = None
+        self.intent_regexes = None
+
+    def compile(self):
+        if self.regex is None:
+            intent_regexes = [(name, re.compile(pattern)) for (name, pattern) in self.intents]
+            regex = re.compile('|'.join(
+                '(?P<%s>%s)' % (name, pattern) for (name, pattern) in self.intents))
+            # Publish the combined regular expression last
+            # since concurrent classifications use the separate ones once it is compiled.
+            self.intent_regexes = intent_regexes
+            self.regex = regex
+        return self.regex
+
+    def classify(self, text):
+        """
+        Returns the name of the intent of the specified text, or None if no intent matches.
+        """
+
+        if not self.intents:
+            return None
+
+        # Most texts match no intent, which a single search of the combined patterns rejects.
+        match = self.compile().search(text)
+        if not match:
+            return None
+
+        # The named group of each intent encloses its pattern, so it is the last closed group.
+        # Intents with higher priorities may match later in the text or overlap the match,
+        # so only they are searched separately.
+        intent = match.lastgroup
+        for (name, regex) in self.intent_regexes[:self.priorities[intent]]:
+            if regex.search(text):
+                return name
+        return intent
@@ -0,0 +1,98 @@
+import collections
+import re
+from .keyword_extraction import KeywordExtraction
+
+# Characters ignored to find near-duplicate lines such as bot posts differing only in numbers.
+INSIGNIFICANT_RE = re.compile(r'[\W\d_]+')
+
+# How much of the payload is kept and dropped by a budgeted extraction.
+PayloadReport = collections.namedtuple('PayloadReport', [
+    'kept_lines', 'kept_bytes', 'duplicate_lines', 'boilerplate_lines', 'dropped_lines', 'dropped_bytes'])
+
+
+class BudgetedKeywordExtraction(KeywordExtraction):
+    """
+    A keyword extractor which bounds the payload of another keyword extractor.
+    The sentence is split into lines, such as statuses from the newest one,
+    and lines are kept in the original order while they fit in the byte budget.
+    """
+
+    def __init__(self, keyword_extraction, max_bytes=8192, min_length=4, logger=None):
+        """
+        Initializes a new instance which passes at most max_bytes bytes in UTF-8.
+        Lines with less than min_length significant characters are dropped as boilerplate
+        and lines with the same significant characters as a preceding one are dropped as near-duplicates.
+        Reports are logged by the logger if specified.
+        """
+
+        self.keyword_extraction = keyword_extraction
+        self.max_bytes = max_bytes
+        self.min_length = min_length
+        self.logger = logger
+        self.kept_bytes = 0
+        self.dropped_bytes = 0
+
+    def get_payload(self, sentence):
+        """
+        Gets the bounded payload of the sentence and the PayloadReport.
+        """
+
+        kept = []
+        kept_size = 0
+        candidate_count = 0
+        seen_keys = set()
+        duplicate_count = 0
+        boilerplate_count = 0
+        total_size = 0
+        for line in sentence.split('\n'):
+            line = line.strip()
+            if not line:
+                continue
+            size = len(line.encode('UTF-8'))
+            total_size += size + 1
+            key = INSIGNIFICANT_RE.sub('', line).lower()
+            if len(key) < self.min_length:
+                boilerplate_count += 1
+                continue
+            if key in seen_keys:
+                duplicate_count += 1
+                continue
+            seen_keys.add(key)
+            candidate_count += 1
+            # Lines which do not fit are skipped so that shorter older ones can fill the rest of the budget.
+            if kept_size + size + 1 <= self.max_bytes + 1:
+                kept.append(line)
+                kept_size += size + 1
+
+        payload = '\n'.join(kept)
+        kept_bytes = len(payload.encode('UTF-8'))
+        report = PayloadReport(
+            kept_lines=len(kept),
+            kept_bytes=kept_bytes,
+            duplicate_lines=duplicate_count,
+            boilerplate_lines=boilerplate_count,
+            dropped_lines=candidate_count - len(kept),
+            dropped_bytes=max(total_size - 1, 0) - kept_bytes)
+        return (payload, report)
+
+    def extract(self, sentence):
+        (payload, report) = self.get_payload(sentence)
+        self.kept_bytes += report.kept_bytes
+        self.dropped_bytes += report.dropped_bytes
+        if self.logger:
+            self.logger.debug(
+                'Kept %d lines (%d bytes) and dropped %d duplicate, %d boilerplate and %d other lines (%d bytes) '
+                'to extract key phrases.',
+                report.kept_lines,
+                report.kept_bytes,
+                report.duplicate_lines,
+                report.boilerplate_lines,
+                report.dropped_lines,
+                report.dropped_bytes)
+        return self.keyword_extraction.extract(payload)
+
+    def learn(self, sentences):
+        self.keyword_extraction.learn(sentences)
+
+    def flush(self):
+        self.keyword_extraction.flush()
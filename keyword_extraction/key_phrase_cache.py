@@ -0,0 +1,157 @@
+import heapq
+import threading
+import time
+import zlib
+
+
+def get_hashes(texts, shingle_size=3):
+    """
+    Gets hashes of character shingles in the specified texts,
+    which are stable between processes unlike the built-in hash.
+    """
+
+    hashes = set()
+    for text in texts:
+        hashes.update(
+            zlib.crc32(text[i:i + shingle_size].encode('UTF-8'))
+            for i in range(max(len(text) - shingle_size + 1, 1)))
+    return hashes
+
+
+def get_signature(lines, size=128):
+    """
+    Gets a bottom-k MinHash signature of the specified lines,
+    which consists of the smallest size hashes of their shingles.
+    """
+
+    return sorted(heapq.nsmallest(size, get_hashes(lines)))
+
+
+def get_similarity(signature, other_signature, size=128):
+    """
+    Estimates the Jaccard similarity of texts from their signatures.
+    """
+
+    union = heapq.nsmallest(size, set(signature) | set(other_signature))
+    if not union:
+        return 1.0
+    intersection = set(signature) & set(other_signature)
+    return sum(1 for value in union if value in intersection) / len(union)
+
+
+class KeyPhraseCache:
+    """
+    A cache of key phrases extracted from user timelines,
+    which reuses them while the timeline of a user barely changes.
+    """
+
+    def __init__(self, state_store=None, threshold=0.9, merges=False, max_age=24 * 60 * 60, signature_size=128):
+        """
+        Initializes a new instance which reuses key phrases
+        when the estimated similarity of texts is at least the threshold.
+        If merges is true, key phrases extracted only from new lines are merged into the reused ones.
+        Key phrases are kept for max_age seconds and saved in the state store if specified
+        together with the numbers of lookups which reused and extracted them.
+        """
+
+        self.state_store = state_store
+        self.threshold = threshold
+        self.merges = merges
+        self.max_age = max_age
+        self.signature_size = signature_size
+        self.lock = threading.Lock()
+        self.entries = None
+        self.reused_count = 0
+        self.extracted_count = 0
+
+    def load(self):
+        if self.entries is None:
+            self.entries = dict(self.state_store.get('key_phrases', {})) if self.state_store else {}
+            counts = self.state_store.get('key_phrase_counts', {}) if self.state_store else {}
+            self.reused_count = counts.get('reused', 0)
+            self.extracted_count = counts.get('extracted', 0)
+        return self.entries
+
+    def save(self, saves_entries=True):
+        if self.state_store:
+            values = {
+                'key_phrase_counts': {
+                    'reused': self.reused_count,
+                    'extracted': self.extracted_count,
+                },
+            }
+            if saves_entries:
+                values['key_phrases'] = self.entries
+            self.state_store.update(values)
+
+    def get_reuse_rate(self):
+        """
+        Gets the ratio of lookups which reused key phrases across invocations sharing the state store.
+        """
+
+        with self.lock:
+            self.load()
+            lookup_count = self.reused_count + self.extracted_count
+            return self.reused_count / lookup_count if lookup_count else 0.0
+
+    def extract(self, user_id, text, keyword_extraction):
+        """
+        Gets key phrases of the text in the user timeline
+        by reusing the cached ones or extracting them by the keyword extractor.
+        Returns the key phrases, whether they are reused
+        and the estimated similarity to the previous text, which is 0 without it.
+        """
+
+        key = str(user_id)
+        lines = [line for line in text.split('\n') if line]
+        signature = get_signature(lines, self.signature_size)
+        line_hashes = sorted({zlib.crc32(line.encode('UTF-8')) for line in lines})
+        now = time.time()
+        with self.lock:
+            entry = self.load().get(key)
+        if entry and now - entry['updated_at'] > self.max_age:
+            entry = None
+
+        similarity = get_similarity(signature, entry['signature'], self.signature_size) if entry else 0.0
+        new_entry = None
+        if similarity >= self.threshold:
+            key_phrases = entry['key_phrases']
+            if self.merges:
+                known_line_hashes = set(entry['line_hashes'])
+                new_lines = [line for line in lines if zlib.crc32(line.encode('UTF-8')) not in known_line_hashes]
+                if new_lines:
+                    new_key_phrases = keyword_extraction.extract('\n'.join(new_lines))
+                    key_phrases = (new_key_phrases + [
+                        key_phrase for key_phrase in key_phrases
+                        if key_phrase not in new_key_phrases])[:max(len(key_phrases), len(new_key_phrases))]
+                    # Keep the signature and the time of the text which the key phrases were fully extracted from
+                    # so that gradual changes and expiration lead to extracting them again.
+                    new_entry = dict(entry, line_hashes=line_hashes, key_phrases=key_phrases)
+            reused = True
+        else:
+            key_phrases = keyword_extraction.extract(text)
+            new_entry = {
+                'signature': signature,
+                'line_hashes': line_hashes,
+                'key_phrases': key_phrases,
+                'updated_at': now,
+            }
+            reused = False
+
+        with self.lock:
+            if new_entry:
+                self.entries[key] = new_entry
+            entries = {
+                user_id: user_entry
+                for (user_id, user_entry) in self.entries.items()
+                if now - user_entry['updated_at'] <= self.max_age}
+            changed = new_entry is not None or len(entries) != len(self.entries)
+            self.entries = entries
+            if reused:
+                self.reused_count += 1
+            else:
+                self.extracted_count += 1
+            # Save entries only when one of them changes not to rewrite all of them for each lookup.
+            self.save(changed)
+
+        return (key_phrases, reused, similarity)
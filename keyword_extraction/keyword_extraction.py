@@ -6,3 +6,23 @@ class KeywordExtraction(ABC):
     @abstractmethod
     def extract(self, sentence):
         pass
+
+    def learn(self, sentences):
+        """
+        Learns the specified sentences as samples of general texts.
+        Extractors which don't need samples ignore them.
+        """
+        pass
+
+    def flush(self):
+        """
+        Saves what has been learned from extracted sentences.
+        Extractors which don't keep them ignore this.
+        """
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.flush()
@@ -0,0 +1,120 @@
+import collections
+import gzip
+import math
+import os
+import re
+import tempfile
+import threading
+from .keyword_extraction import KeywordExtraction
+
+# Runs of Kanji, Katakana and alphanumeric characters, which are likely to be nouns.
+# Hiragana, which are mostly used for particles and inflections, separate words.
+WORD_RE = re.compile(r'[0-9A-Za-z０-９Ａ-Ｚａ-ｚ々〆ァ-ヺー一-鿿ｦ-ﾟ]{2,}')
+IGNORED_RE = re.compile(r'<[^>]*>|&\w+;|https?://\S+|[@#]\w+')
+NUMBER_RE = re.compile(r'[0-9０-９]+')
+
+
+def tokenize_words(text):
+    """
+    Splits the specified text into Japanese noun-like words.
+    """
+
+    text = IGNORED_RE.sub(' ', text)
+    return [word.lower() for word in WORD_RE.findall(text) if not NUMBER_RE.fullmatch(word)]
+
+
+def get_ngram_tokenizer(n):
+    """
+    Gets a tokenizer which splits texts into character n-grams of noun-like words.
+    """
+
+    def tokenize_ngrams(text):
+        return [word[i:i + n]
+                for word in tokenize_words(text)
+                for i in range(max(len(word) - n + 1, 1))]
+
+    return tokenize_ngrams
+
+
+class TfidfKeywordExtraction(KeywordExtraction):
+    """
+    A keyword extractor which scores words by TF-IDF in-process.
+    Document frequencies are learned incrementally from sample texts and extracted sentences.
+    """
+
+    def __init__(self, path=None, tokenize=tokenize_words, max_phrases=20, max_terms=50000):
+        """
+        Initializes a new instance which saves the document frequency table
+        in the gzip-compressed file at the path if specified.
+        At most max_terms terms with the highest document frequencies are kept.
+        """
+
+        self.path = path
+        self.tokenize = tokenize
+        self.max_phrases = max_phrases
+        self.max_terms = max_terms
+        self.lock = threading.Lock()
+        self.document_count = 0
+        self.document_frequencies = collections.Counter()
+        # Whether extracted sentences have been counted since the table was saved.
+        self.dirty = False
+        if path and os.path.exists(path):
+            self.load()
+
+    def load(self):
+        with gzip.open(self.path, mode='rt', encoding='utf-8') as table:
+            self.document_count = int(table.readline())
+            for line in table:
+                (term, frequency) = line.rstrip('\n').split('\t')
+                self.document_frequencies[term] = int(frequency)
+
+    def save(self):
+        if not self.path:
+            return
+        if len(self.document_frequencies) > self.max_terms:
+            self.document_frequencies = collections.Counter(
+                dict(self.document_frequencies.most_common(self.max_terms)))
+        directory = os.path.dirname(os.path.abspath(self.path))
+        (fd, temp_path) = tempfile.mkstemp(dir=directory, prefix='.tfidf-', suffix='.tsv.gz')
+        try:
+            with os.fdopen(fd, mode='wb') as temp_file:
+                with gzip.open(temp_file, mode='wt', encoding='utf-8') as table:
+                    table.write('%d\n' % self.document_count)
+                    for (term, frequency) in self.document_frequencies.items():
+                        table.write('%s\t%d\n' % (term, frequency))
+            os.replace(temp_path, self.path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    def add_document(self, terms):
+        self.document_count += 1
+        self.document_frequencies.update(set(terms))
+
+    def learn(self, sentences):
+        with self.lock:
+            for sentence in sentences:
+                self.add_document(self.tokenize(sentence))
+            self.save()
+            self.dirty = False
+
+    def flush(self):
+        with self.lock:
+            if self.dirty:
+                self.save()
+                self.dirty = False
+
+    def extract(self, sentence):
+        terms = self.tokenize(sentence)
+        term_frequencies = collections.Counter(terms)
+        with self.lock:
+            document_count = self.document_count + 1
+            scores = {
+                term: frequency * (math.log(document_count / (self.document_frequencies[term] + 1)) + 1)
+                for (term, frequency) in term_frequencies.items()}
+            self.add_document(terms)
+            # The table is saved when samples are learned or flushed not to rewrite it for each reply.
+            self.dirty = True
+
+        return [term for (term, score) in
+                sorted(scores.items(), key=lambda x: x[1], reverse=True)[:self.max_phrases]]
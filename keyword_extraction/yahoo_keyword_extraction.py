@@ -2,12 +2,13 @@ from .keyword_extraction import KeywordExtraction
 
 
 class YahooKeywordExtraction(KeywordExtraction):
+    API_URL = 'http://jlp.yahooapis.jp/KeyphraseService/V1/extract'
+
     def __init__(self, yapi):
         self.yapi = yapi
 
     def extract(self, sentence):
-        api_url = 'http://jlp.yahooapis.jp/KeyphraseService/V1/extract'
-        response = self.yapi.api(api_url, {
+        response = self.yapi.api(self.API_URL, {
             'output': 'json',
             'sentence': sentence,
         }, 'POST')
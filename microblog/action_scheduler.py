@@ -0,0 +1,141 @@
+import collections
+import time
+from .microblog_api import AuthenticationError
+from .microblog_api import RateLimitError
+
+ACTIONS = {'follow', 'remove'}
+
+
+class ActionScheduler:
+    """
+    A scheduler which spreads follow and remove actions with a token bucket
+    and defers the remaining actions to the next invocation.
+    """
+
+    def __init__(self, microblog, state_store=None, capacity=100, rate=400 / (60 * 60), time_limit=0, logger=None):
+        """
+        Initializes a new instance with a token bucket of the capacity
+        refilled by rate tokens per second.
+        It waits for tokens up to time_limit seconds in a run.
+        The queue and the bucket are saved in the state store if specified.
+        Actions are logged by the logger if specified.
+        """
+
+        self.microblog = microblog
+        self.logger = logger
+        self.state_store = state_store
+        self.capacity = capacity
+        self.rate = rate
+        self.time_limit = time_limit
+        state = (state_store.get('action_scheduler') if state_store else None) or {}
+        self.queue = collections.deque(tuple(action) for action in state.get('queue', []))
+        self.tokens = state.get('tokens', capacity)
+        self.updated_at = state.get('updated_at', time.time())
+        # No action is sent until the backend resets its rate limit.
+        self.blocked_until = state.get('blocked_until', 0)
+
+    def save(self):
+        if self.state_store:
+            self.state_store.set('action_scheduler', {
+                'queue': [list(action) for action in self.queue],
+                'tokens': self.tokens,
+                'updated_at': self.updated_at,
+                'blocked_until': self.blocked_until,
+            })
+
+    def schedule(self, actions):
+        """
+        Replaces the queue with the specified (action, user_id) pairs
+        while keeping the order of pending actions which are still needed.
+        """
+
+        actions = list(dict.fromkeys(tuple(action) for action in actions))
+        assert all(action in ACTIONS for (action, user_id) in actions), 'Unsupported action.'
+        planned = set(actions)
+        pending = [action for action in self.queue if action in planned]
+        queued = set(pending)
+        self.queue = collections.deque(pending + [action for action in actions if action not in queued])
+
+    def refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def acquire(self, action, deadline):
+        """
+        Waits for a token to send the specified action until the deadline.
+        Returns True if a token is acquired.
+        """
+
+        now = time.time()
+        if now < self.blocked_until:
+            return False
+        rate_limit = self.microblog.get_rate_limit(action)
+        if rate_limit and rate_limit.remaining is not None and rate_limit.remaining <= 0:
+            if rate_limit.reset and rate_limit.reset > now:
+                self.blocked_until = rate_limit.reset
+            return False
+
+        self.refill(now)
+        if self.tokens < 1:
+            wait = (1 - self.tokens) / self.rate if self.rate > 0 else float('inf')
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+            self.refill(time.time())
+        self.tokens -= 1
+        return True
+
+    def send(self, action, user_id):
+        """
+        Sends the specified action.
+        Returns False if it fails for reasons other than the rate limit, which blocks actions until reset.
+        """
+
+        if self.logger:
+            self.logger.info('%s #%d', 'Following' if action == 'follow' else 'Removing', user_id)
+        try:
+            getattr(self.microblog, action)(user_id)
+        except RateLimitError:
+            rate_limit = self.microblog.get_rate_limit(action)
+            self.blocked_until = rate_limit.reset if rate_limit and rate_limit.reset else 0
+            self.tokens = 0
+            raise
+        except AuthenticationError:
+            # Every action fails in the same way until the credentials are fixed.
+            raise
+        except Exception:
+            if self.logger:
+                self.logger.exception('Failed to %s #%d and dropped it.', action, user_id)
+            return False
+        return True
+
+    def run(self, actions=None):
+        """
+        Sends queued actions as long as the rate limits allow.
+        Actions which fail for other reasons are dropped
+        not to block the following ones since they are scheduled again if still needed.
+        Returns lists of (action, user_id) pairs done and deferred.
+        """
+
+        if actions is not None:
+            self.schedule(actions)
+
+        deadline = time.time() + self.time_limit
+        done = []
+        try:
+            while self.queue:
+                (action, user_id) = self.queue[0]
+                if not self.acquire(action, deadline):
+                    break
+                try:
+                    sent = self.send(action, user_id)
+                except RateLimitError:
+                    break
+                if sent:
+                    done.append(self.queue.popleft())
+                else:
+                    self.queue.popleft()
+        finally:
+            self.save()
+
+        return (done, list(self.queue))
@@ -0,0 +1,142 @@
+import asyncio
+import functools
+from abc import ABC
+from abc import abstractmethod
+
+
+class AsyncMicroblogApi(ABC):
+    """
+    An asynchronous counterpart of MicroblogApi.
+    """
+
+    @abstractmethod
+    async def verify_credentials(self):
+        pass
+
+    @abstractmethod
+    async def get_home_statuses(self, since_id=None):
+        pass
+
+    @abstractmethod
+    async def get_user_statuses(self, user_id, max_id=None, since_id=None):
+        pass
+
+    @abstractmethod
+    async def get_replies(self, since_id=None):
+        pass
+
+    @abstractmethod
+    async def get_follower_ids(self):
+        pass
+
+    @abstractmethod
+    async def get_friend_ids(self):
+        pass
+
+    @abstractmethod
+    async def get_received_messages(self, since_id):
+        pass
+
+    @abstractmethod
+    async def get_sent_messages(self):
+        pass
+
+    @abstractmethod
+    async def get_pending_friend_ids(self):
+        pass
+
+    @abstractmethod
+    async def delete_message(self, message_id):
+        pass
+
+    @abstractmethod
+    async def follow(self, user_id):
+        pass
+
+    @abstractmethod
+    async def remove(self, user_id):
+        pass
+
+    @abstractmethod
+    async def block(self, user_id):
+        pass
+
+    @abstractmethod
+    async def unblock(self, user_id):
+        pass
+
+    @abstractmethod
+    async def post(self, text, url=None, in_reply_to=None):
+        pass
+
+    @abstractmethod
+    async def send(self, text, user_id):
+        pass
+
+
+class ExecutorAsyncMicroblogApi(AsyncMicroblogApi):
+    """
+    An asynchronous microblog API which runs a synchronous MicroblogApi in an executor
+    so that independent calls are sent concurrently.
+    """
+
+    def __init__(self, microblog, executor=None):
+        """
+        Initializes a new instance with the synchronous API
+        and an executor, which is the default executor of the event loop if not specified.
+        """
+
+        self.microblog = microblog
+        self.executor = executor
+
+    async def run(self, function, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(function, *args, **kwargs))
+
+    async def verify_credentials(self):
+        return await self.run(self.microblog.verify_credentials)
+
+    async def get_home_statuses(self, since_id=None):
+        return await self.run(self.microblog.get_home_statuses, since_id)
+
+    async def get_user_statuses(self, user_id, max_id=None, since_id=None):
+        return await self.run(self.microblog.get_user_statuses, user_id, max_id=max_id, since_id=since_id)
+
+    async def get_replies(self, since_id=None):
+        return await self.run(self.microblog.get_replies, since_id)
+
+    async def get_follower_ids(self):
+        return await self.run(self.microblog.get_follower_ids)
+
+    async def get_friend_ids(self):
+        return await self.run(self.microblog.get_friend_ids)
+
+    async def get_received_messages(self, since_id):
+        return await self.run(self.microblog.get_received_messages, since_id)
+
+    async def get_sent_messages(self):
+        return await self.run(self.microblog.get_sent_messages)
+
+    async def get_pending_friend_ids(self):
+        return await self.run(self.microblog.get_pending_friend_ids)
+
+    async def delete_message(self, message_id):
+        return await self.run(self.microblog.delete_message, message_id)
+
+    async def follow(self, user_id):
+        return await self.run(self.microblog.follow, user_id)
+
+    async def remove(self, user_id):
+        return await self.run(self.microblog.remove, user_id)
+
+    async def block(self, user_id):
+        return await self.run(self.microblog.block, user_id)
+
+    async def unblock(self, user_id):
+        return await self.run(self.microblog.unblock, user_id)
+
+    async def post(self, text, url=None, in_reply_to=None):
+        return await self.run(self.microblog.post, text, url, in_reply_to)
+
+    async def send(self, text, user_id):
+        return await self.run(self.microblog.send, text, user_id)
@@ -0,0 +1,60 @@
+"""
+Compact sets of user IDs as sorted arrays of 64-bit integers.
+"""
+
+import array
+import base64
+import bisect
+import itertools
+import operator
+import zlib
+
+
+def to_id_array(pages):
+    """
+    Gets a sorted array of unique IDs from the specified pages of IDs.
+    """
+
+    ids = array.array('q')
+    for page in pages:
+        ids.extend(int(user_id) for user_id in page)
+    return array.array('q', (user_id for (user_id, _) in itertools.groupby(sorted(ids))))
+
+
+def contains(ids, user_id):
+    index = bisect.bisect_left(ids, user_id)
+    return index < len(ids) and ids[index] == user_id
+
+
+def difference(ids, other_ids):
+    """
+    Yields IDs in the sorted array ids but not in the sorted array other_ids.
+    """
+
+    other_index = 0
+    for user_id in ids:
+        while other_index < len(other_ids) and other_ids[other_index] < user_id:
+            other_index += 1
+        if other_index >= len(other_ids) or other_ids[other_index] != user_id:
+            yield user_id
+
+
+def encode(ids):
+    """
+    Encodes the sorted array of IDs into a compact text with deltas compressed.
+    """
+
+    previous_ids = array.array('q', [0])
+    previous_ids.extend(ids[:-1])
+    deltas = array.array('q', map(operator.sub, ids, previous_ids))
+    return base64.b64encode(zlib.compress(deltas.tobytes())).decode('ascii')
+
+
+def decode(text):
+    """
+    Decodes the text encoded by encode into a sorted array of IDs.
+    """
+
+    deltas = array.array('q')
+    deltas.frombytes(zlib.decompress(base64.b64decode(text)))
+    return array.array('q', itertools.accumulate(deltas))
@@ -0,0 +1,54 @@
+import hashlib
+import threading
+import time
+from .microblog_user import MicroblogUser
+
+
+def get_identity_key(*secrets):
+    """
+    Gets a key of the identity authenticated with the specified secrets
+    without keeping the secrets themselves in the store.
+    """
+
+    return hashlib.sha256('\n'.join(secrets).encode('UTF-8')).hexdigest()
+
+
+class IdentityCache:
+    """
+    A cache of authenticated identities which saves verifying credentials on every invocation.
+    """
+
+    def __init__(self, state_store, ttl=7 * 24 * 60 * 60):
+        """
+        Initializes a new instance which keeps identities in the state store for ttl seconds.
+        """
+
+        self.state_store = state_store
+        self.ttl = ttl
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Gets the cached MicroblogUser for the key, or None if it is absent or expired.
+        """
+
+        identity = self.state_store.get('identities', {}).get(key)
+        if not identity or time.time() - identity['verified_at'] >= self.ttl:
+            return None
+        return MicroblogUser(identity['id'], identity['screen_name'])
+
+    def set(self, key, user):
+        with self.lock:
+            identities = dict(self.state_store.get('identities', {}))
+            identities[key] = {
+                'id': user.id,
+                'screen_name': user.screen_name,
+                'verified_at': time.time(),
+            }
+            self.state_store.set('identities', identities)
+
+    def invalidate(self, key):
+        with self.lock:
+            identities = dict(self.state_store.get('identities', {}))
+            if identities.pop(key, None):
+                self.state_store.set('identities', identities)
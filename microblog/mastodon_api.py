@@ -1,33 +1,127 @@
 from mastodon import Mastodon
+from mastodon import MastodonError
+from mastodon import MastodonRatelimitError
+from mastodon import MastodonUnauthorizedError
+from mastodon import StreamListener
+from .identity_cache import get_identity_key
 from .mastodon_user import MastodonUser
+from .microblog_api import AuthenticationError
 from .microblog_api import MicroblogApi
+from .microblog_api import RateLimit
+from .microblog_api import RateLimitError
 from .mastodon_status import Toot
 
 
 class MastodonApi(MicroblogApi):
-    def __init__(self, access_token, api_base_url):
+    home_timeline_limit = 40
+    user_timeline_limit = 40
+    notification_limit = 40
+    # Seconds to wait for an event or a heartbeat, which the server sends every 10 seconds or so.
+    stream_timeout = 60
+
+    def __init__(self, access_token, api_base_url, state_store=None, identity_cache=None):
         assert access_token, 'The access token is mandatory but not set.'
         assert api_base_url, 'The API base URL is mandatory but not set.'
         self.mastodon = Mastodon(access_token=access_token, api_base_url=api_base_url, ratelimit_method='throw')
-        self.credential = MastodonUser(self.mastodon.account_verify_credentials())
+        # The identity is verified lazily and cached in the identity cache if specified.
+        self.credential = None
+        self.identity_cache = identity_cache
+        self.identity_key = get_identity_key(api_base_url, access_token)
+        # An optional store to keep the ID of the last notification replied to between invocations.
+        self.state_store = state_store
+        self.notification_id = self.state_store.get('mastodon_notification_id') if self.state_store else None
+
+    def get_error(self, e):
+        """
+        Gets an exception to raise for the specified Mastodon error.
+        """
+
+        if isinstance(e, MastodonRatelimitError):
+            return RateLimitError(str(e))
+        if isinstance(e, MastodonUnauthorizedError):
+            # The cached identity may be stale if the token has been revoked or replaced.
+            self.credential = None
+            if self.identity_cache:
+                self.identity_cache.invalidate(self.identity_key)
+            return AuthenticationError(str(e))
+        return e
 
     def verify_credentials(self):
+        if self.credential is None and self.identity_cache:
+            self.credential = self.identity_cache.get(self.identity_key)
+        if self.credential is None:
+            try:
+                self.credential = MastodonUser(self.mastodon.account_verify_credentials())
+            except MastodonError as e:
+                raise self.get_error(e) from e
+            if self.identity_cache:
+                self.identity_cache.set(self.identity_key, self.credential)
         return self.credential
 
-    def get_home_statuses(self):
-        return [Toot(toot) for toot in self.mastodon.timeline_home()]
+    def get_home_statuses(self, since_id=None):
+        try:
+            return [Toot(toot) for toot
+                    in self.mastodon.timeline_home(since_id=since_id, limit=self.home_timeline_limit)]
+        except MastodonError as e:
+            raise self.get_error(e) from e
 
-    def get_user_statuses(self, user_id, max_id=None):
-        return [Toot(toot) for toot in self.mastodon.account_statuses(user_id, max_id=max_id)]
+    def get_user_statuses(self, user_id, max_id=None, since_id=None):
+        try:
+            return [Toot(toot) for toot in self.mastodon.account_statuses(
+                user_id, max_id=max_id, since_id=since_id, limit=self.user_timeline_limit)]
+        except MastodonError as e:
+            raise self.get_error(e) from e
 
     def get_replies(self, since_id=None):
-        # since_id cannot be passed to notifications API because it accepts an notification ID,
-        # which is different from a toot ID.
-        # Therefore, retrieve all notifications first then filter them based on the status ID.
-        return [Toot(notification.status)
-                for notification
-                in self.mastodon.notifications()
-                if notification.type == 'mention' and notification.status.id >= since_id]
+        try:
+            return self.get_mentions(since_id)
+        except MastodonError as e:
+            raise self.get_error(e) from e
+
+    def get_mentions(self, since_id=None):
+        # since_id of notifications API is a notification ID, which is different from a toot ID.
+        # Therefore, retrieve mentions since the last notification replied to
+        # then filter them based on the status ID.
+        notifications = []
+        page = self.mastodon.notifications(
+            since_id=self.notification_id, types=['mention'], limit=self.notification_limit)
+        while page:
+            # Pages after the first one are not limited by since_id.
+            new_notifications = [notification for notification in page
+                                 if self.notification_id is None or int(notification.id) > self.notification_id]
+            notifications += new_notifications
+            # Only the latest page is retrieved without the cursor.
+            if self.notification_id is None or len(new_notifications) < self.notification_limit:
+                break
+            page = self.mastodon.fetch_next(page)
+
+        return [Toot(notification.status, int(notification.id))
+                for notification in notifications
+                if notification.type == 'mention' and (since_id is None or int(notification.status.id) >= since_id)]
+
+    def mark_replied(self, status):
+        if status.notification_id is None:
+            return
+        if self.notification_id is None or status.notification_id > self.notification_id:
+            self.notification_id = status.notification_id
+            if self.state_store:
+                self.state_store.set('mastodon_notification_id', self.notification_id)
+
+    def stream_replies(self, on_reply, on_connect=None):
+        class ReplyListener(StreamListener):
+            def handle_stream(self, response):
+                if on_connect:
+                    on_connect()
+                super().handle_stream(response)
+
+            def on_notification(self, notification):
+                if notification.type == 'mention' and notification.status:
+                    on_reply(Toot(notification.status, int(notification.id)))
+
+        try:
+            self.mastodon.stream_user(ReplyListener(), timeout=self.stream_timeout)
+        except MastodonError as e:
+            raise self.get_error(e) from e
 
     def get_received_messages(self, since_id):
         return []
@@ -35,11 +129,26 @@ class MastodonApi(MicroblogApi):
     def get_sent_messages(self):
         return []
 
+    def iter_id_pages(self, get_accounts):
+        try:
+            accounts = get_accounts(self.verify_credentials().id, limit=80)
+            while accounts:
+                yield [int(account.id) for account in accounts]
+                accounts = self.mastodon.fetch_next(accounts)
+        except MastodonError as e:
+            raise self.get_error(e) from e
+
+    def iter_follower_id_pages(self):
+        return self.iter_id_pages(self.mastodon.account_followers)
+
+    def iter_friend_id_pages(self):
+        return self.iter_id_pages(self.mastodon.account_following)
+
     def get_follower_ids(self):
-        return set([follower.id for follower in self.mastodon.account_followers(self.credential.id)])
+        return set(user_id for page in self.iter_follower_id_pages() for user_id in page)
 
     def get_friend_ids(self):
-        return set([followee.id for followee in self.mastodon.account_following(self.credential.id)])
+        return set(user_id for page in self.iter_friend_id_pages() for user_id in page)
 
     def get_pending_friend_ids(self):
         return set([])
@@ -47,11 +156,24 @@ class MastodonApi(MicroblogApi):
     def delete_message(self, message_id):
         pass
 
+    def get_rate_limit(self, action):
+        # Mastodon shares a single rate limit among all the endpoints.
+        return RateLimit(
+            self.mastodon.ratelimit_limit,
+            self.mastodon.ratelimit_remaining,
+            self.mastodon.ratelimit_reset)
+
     def follow(self, user_id):
-        self.mastodon.account_follow(user_id)
+        try:
+            self.mastodon.account_follow(user_id)
+        except MastodonError as e:
+            raise self.get_error(e) from e
 
     def remove(self, user_id):
-        self.mastodon.account_unfollow(user_id)
+        try:
+            self.mastodon.account_unfollow(user_id)
+        except MastodonError as e:
+            raise self.get_error(e) from e
 
     def block(self, user_id):
         self.mastodon.account_block(user_id)
@@ -61,10 +183,13 @@ class MastodonApi(MicroblogApi):
 
     def post(self, text, url=None, in_reply_to=None):
         text = (text + '\n' + url) if url else text
-        if in_reply_to:
-            self.mastodon.status_reply(in_reply_to.dict, text)
-        else:
-            self.mastodon.status_post(text, visibility='unlisted')
+        try:
+            if in_reply_to:
+                self.mastodon.status_reply(in_reply_to.dict, text)
+            else:
+                self.mastodon.status_post(text, visibility='unlisted')
+        except MastodonError as e:
+            raise self.get_error(e) from e
 
     def send(self, text, user_id):
         pass
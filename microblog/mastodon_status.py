@@ -7,9 +7,12 @@ class Toot(microblog_status.MicroblogStatus):
     A class which represents a toot on Mastodon.
     """
 
-    def __init__(self, toot_dict):
+    __slots__ = ('dict', 'notification_id')
+
+    def __init__(self, toot_dict, notification_id=None):
         """
-        Initializes a new Toot instance from a toot dict.
+        Initializes a new Toot instance from a toot dict
+        and the ID of the notification which it is retrieved from if any.
         Cf. https://mastodonpy.readthedocs.io/en/stable/#toot-dicts
         """
 
@@ -22,3 +25,4 @@ class Toot(microblog_status.MicroblogStatus):
             in_reply_to_user_id=toot_dict.in_reply_to_account_id)
 
         self.dict = toot_dict
+        self.notification_id = notification_id
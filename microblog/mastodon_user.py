@@ -2,6 +2,8 @@ from . import microblog_user
 
 
 class MastodonUser(microblog_user.MicroblogUser):
+    __slots__ = ()
+
     def __init__(self, user_dict):
         """
         Initializes a new instance of MastodonUser class from a user dict.
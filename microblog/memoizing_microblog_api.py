@@ -0,0 +1,173 @@
+import threading
+from .microblog_api import MicroblogApi
+
+# Reads whose results may change by each kind of mutation.
+FRIENDSHIP_READS = ('get_friend_ids', 'get_follower_ids', 'get_pending_friend_ids', 'get_home_statuses')
+MESSAGE_READS = ('get_received_messages', 'get_sent_messages')
+
+
+def copy_result(result):
+    # Callers may modify lists and sets of statuses and IDs.
+    if isinstance(result, (list, set, dict)):
+        return result.copy()
+    return result
+
+
+class MemoizingMicroblogApi(MicroblogApi):
+    """
+    A microblog API which memoizes reads of another one by the method and the arguments.
+    It is meant to live for a single run, so entries never expire
+    but those which a mutation may change are invalidated.
+    """
+
+    def __init__(self, microblog, logger=None):
+        """
+        Initializes a new instance which logs the number of saved calls by the logger if specified.
+        """
+
+        super().__init__()
+        self.microblog = microblog
+        self.logger = logger
+        self.lock = threading.Lock()
+        self.results = {}
+        self.call_count = 0
+        self.saved_call_count = 0
+
+    @property
+    def home_timeline_limit(self):
+        return self.microblog.home_timeline_limit
+
+    @property
+    def user_timeline_limit(self):
+        return self.microblog.user_timeline_limit
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Logs the number of saved calls and clears the memoized results.
+        """
+
+        if self.logger:
+            self.logger.debug(
+                'Saved %d of %d reads of the microblog API.',
+                self.saved_call_count,
+                self.saved_call_count + self.call_count)
+        with self.lock:
+            self.results.clear()
+
+    def memoize(self, name, args, function):
+        """
+        Gets the memoized result of the method with the arguments or calls the function to get it.
+        Results are not memoized when the function raises an error.
+        """
+
+        key = (name, args)
+        with self.lock:
+            if key in self.results:
+                self.saved_call_count += 1
+                return copy_result(self.results[key])
+            self.call_count += 1
+
+        result = function(*args)
+        with self.lock:
+            self.results[key] = result
+        return copy_result(result)
+
+    def invalidate(self, *names, user_id=None):
+        """
+        Drops results of the specified methods,
+        only for the user if the first argument of the method is a user ID.
+        """
+
+        with self.lock:
+            self.results = {
+                (name, args): result
+                for ((name, args), result) in self.results.items()
+                if name not in names or (user_id is not None and args[0] != user_id)}
+
+    def verify_credentials(self):
+        return self.memoize('verify_credentials', (), self.microblog.verify_credentials)
+
+    def get_home_statuses(self, since_id=None):
+        return self.memoize('get_home_statuses', (since_id,), self.microblog.get_home_statuses)
+
+    def get_user_statuses(self, user_id, max_id=None, since_id=None):
+        return self.memoize('get_user_statuses', (user_id, max_id, since_id), self.microblog.get_user_statuses)
+
+    def get_replies(self, since_id=None):
+        return self.memoize('get_replies', (since_id,), self.microblog.get_replies)
+
+    def get_follower_ids(self):
+        return self.memoize('get_follower_ids', (), self.microblog.get_follower_ids)
+
+    def get_friend_ids(self):
+        return self.memoize('get_friend_ids', (), self.microblog.get_friend_ids)
+
+    def get_rate_limit(self, action):
+        return self.microblog.get_rate_limit(action)
+
+    def iter_follower_id_pages(self):
+        return self.microblog.iter_follower_id_pages()
+
+    def iter_friend_id_pages(self):
+        return self.microblog.iter_friend_id_pages()
+
+    def mark_replied(self, status):
+        self.microblog.mark_replied(status)
+        self.invalidate('get_replies')
+
+    def stream_replies(self, on_reply, on_connect=None):
+        return self.microblog.stream_replies(on_reply, on_connect)
+
+    def get_received_messages(self, since_id):
+        return self.memoize('get_received_messages', (since_id,), self.microblog.get_received_messages)
+
+    def get_sent_messages(self):
+        return self.memoize('get_sent_messages', (), self.microblog.get_sent_messages)
+
+    def get_pending_friend_ids(self):
+        return self.memoize('get_pending_friend_ids', (), self.microblog.get_pending_friend_ids)
+
+    def delete_message(self, message_id):
+        result = self.microblog.delete_message(message_id)
+        self.invalidate(*MESSAGE_READS)
+        return result
+
+    def follow(self, user_id):
+        result = self.microblog.follow(user_id)
+        self.invalidate(*FRIENDSHIP_READS)
+        return result
+
+    def remove(self, user_id):
+        result = self.microblog.remove(user_id)
+        self.invalidate(*FRIENDSHIP_READS)
+        return result
+
+    def block(self, user_id):
+        result = self.microblog.block(user_id)
+        self.invalidate(*FRIENDSHIP_READS, 'get_replies')
+        return result
+
+    def unblock(self, user_id):
+        result = self.microblog.unblock(user_id)
+        self.invalidate(*FRIENDSHIP_READS)
+        return result
+
+    def post(self, text, url=None, in_reply_to=None):
+        result = self.microblog.post(text, url, in_reply_to)
+        # Only statuses of this account change if it is known.
+        with self.lock:
+            credential = self.results.get(('verify_credentials', ()))
+        self.invalidate('get_user_statuses', user_id=credential.id if credential else None)
+        self.invalidate('get_home_statuses')
+        return result
+
+    def send(self, text, user_id):
+        result = self.microblog.send(text, user_id)
+        self.invalidate(*MESSAGE_READS)
+        return result
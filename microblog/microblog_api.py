@@ -1,10 +1,33 @@
 #!/usr/bin/env python3
 
+import collections
 from abc import ABC
 from abc import abstractmethod
 
+# A rate limit state with the reset time in seconds since the epoch.
+RateLimit = collections.namedtuple('RateLimit', ['limit', 'remaining', 'reset'])
+
+
+class RateLimitError(Exception):
+    """
+    An error raised when a request is rejected by the rate limit.
+    """
+    pass
+
+
+class AuthenticationError(Exception):
+    """
+    An error raised when a request is rejected because the credentials are invalid.
+    """
+    pass
+
 
 class MicroblogApi(ABC):
+    # The maximum number of statuses returned by get_home_statuses, or None if unlimited.
+    home_timeline_limit = None
+    # The maximum number of statuses returned by get_user_statuses, or None if unlimited.
+    user_timeline_limit = None
+
     def __init__(self):
         pass
 
@@ -13,11 +36,11 @@ class MicroblogApi(ABC):
         pass
 
     @abstractmethod
-    def get_home_statuses(self):
+    def get_home_statuses(self, since_id=None):
         pass
 
     @abstractmethod
-    def get_user_statuses(self, user_id, max_id=None):
+    def get_user_statuses(self, user_id, max_id=None, since_id=None):
         pass
 
     @abstractmethod
@@ -32,6 +55,44 @@ class MicroblogApi(ABC):
     def get_friend_ids(self):
         pass
 
+    def get_rate_limit(self, action):
+        """
+        Gets the RateLimit of the specified action such as 'follow' and 'remove',
+        or None if it is unknown.
+        """
+        return None
+
+    def iter_follower_id_pages(self):
+        """
+        Yields pages of follower IDs.
+        Backends which support paging override this to stream large follower lists.
+        """
+        yield self.get_follower_ids()
+
+    def iter_friend_id_pages(self):
+        """
+        Yields pages of friend IDs.
+        Backends which support paging override this to stream large friend lists.
+        """
+        yield self.get_friend_ids()
+
+    def mark_replied(self, status):
+        """
+        Notifies that a reply has been sent to the specified status
+        so that backends can advance their cursor of replies.
+        """
+        pass
+
+    def stream_replies(self, on_reply, on_connect=None):
+        """
+        Calls on_reply with each reply as it arrives until the stream is closed.
+        on_connect is called once the stream is connected
+        so that replies received while disconnected can be retrieved.
+        Raises an exception if the stream is disconnected by an error.
+        Backends which support streaming override this.
+        """
+        raise NotImplementedError('Streaming replies is not supported.')
+
     @abstractmethod
     def get_received_messages(self, since_id):
         pass
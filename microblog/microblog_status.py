@@ -3,6 +3,9 @@ from .microblog_user import MicroblogUser
 
 
 class MicroblogStatus(object):
+    # Statuses are created by hundreds per page, so keep them compact without __dict__.
+    __slots__ = ('id', 'text', 'user', '_created_at', 'in_reply_to_status_id', 'in_reply_to_user_id')
+
     def __init__(
             self,
             id: str,
@@ -11,12 +14,25 @@ class MicroblogStatus(object):
             created_at: datetime.datetime,
             in_reply_to_status_id: str,
             in_reply_to_user_id: str):
+        """
+        Initializes a new instance.
+        created_at can be None only if a subclass defines decode_created_at() to decode it lazily.
+        """
 
-        assert type(created_at) == datetime.datetime, 'created_at is not a datetime object.'
+        if created_at is None:
+            assert hasattr(self, 'decode_created_at'), 'created_at is not set.'
+        else:
+            assert isinstance(created_at, datetime.datetime), 'created_at is not a datetime object.'
 
         self.id: str = id
         self.text: str = text
         self.user: MicroblogUser = user
-        self.created_at: datetime.datetime = created_at
+        self._created_at: datetime.datetime = created_at
         self.in_reply_to_status_id: str = in_reply_to_status_id
         self.in_reply_to_user_id: str = in_reply_to_user_id
+
+    @property
+    def created_at(self) -> datetime.datetime:
+        if self._created_at is None:
+            self._created_at = self.decode_created_at()
+        return self._created_at
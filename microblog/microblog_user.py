@@ -1,4 +1,6 @@
 class MicroblogUser(object):
+    __slots__ = ('id', 'screen_name')
+
     def __init__(self, id: str, screen_name: str):
         self.id: str = id
         self.screen_name: str = screen_name
@@ -1,9 +1,23 @@
 import twitter
 from . import microblog_api
 from . import twitter_user
+from .identity_cache import get_identity_key
 from .twitter_status import Tweet
 
 
+# Error codes of rate limit exceeded and follow limit exceeded.
+# Cf. https://developer.twitter.com/en/support/twitter-api/error-troubleshooting
+RATE_LIMIT_ERROR_CODES = {88, 161}
+
+# Error codes of authentication failure and invalid or expired token.
+AUTHENTICATION_ERROR_CODES = {32, 89}
+
+ACTION_URLS = {
+    'follow': 'https://api.twitter.com/1.1/friendships/create.json',
+    'remove': 'https://api.twitter.com/1.1/friendships/destroy.json',
+}
+
+
 def compose(status, max_length, screen_name=None, url=None):
     """
     Composes the status message with a screen name to reply and a URI (if any).
@@ -53,12 +67,16 @@ def get_tweets(tweets):
 
 
 class TwitterApi(microblog_api.MicroblogApi):
+    home_timeline_limit = 200
+    user_timeline_limit = 200
+
     def __init__(
             self,
             consumer_key,
             consumer_secret,
             access_token,
-            access_token_secret):
+            access_token_secret,
+            identity_cache=None):
         assert consumer_key, 'The consumer key is mandatory but not set.'
         assert consumer_secret, 'The consumer secret is mandatory but not set.'
         assert access_token, 'The access token is mandatory but not set.'
@@ -68,6 +86,10 @@ class TwitterApi(microblog_api.MicroblogApi):
             consumer_secret,
             access_token,
             access_token_secret)
+        # The identity is verified lazily and cached in the identity cache if specified.
+        self.credential = None
+        self.identity_cache = identity_cache
+        self.identity_key = get_identity_key(consumer_key, access_token)
 
     def get_error_message(self, e):
         message = '"'
@@ -76,26 +98,63 @@ class TwitterApi(microblog_api.MicroblogApi):
         message += str(vars(self.twitter.rate_limit))
         return message
 
-    def verify_credentials(self):
-        return twitter_user.TwitterUser(self.twitter.VerifyCredentials())
+    def get_error(self, e):
+        """
+        Gets an exception to raise for the specified Twitter error.
+        """
+
+        messages = e.message if isinstance(e.message, list) else [e.message]
+        codes = [message.get('code') for message in messages if isinstance(message, dict)]
+        if set(codes) & RATE_LIMIT_ERROR_CODES:
+            return microblog_api.RateLimitError(self.get_error_message(e))
+        if set(codes) & AUTHENTICATION_ERROR_CODES:
+            # The cached identity may be stale if the token has been revoked or replaced.
+            self.credential = None
+            if self.identity_cache:
+                self.identity_cache.invalidate(self.identity_key)
+            return microblog_api.AuthenticationError(self.get_error_message(e))
+        return Exception(self.get_error_message(e))
+
+    def get_rate_limit(self, action):
+        url = ACTION_URLS.get(action)
+        if not url or not self.twitter.rate_limit:
+            return None
+        rate_limit = self.twitter.rate_limit.get_limit(url)
+        # python-twitter returns a dummy limit with no reset time for endpoints without rate limit headers.
+        if not rate_limit.reset:
+            return None
+        return microblog_api.RateLimit(rate_limit.limit, rate_limit.remaining, rate_limit.reset)
 
-    def get_home_statuses(self):
+    def verify_credentials(self):
+        if self.credential is None and self.identity_cache:
+            self.credential = self.identity_cache.get(self.identity_key)
+        if self.credential is None:
+            try:
+                self.credential = twitter_user.TwitterUser(self.twitter.VerifyCredentials())
+            except twitter.error.TwitterError as e:
+                raise self.get_error(e)
+            if self.identity_cache:
+                self.identity_cache.set(self.identity_key, self.credential)
+        return self.credential
+
+    def get_home_statuses(self, since_id=None):
         try:
-            return get_tweets(self.twitter.GetHomeTimeline(count=200))
+            return get_tweets(self.twitter.GetHomeTimeline(count=self.home_timeline_limit, since_id=since_id))
         except twitter.error.TwitterError as e:
-            raise Exception(self.get_error_message(e))
+            raise self.get_error(e)
 
-    def get_user_statuses(self, user_id, max_id=None):
+    def get_user_statuses(self, user_id, max_id=None, since_id=None):
         try:
-            return get_tweets(self.twitter.GetUserTimeline(user_id=user_id, max_id=max_id, count=200))
+            return get_tweets(self.twitter.GetUserTimeline(
+                user_id=user_id, since_id=since_id, max_id=max_id, count=self.user_timeline_limit))
         except twitter.error.TwitterError as e:
-            raise Exception(self.get_error_message(e))
+            raise self.get_error(e)
 
     def get_replies(self, since_id=None):
         try:
             return get_tweets(self.twitter.GetMentions(since_id=since_id))
         except twitter.error.TwitterError as e:
-            raise Exception(self.get_error_message(e))
+            raise self.get_error(e)
 
     def get_received_messages(self, since_id):
         # python-twitter hasn't followed changes
@@ -109,23 +168,32 @@ class TwitterApi(microblog_api.MicroblogApi):
         # Disable direct message interactions until the library gets updated.
         return []
 
+    def iter_id_pages(self, get_ids_paged):
+        cursor = -1
+        while cursor:
+            try:
+                (cursor, previous_cursor, ids) = get_ids_paged(cursor=cursor, count=5000)
+            except twitter.error.TwitterError as e:
+                raise self.get_error(e)
+            yield ids
+
+    def iter_follower_id_pages(self):
+        return self.iter_id_pages(self.twitter.GetFollowerIDsPaged)
+
+    def iter_friend_id_pages(self):
+        return self.iter_id_pages(self.twitter.GetFriendIDsPaged)
+
     def get_follower_ids(self):
-        try:
-            return set(self.twitter.GetFollowerIDs(count=5000))
-        except twitter.error.TwitterError as e:
-            raise Exception(self.get_error_message(e))
+        return set(user_id for page in self.iter_follower_id_pages() for user_id in page)
 
     def get_friend_ids(self):
-        try:
-            return set(self.twitter.GetFriendIDs(count=5000))
-        except twitter.error.TwitterError as e:
-            raise Exception(self.get_error_message(e))
+        return set(user_id for page in self.iter_friend_id_pages() for user_id in page)
 
     def get_pending_friend_ids(self):
         try:
             return set(self.twitter.OutgoingFriendship())
         except twitter.error.TwitterError as e:
-            raise Exception(self.get_error_message(e))
+            raise self.get_error(e)
 
     def delete_message(self, message_id):
         # python-twitter hasn't followed changes
@@ -137,25 +205,25 @@ class TwitterApi(microblog_api.MicroblogApi):
         try:
             self.twitter.CreateFriendship(user_id)
         except twitter.error.TwitterError as e:
-            raise Exception(self.get_error_message(e))
+            raise self.get_error(e)
 
     def remove(self, user_id):
         try:
             self.twitter.DestroyFriendship(user_id)
         except twitter.error.TwitterError as e:
-            raise Exception(self.get_error_message(e))
+            raise self.get_error(e)
 
     def block(self, user_id):
         try:
             self.twitter.CreateBlock(user_id=user_id)
         except twitter.error.TwitterError as e:
-            raise Exception(self.get_error_message(e))
+            raise self.get_error(e)
 
     def unblock(self, user_id):
         try:
             self.twitter.DestroyBlock(user_id=user_id)
         except twitter.error.TwitterError as e:
-            raise Exception(self.get_error_message(e))
+            raise self.get_error(e)
 
     def post(self, text, url=None, in_reply_to=None):
         try:
@@ -166,7 +234,7 @@ class TwitterApi(microblog_api.MicroblogApi):
                 text = compose(text, 280, None, url)
                 self.twitter.PostUpdate(text)
         except twitter.error.TwitterError as e:
-            raise Exception(self.get_error_message(e))
+            raise self.get_error(e)
 
     def send(self, text, user_id):
         # python-twitter hasn't followed changes
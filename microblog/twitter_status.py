@@ -1,14 +1,20 @@
+import calendar
 import datetime
+import email.utils
 import pytz
 from . import microblog_status
 from . import twitter_user
 
+TIMEZONE = pytz.timezone('Asia/Tokyo')
+
 
 class Tweet(microblog_status.MicroblogStatus):
     """
     A class which represents a tweet or a message on Twitter.
     """
 
+    __slots__ = ('created_at_text',)
+
     def __init__(self, tweet_object):
         """
         Initializes a new Tweet instance from a Tweet object.
@@ -19,8 +25,14 @@ class Tweet(microblog_status.MicroblogStatus):
             id=tweet_object.id,
             text=tweet_object.text,
             user=twitter_user.TwitterUser(tweet_object.user),
-            created_at=datetime.datetime.fromtimestamp(
-                tweet_object.created_at_in_seconds,
-                tz=pytz.timezone('Asia/Tokyo')),
+            created_at=None,
             in_reply_to_status_id=tweet_object.in_reply_to_status_id,
             in_reply_to_user_id=tweet_object.in_reply_to_user_id)
+
+        # Parsing the date is deferred since most statuses are read only for their texts.
+        self.created_at_text = tweet_object.created_at
+
+    def decode_created_at(self):
+        return datetime.datetime.fromtimestamp(
+            calendar.timegm(email.utils.parsedate(self.created_at_text)),
+            tz=TIMEZONE)
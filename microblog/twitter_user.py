@@ -2,6 +2,8 @@ from . import microblog_user
 
 
 class TwitterUser(microblog_user.MicroblogUser):
+    __slots__ = ()
+
     def __init__(self, user_object):
         """
         Initializes a new instance of TwitterUser class from a User object.
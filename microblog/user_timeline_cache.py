@@ -0,0 +1,104 @@
+import collections
+import datetime
+import json
+import sqlite3
+import threading
+from text_normalization import normalize_text
+
+# A compact status with the normalized text.
+CachedStatus = collections.namedtuple('CachedStatus', ['id', 'text', 'created_at'])
+
+
+def get_cached_status(status):
+    """
+    Gets a compact status from the specified status.
+    """
+
+    created_at = status.created_at
+    if not created_at.tzinfo:
+        created_at = created_at.replace(tzinfo=datetime.timezone.utc)
+    # Only texts for key phrases are kept without HTML elements, mentions and URLs.
+    return CachedStatus(status.id, normalize_text(status.text), created_at)
+
+
+class UserTimelineCache:
+    """
+    A cache of user timelines which retrieves only statuses newer than the cached ones.
+    """
+
+    def __init__(self, microblog, path=None, max_count=200, max_age=7 * 24 * 60 * 60):
+        """
+        Initializes a new instance which keeps at most max_count statuses
+        sent within max_age seconds for each user.
+        The cached timelines are saved in the SQLite database at the path if specified,
+        where each user has its own row so that a lookup rewrites only the timeline of the user.
+        """
+
+        self.microblog = microblog
+        self.max_count = max_count
+        self.max_age = datetime.timedelta(seconds=max_age)
+        self.lock = threading.Lock()
+        self.timelines = {}
+        self.connection = None
+        if path:
+            self.connection = sqlite3.connect(path, check_same_thread=False)
+            with self.connection:
+                self.connection.execute(
+                    'CREATE TABLE IF NOT EXISTS timelines (user_id TEXT PRIMARY KEY, statuses TEXT, updated_at REAL)')
+
+    def load(self, key):
+        if key not in self.timelines and self.connection:
+            row = self.connection.execute('SELECT statuses FROM timelines WHERE user_id = ?', (key,)).fetchone()
+            if row:
+                self.timelines[key] = [
+                    CachedStatus(status_id, text, datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc))
+                    for (status_id, text, timestamp) in json.loads(row[0])]
+        return self.timelines.get(key, [])
+
+    def save(self, key, statuses, now):
+        if self.connection:
+            with self.connection:
+                self.connection.execute(
+                    'INSERT OR REPLACE INTO timelines VALUES (?, ?, ?)',
+                    (key,
+                     json.dumps([[status.id, status.text, status.created_at.timestamp()] for status in statuses],
+                                ensure_ascii=False),
+                     statuses[0].created_at.timestamp() if statuses else 0))
+                # Evict users whose statuses are all expired.
+                self.connection.execute(
+                    'DELETE FROM timelines WHERE updated_at < ?', ((now - self.max_age).timestamp(),))
+
+    def get_statuses(self, user_id):
+        """
+        Gets recent statuses of the specified user in the reverse chronological order.
+        """
+
+        key = str(user_id)
+        with self.lock:
+            cached_statuses = self.load(key)
+
+        since_id = cached_statuses[0].id if cached_statuses else None
+        new_statuses = [get_cached_status(status)
+                        for status in self.microblog.get_user_statuses(user_id, since_id=since_id)]
+        limit = self.microblog.user_timeline_limit
+        if len(new_statuses) >= self.max_count or (limit is not None and len(new_statuses) >= limit):
+            # There may be a gap between the new statuses and the cached ones.
+            cached_statuses = []
+
+        now = datetime.datetime.now(datetime.timezone.utc)
+        statuses = [status for status in new_statuses + cached_statuses
+                    if now - status.created_at <= self.max_age][:self.max_count]
+
+        with self.lock:
+            changed = statuses != self.timelines.get(key, [])
+            self.timelines[key] = statuses
+            # Evict users whose statuses are all expired.
+            self.timelines = {
+                user_id: user_statuses
+                for (user_id, user_statuses) in self.timelines.items()
+                if user_statuses and now - user_statuses[0].created_at <= self.max_age}
+            # Save only when the timeline changes not to rewrite it for each lookup.
+            if changed:
+                self.save(key, statuses, now)
+
+        return statuses
@@ -4,13 +4,29 @@
 This is a module to operate Nagato bot.
 """
 
+import concurrent.futures
 import datetime
 import logging
 import os
 import pytz
 import random
 import re
+import time
 import urllib
+from book_search.book_ranking import rank_books
+from daemon_executor import DaemonThreadPoolExecutor
+from intent_router import IntentRouter
+from microblog import id_set
+from phrase_pool import PhrasePool
+from text_normalization import prepare_text
+from timeline_speed import TimelineSpeedEstimator
+
+BOOK_RECOMMENDATION_PATTERN = \
+    '((お|御|オ)(勧|薦|すす|奨|スス)(め|メ)の|(面白|オモシロ|おもしろ)(い|イ))(図書|本|書籍|書物)'
+GREETING_PATTERN = '(お(はよ|やすみ)|(こん(にち|ばん)[は|わ]))'
+TIMELINE_SPEED_PATTERN = '流速'
+# Avoid repeating the same phrase in consecutive responses.
+PHRASE_POOL = PhrasePool(os.path.join(os.path.dirname(__file__), 'phrases.txt'), recent_count=16)
 
 
 def ara2kan(ara):
@@ -65,31 +81,18 @@ def get_greeting():
     return status
 
 
-def is_book_recommendation_request(text):
+def create_intent_router():
     """
-    Returns true if the specified text requests a book recommendation.
+    Creates an intent router with the built-in intents in the order of precedence.
     """
 
-    book_re = '((お|御|オ)(勧|薦|すす|奨|スス)(め|メ)の|(面白|オモシロ|おもしろ)(い|イ))(図書|本|書籍|書物)'
-    return not re.search(book_re, text) is None
-
-
-def is_greeting_request(text):
-    """
-    Returns true if the specified text is a greeting.
-    """
-
-    greeting_re = '(お(はよ|やすみ)|(こん(にち|ばん)[は|わ]))'
-    return not re.search(greeting_re, text) is None
-
-
-def is_timeline_speed_request(text):
-    """
-    Returns true if the specified text requests the home timeline speed.
-    """
-
-    tlspeed_re = '流速'
-    return not re.search(tlspeed_re, text) is None
+    intent_router = IntentRouter()
+    intent_router.register('book_recommendation', BOOK_RECOMMENDATION_PATTERN)
+    intent_router.register('greeting', GREETING_PATTERN)
+    intent_router.register('timeline_speed', TIMELINE_SPEED_PATTERN)
+    # Compile the patterns before responses are generated concurrently.
+    intent_router.compile()
+    return intent_router
 
 
 def is_url(text):
@@ -103,14 +106,50 @@ def is_url(text):
         return False
 
 
+def get_next_key_phrase_indice(key_phrase_indice, result_count, key_phrase_count):
+    """
+    Gets indice of the key phrase combination to search next
+    based on the number of results for the current combination,
+    or None if the search should stop.
+    """
+
+    key_phrase_indice = list(key_phrase_indice)
+    if result_count == 0:
+        # Not found
+        if key_phrase_indice[-1] < key_phrase_count - 1:
+            # Go ahead
+            key_phrase_indice[-1] += 1
+        elif len(key_phrase_indice) > 1:
+            # Go up
+            key_phrase_indice = key_phrase_indice[:-1]
+            if key_phrase_indice[-1] < key_phrase_count - 1:
+                key_phrase_indice[-1] += 1
+            else:
+                return None
+        else:
+            # No way
+            return None
+    elif result_count == 1:
+        # Only one
+        return None
+    else:
+        # Many
+        if key_phrase_indice[-1] < key_phrase_count - 1:
+            # More keywords
+            key_phrase_indice += [key_phrase_indice[-1] + 1]
+        else:
+            # No way
+            return None
+
+    return key_phrase_indice
+
+
 def get_random_phrase():
     """
     Gets a random phrase from the phrase text file.
     """
 
-    phrase_file = os.path.join(os.path.dirname(__file__), 'phrases.txt')
-    with open(phrase_file, mode='r', encoding='utf-8') as phrase_text:
-        return random.choice(phrase_text.readlines()).strip()
+    return PHRASE_POOL.choice()
 
 
 class Nagato(object):
@@ -118,11 +157,25 @@ class Nagato(object):
     A class for Nagato bot.
     """
 
-    def __init__(self, microblog, book_search, keyword_extraction):
-
+    def __init__(
+            self,
+            microblog,
+            book_search,
+            keyword_extraction,
+            max_workers=1,
+            state_store=None,
+            search_concurrency=1,
+            search_max_queries=None,
+            search_time_limit=None,
+            timeline_cache=None,
+            action_scheduler=None,
+            search_rerank_results=None,
+            key_phrase_cache=None,
+            key_phrase_max_bytes=8192):
+
+        # The book search and the keyword extraction can be None
+        # for operations which do not respond to users such as refollowing.
         assert microblog
-        assert book_search
-        assert keyword_extraction
 
         self.logger = self.getLogger()
         # Since AWS Lambda may reuse the same function instance,
@@ -136,53 +189,144 @@ class Nagato(object):
         self.book_search = book_search
         self.keyword_extraction = keyword_extraction
         self.microblog = microblog
-        self.credential = self.microblog.verify_credentials()
-        self.tlspeed = 0
+        # The number of threads to generate responses concurrently.
+        self.max_workers = max(max_workers, 1)
+        # An optional store to keep the state between invocations.
+        self.state_store = state_store
+        # Seconds to reuse the snapshot of friends instead of retrieving them.
+        self.friend_snapshot_ttl = 24 * 60 * 60
+        self.timeline_speed = TimelineSpeedEstimator.from_dict(
+            self.state_store.get('timeline_speed') if self.state_store else None)
+        # Seconds to answer the timeline speed without counting new statuses.
+        self.timeline_speed_ttl = 5 * 60
+        # The number of book searches sent concurrently for a recommendation
+        # and the query budget and the time limit in seconds of a recommendation.
+        self.search_concurrency = max(search_concurrency, 1)
+        self.search_max_queries = search_max_queries
+        self.search_time_limit = search_time_limit
+        # The number of hits to fetch for each of the top key phrases to rank books locally
+        # instead of narrowing down combinations of key phrases if specified.
+        self.search_rerank_results = search_rerank_results
+        self.search_rerank_queries = 2
+        # An optional cache of user timelines to retrieve only new statuses.
+        self.timeline_cache = timeline_cache
+        # The maximum size in bytes of texts to extract key phrases from.
+        self.key_phrase_max_bytes = key_phrase_max_bytes
+        # An optional cache to reuse key phrases while user timelines barely change.
+        self.key_phrase_cache = key_phrase_cache
+        # An optional scheduler to send follow and remove actions within rate limits.
+        self.action_scheduler = action_scheduler
+        # Responders which return the status text and URL for each intent.
+        # Register a pattern to the intent router and a responder here to add an intent.
+        self.intent_router = create_intent_router()
+        self.intent_responders = {
+            'book_recommendation': lambda user_id, text: self.getBookRecommendation(user_id),
+            'greeting': lambda user_id, text: (get_greeting(), None),
+            'timeline_speed': lambda user_id, text: ('流速 %d' % self.getTimelineSpeed(), None),
+        }
+
+    @property
+    def credential(self):
+        """
+        The user of this account, which is verified lazily by the microblog API
+        since operations such as posting do not need it.
+        """
+
+        return self.microblog.verify_credentials()
 
     def getLogger(self):
         return logging.getLogger(__name__)
 
+    def getHomeStatuses(self, since_id=None):
+        """
+        Gets statuses in the home timeline
+        and lets the keyword extractor learn them as samples of general texts.
+        """
+
+        statuses = self.microblog.get_home_statuses(since_id)
+        if self.keyword_extraction:
+            self.keyword_extraction.learn([status.text for status in statuses])
+        return statuses
+
+    def updateTimelineSpeed(self, statuses=None):
+        """
+        Counts statuses posted to the home timeline since the last update.
+        The statuses retrieved since timeline_speed.last_id can be specified
+        instead of retrieving them.
+        """
+
+        since_id = self.timeline_speed.last_id
+        if statuses is None:
+            statuses = self.getHomeStatuses(since_id)
+        elif self.keyword_extraction:
+            self.keyword_extraction.learn([status.text for status in statuses])
+        self.logger.debug('Retrieved %d new statuses in the home timeline.', len(statuses))
+        # A full page may not reach the statuses counted last time.
+        limit = self.microblog.home_timeline_limit
+        contiguous = since_id is not None and (limit is None or len(statuses) < limit)
+        self.timeline_speed.update(statuses, contiguous)
+        if self.state_store:
+            self.state_store.set('timeline_speed', self.timeline_speed.to_dict())
+
     def getTimelineSpeed(self):
         """
-        Gets the number of statues in the home timeline per second.
+        Gets the number of statues in the home timeline per hour.
         """
 
-        if not self.tlspeed:
-            statuses = self.microblog.get_home_statuses()
-            timestamps = [status.created_at for status in statuses]
-            spent = max((max(timestamps) - min(timestamps)).total_seconds(), 1)
-            self.tlspeed = len(statuses) * 3600 / spent
-        return self.tlspeed
+        # Operations other than run() may not update the timeline speed periodically.
+        if self.timeline_speed.is_stale(self.timeline_speed_ttl):
+            self.updateTimelineSpeed()
+        return self.timeline_speed.get_speed()
 
     def getUserKeyPhrases(self, user_id):
         """
-        Gets words from the user timeline except @replies and URIs
+        Gets texts in the user timeline except mentions, URIs and hashtags
         and extracts key phrases from them using a keyword extractor.
         """
 
-        statuses = self.microblog.get_user_statuses(user_id)
-        texts = ' '.join([status.text for status in statuses])
-        # Remove all HTML elements assuming that '>' in attributes or contents is always escaped.
-        texts = re.sub(r'<[^>]*>', '', texts)
-        words = [word for word in re.split(r'\s', texts)
-                 if word and (word[0] != '@') and (not is_url(word))]
-        texts = ' '.join(words)
-        # self.logger.debug('Words in statuses of #%d: %s', user_id, texts)
-
-        return self.keyword_extraction.extract(texts)
+        if self.timeline_cache:
+            statuses = self.timeline_cache.get_statuses(user_id)
+        else:
+            statuses = self.microblog.get_user_statuses(user_id)
+        # The timeline cache keeps texts already normalized.
+        texts = prepare_text(
+            (status.text for status in statuses),
+            self.key_phrase_max_bytes,
+            normalizes=not self.timeline_cache)
+        # self.logger.debug('Texts in statuses of #%d: %s', user_id, texts)
+
+        if not self.key_phrase_cache:
+            return self.keyword_extraction.extract(texts)
+
+        (key_phrases, reused, similarity) = self.key_phrase_cache.extract(user_id, texts, self.keyword_extraction)
+        self.logger.debug(
+            '%s key phrases of #%d with the similarity %.2f (reuse rate %.0f%%).',
+            'Reused' if reused else 'Extracted',
+            user_id,
+            similarity,
+            self.key_phrase_cache.get_reuse_rate() * 100)
+        return key_phrases
 
     def recommendBook(self, key_phrases):
         """
         Recommends a book based on the specified key phrases using an item search API.
         """
 
+        if self.search_rerank_results:
+            return self.recommendBookByRanking(key_phrases)
+        if self.search_concurrency > 1:
+            return self.recommendBookConcurrently(key_phrases)
+
         # self.logger.debug('Start a book recommendation with key phrases: %s', key_phrases)
+        deadline = (time.monotonic() + self.search_time_limit) if self.search_time_limit else None
+        query_count = 0
         best_book = None
         best_result_count = 0
-        key_phrase_indice = [0]
-        while True:
+        key_phrase_indice = [0] if key_phrases else None
+        while key_phrase_indice and not self.isOutOfSearchBudget(query_count, deadline):
             # Query
             self.logger.debug('Key phrase indice: %s', key_phrase_indice)
+            query_count += 1
             queries = [key_phrases[i] for i in key_phrase_indice]
             (top_book, result_count) = self.book_search.search(queries)
             # self.logger.debug('%s -> %s (%d)', queries, top_book, result_count)
@@ -193,44 +337,159 @@ class Nagato(object):
                 best_result_count = result_count
                 best_book = top_book
 
-            if result_count == 0:
-                # Not found
-                if key_phrase_indice[-1] < len(key_phrases) - 1:
-                    # Go ahead
-                    key_phrase_indice[-1] += 1
-                elif len(key_phrase_indice) > 1:
-                    # Go up
-                    key_phrase_indice = key_phrase_indice[:-1]
-                    if key_phrase_indice[-1] < len(key_phrases) - 1:
-                        key_phrase_indice[-1] += 1
-                    else:
-                        break
-                else:
-                    # No way
-                    break
-            elif result_count == 1:
-                # Only one
-                break
-            else:
-                # Many
-                if key_phrase_indice[-1] < len(key_phrases) - 1:
-                    # More keywords
-                    key_phrase_indice += [key_phrase_indice[-1] + 1]
-                else:
-                    # No way
+            key_phrase_indice = get_next_key_phrase_indice(
+                key_phrase_indice, result_count, len(key_phrases))
+
+        return best_book
+
+    def recommendBookByRanking(self, key_phrases):
+        """
+        Recommends a book by fetching wide result pages for the top key phrases
+        and ranking the hits locally by the number of key phrases they match,
+        which replaces the cascade of combined queries with a few searches.
+        """
+
+        queries = [[key_phrase] for key_phrase in key_phrases[:self.search_rerank_queries]]
+        if not queries:
+            return None
+
+        def search(queries):
+            return self.book_search.search_many(queries, self.search_rerank_results)
+
+        if self.search_concurrency > 1 and len(queries) > 1:
+            with DaemonThreadPoolExecutor(max_workers=min(self.search_concurrency, len(queries))) as executor:
+                results = list(executor.map(search, queries))
+        else:
+            results = [search(query) for query in queries]
+
+        books = rank_books([book for (hits, result_count) in results for book in hits], key_phrases)
+        self.logger.debug('Ranked %d books found by %d queries.', len(books), len(queries))
+        return books[0] if books else None
+
+    def isOutOfSearchBudget(self, query_count, deadline):
+        """
+        Returns true if a recommendation has sent the maximum number of queries
+        or passed the deadline in time.monotonic() seconds.
+        A search running at the deadline is not interrupted unless searches are sent concurrently.
+        """
+
+        if self.search_max_queries is not None and query_count >= self.search_max_queries:
+            self.logger.info('Ran out of %d queries to search books.', query_count)
+            return True
+        if deadline is not None and time.monotonic() >= deadline:
+            self.logger.info('Timed out to search books.')
+            return True
+        return False
+
+    def recommendBookConcurrently(self, key_phrases):
+        """
+        Recommends a book in the same way as recommendBook
+        while searching the next candidate combinations of key phrases speculatively in parallel.
+        Results are memoized within the recommendation,
+        and supersets of combinations without any hit are never searched.
+        The search stops when it runs out of the query budget or the time limit.
+        """
+
+        deadline = (time.monotonic() + self.search_time_limit) if self.search_time_limit else None
+        # Futures of results for each combination of key phrases and combinations without any hit.
+        results = {}
+        no_hit_queries = []
+        best_book = None
+        best_result_count = 0
+        key_phrase_indice = [0] if key_phrases else None
+        executor = DaemonThreadPoolExecutor(max_workers=self.search_concurrency)
+        try:
+            while key_phrase_indice:
+                self.logger.debug('Key phrase indice: %s', key_phrase_indice)
+                result = self.searchBooksSpeculatively(
+                    executor, results, no_hit_queries, key_phrases, key_phrase_indice, deadline)
+                if result is None:
                     break
+                (top_book, result_count) = result
+
+                if top_book and ((not best_book) or (result_count < best_result_count)):
+                    best_result_count = result_count
+                    best_book = top_book
 
+                key_phrase_indice = get_next_key_phrase_indice(
+                    key_phrase_indice, result_count, len(key_phrases))
+        finally:
+            # Neither start nor wait for searches whose results will never be used.
+            for result in results.values():
+                result.cancel()
+            executor.shutdown(wait=False)
+
+        self.logger.debug('Sent %d queries to search books.', len(results))
         return best_book
 
+    def searchBooksSpeculatively(self, executor, results, no_hit_queries, key_phrases, key_phrase_indice, deadline):
+        """
+        Gets the top book and the number of results for the combination of key phrases
+        while searching the following combinations in advance,
+        or None if it runs out of the query budget or the time limit.
+        """
+
+        key = frozenset(key_phrases[i] for i in key_phrase_indice)
+        if any(no_hit <= key for no_hit in no_hit_queries):
+            # More key phrases never increase hits.
+            return (None, 0)
+
+        self.prefetchBooks(
+            executor, results, no_hit_queries, key_phrases, key_phrase_indice,
+            self.search_concurrency.bit_length() - 1)
+        if key not in results:
+            self.logger.info('Ran out of %d queries to search books.', len(results))
+            return None
+        timeout = None
+        if deadline is not None:
+            timeout = max(deadline - time.monotonic(), 0)
+        try:
+            (top_book, result_count) = results[key].result(timeout)
+        except concurrent.futures.TimeoutError:
+            self.logger.info('Timed out to search books.')
+            return None
+        if result_count == 0:
+            no_hit_queries.append(key)
+        return (top_book, result_count)
+
+    def prefetchBooks(self, executor, results, no_hit_queries, key_phrases, key_phrase_indice, depth):
+        """
+        Searches the combination of key phrases and those up to depth steps ahead
+        which can follow it regardless of its result within the query budget.
+        """
+
+        if not key_phrase_indice or depth < 0:
+            return
+        queries = [key_phrases[i] for i in key_phrase_indice]
+        key = frozenset(queries)
+        if key not in results and not any(no_hit <= key for no_hit in no_hit_queries):
+            if self.search_max_queries is not None and len(results) >= self.search_max_queries:
+                return
+            results[key] = executor.submit(self.book_search.search, queries)
+        for result_count in (0, 2):
+            self.prefetchBooks(
+                executor, results, no_hit_queries, key_phrases,
+                get_next_key_phrase_indice(key_phrase_indice, result_count, len(key_phrases)),
+                depth - 1)
+
     def getLastRepliedStatusId(self, my_statuses=None):
         """
         Gets the maximum ID of statuses which this account sent a reply to.
         """
 
+        if my_statuses is None and self.state_store:
+            last_replied_status_id = self.state_store.get('last_replied_status_id')
+            if last_replied_status_id is not None:
+                self.logger.debug(
+                    '@%s replied to #%d most recently according to the state store.',
+                    self.credential.screen_name,
+                    last_replied_status_id)
+                return last_replied_status_id
+
         if my_statuses is None:
             my_statuses = self.microblog.get_user_statuses(self.credential.id)
 
-        if my_statuses is None:
+        if not my_statuses:
             self.logger.debug(
                 '@%s hasn\'t sent any status yet.',
                 self.credential.screen_name)
@@ -250,23 +509,34 @@ class Nagato(object):
                 my_last_status.id)
             return my_last_status.id
 
-    def getLastSentMessageId(self):
+    def getLastSentMessageId(self, sent_messages=None):
         """
         Gets the maximum ID of messages sent from this account.
         """
 
-        sent_message_ids = [sent_message.id for sent_message in self.microblog.get_sent_messages()]
+        if sent_messages is None and self.state_store:
+            last_sent_message_id = self.state_store.get('last_sent_message_id')
+            if last_sent_message_id is not None:
+                self.logger.debug('The last message ID is #%d according to the state store.', last_sent_message_id)
+                return last_sent_message_id
+
+        if sent_messages is None:
+            sent_messages = self.microblog.get_sent_messages()
+
+        sent_message_ids = [sent_message.id for sent_message in sent_messages]
         last_sent_message_id = max(sent_message_ids) if sent_message_ids else 0
         self.logger.debug('The last message ID is #%d.', last_sent_message_id)
         return last_sent_message_id
 
-    def getNewMessage(self):
+    def getNewMessage(self, last_sent_message_id=None, messages=None):
         """
         Gets a new message which this account hasn't responded yet.
         """
 
-        last_sent_message_id = self.getLastSentMessageId()
-        messages = self.microblog.get_received_messages(last_sent_message_id + 1)
+        if last_sent_message_id is None:
+            last_sent_message_id = self.getLastSentMessageId()
+        if messages is None:
+            messages = self.microblog.get_received_messages(last_sent_message_id + 1)
         for message in messages:
             assert message.id > last_sent_message_id
             assert message.user.id != self.credential.user.id
@@ -279,13 +549,15 @@ class Nagato(object):
 
         return None
 
-    def getNewReply(self):
+    def getNewReply(self, max_replied_status_id=None, replies=None):
         """
         Gets a new reply which this account hasn't responded yet.
         """
 
-        max_replied_status_id = self.getLastRepliedStatusId()
-        replies = self.microblog.get_replies(max_replied_status_id + 1)
+        if max_replied_status_id is None:
+            max_replied_status_id = self.getLastRepliedStatusId()
+        if replies is None:
+            replies = self.microblog.get_replies(max_replied_status_id + 1)
         self.logger.debug(
             'Received %d new replies since #%d.',
             len(replies),
@@ -304,31 +576,129 @@ class Nagato(object):
 
         return None
 
+    def getNewReplies(self, max_count=None, max_replied_status_id=None, replies=None):
+        """
+        Gets new replies which this account hasn't responded yet
+        in the order they were sent.
+        """
+
+        if max_replied_status_id is None:
+            max_replied_status_id = self.getLastRepliedStatusId()
+        if replies is None:
+            replies = self.microblog.get_replies(max_replied_status_id + 1)
+        self.logger.debug(
+            'Received %d new replies since #%d.',
+            len(replies),
+            (max_replied_status_id + 1))
+
+        new_replies = sorted(
+            [reply for reply in replies if reply.id > max_replied_status_id],
+            key=lambda reply: reply.id)
+        for reply in new_replies:
+            assert reply.user.id != self.credential.id
+
+        if max_count is not None and len(new_replies) > max_count:
+            self.logger.info(
+                'Deferred %d replies exceeding the limit of %d.',
+                len(new_replies) - max_count,
+                max_count)
+            new_replies = new_replies[:max_count]
+
+        return new_replies
+
+    def loadFriendIds(self, snapshot=None):
+        """
+        Loads a sorted array of friend IDs and the time when they were retrieved
+        from the snapshot if it is retrieved within friend_snapshot_ttl seconds.
+        Returns None if the snapshot is absent or too old.
+        """
+
+        if snapshot and time.time() - snapshot['friends_retrieved_at'] < self.friend_snapshot_ttl:
+            friend_ids = id_set.decode(snapshot['friend_ids'])
+            self.logger.debug('Loaded %d friends from the snapshot.', len(friend_ids))
+            return (friend_ids, snapshot['friends_retrieved_at'])
+
+        return None
+
+    def getFriendIds(self, snapshot=None):
+        """
+        Gets a sorted array of friend IDs and the time when they were retrieved.
+        Since friends change almost only by this account,
+        the snapshot is used instead if it is retrieved within friend_snapshot_ttl seconds.
+        """
+
+        loaded = self.loadFriendIds(snapshot)
+        if loaded:
+            return loaded
+
+        now = time.time()
+        friend_ids = id_set.to_id_array(self.microblog.iter_friend_id_pages())
+        self.logger.debug('Retrieved %d friends.', len(friend_ids))
+        return (friend_ids, now)
+
     def refollow(self):
         """
         Follows new followers and removes ex-followers.
         """
 
-        friend_ids = self.microblog.get_friend_ids()
-        self.logger.debug('Retrieved %d friends.', len(friend_ids))
+        snapshot = self.state_store.get('refollow') if self.state_store else None
+        (friend_ids, friends_retrieved_at) = self.getFriendIds(snapshot)
+        follower_ids = id_set.to_id_array(self.microblog.iter_follower_id_pages())
+        outgoing_ids = id_set.to_id_array([self.microblog.get_pending_friend_ids()])
+        self.updateFriendships(snapshot, friend_ids, friends_retrieved_at, follower_ids, outgoing_ids)
+
+    def updateFriendships(self, snapshot, friend_ids, friends_retrieved_at, follower_ids, outgoing_ids):
+        """
+        Follows and removes users to make friends equal to followers
+        except protected users with pending follow requests
+        and saves the snapshot of friends and followers.
+        """
 
-        follower_ids = self.microblog.get_follower_ids()
         self.logger.debug('Retrieved %d followers.', len(follower_ids))
+        if snapshot:
+            previous_follower_ids = id_set.decode(snapshot['follower_ids'])
+            self.logger.debug(
+                'Gained %d followers and lost %d followers since the last snapshot.',
+                sum(1 for _ in id_set.difference(follower_ids, previous_follower_ids)),
+                sum(1 for _ in id_set.difference(previous_follower_ids, follower_ids)))
 
-        outgoing_ids = self.microblog.get_pending_friend_ids()
         self.logger.debug(
             'Retrieved %d protected users with pending follow requests.',
             len(outgoing_ids))
 
-        for friend_id in friend_ids - follower_ids:
-            self.logger.info('Removing #%d', friend_id)
-            self.microblog.remove(friend_id)
-
-        for follower_id in follower_ids - friend_ids - outgoing_ids:
-            self.logger.info('Following #%d', follower_id)
-            self.microblog.follow(follower_id)
+        actions = [('remove', friend_id) for friend_id in id_set.difference(friend_ids, follower_ids)]
+        actions += [('follow', follower_id) for follower_id in id_set.difference(follower_ids, friend_ids)
+                    if not id_set.contains(outgoing_ids, follower_id)]
+        if self.action_scheduler:
+            # Spread actions within the rate limits and defer the rest to the next invocation.
+            (done, deferred) = self.action_scheduler.run(actions)
+            self.logger.info('Done %d actions and deferred %d actions.', len(done), len(deferred))
+        else:
+            for (action, user_id) in actions:
+                if action == 'remove':
+                    self.logger.info('Removing #%d', user_id)
+                    self.microblog.remove(user_id)
+                else:
+                    self.logger.info('Following #%d', user_id)
+                    self.microblog.follow(user_id)
+            done = actions
+
+        if self.state_store:
+            # Only actions actually done change friends.
+            removed_ids = id_set.to_id_array([[user_id for (action, user_id) in done if action == 'remove']])
+            followed_ids = [user_id for (action, user_id) in done if action == 'follow']
+            friend_ids = id_set.to_id_array([id_set.difference(friend_ids, removed_ids), followed_ids])
+            self.state_store.set('refollow', {
+                'friend_ids': id_set.encode(friend_ids),
+                'follower_ids': id_set.encode(follower_ids),
+                'friends_retrieved_at': friends_retrieved_at,
+            })
 
     def getBookRecommendation(self, user_id):
+        # They are required only to respond to users.
+        assert self.book_search
+        assert self.keyword_extraction
+
         key_phrases = self.getUserKeyPhrases(user_id)
         # self.logger.info('Book Recommendation Keyphrases: %s', key_phrases)
         book = self.recommendBook(key_phrases[:10])
@@ -343,39 +713,102 @@ class Nagato(object):
         Returns the status text and URL to respond to the specified text.
         """
 
-        status = None
-
-        if is_book_recommendation_request(text):
-            return self.getBookRecommendation(user_id)
-        elif is_greeting_request(text):
-            status = get_greeting()
-        elif is_timeline_speed_request(text):
-            status = '流速 %d' % self.getTimelineSpeed()
+        intent = self.intent_router.classify(text)
+        if intent:
+            return self.intent_responders[intent](user_id, text)
         else:
-            status = get_random_phrase()
-
-        return (status, None)
+            return (get_random_phrase(), None)
 
     def respondNewReply(self):
         reply = self.getNewReply()
         if reply:
             self.respondReply(reply)
 
+    def respondNewReplies(self, max_count=None, deadline=None):
+        """
+        Responds to all the new replies in the order they were sent.
+        At most max_count replies are handled if specified,
+        and no more reply is sent after the deadline in time.monotonic() seconds.
+        Responses are generated concurrently by up to max_workers threads
+        while they are sent one by one in the original order.
+        Returns the number of replies sent.
+        """
+
+        return self.respondReplies(self.getNewReplies(max_count), deadline)
+
+    def respondReplies(self, replies, deadline=None):
+        """
+        Responds to the specified replies in order
+        until the deadline in time.monotonic() seconds if specified.
+        Replies whose responses fail are logged and skipped.
+        Returns the number of replies sent.
+        """
+
+        responded_count = 0
+        executor = DaemonThreadPoolExecutor(max_workers=self.max_workers)
+        responses = []
+        try:
+            responses = [executor.submit(self.getResponse, reply.user.id, reply.text)
+                         for reply in replies]
+            for (index, (reply, response)) in enumerate(zip(replies, responses)):
+                try:
+                    if deadline is None:
+                        (text, url) = response.result()
+                    elif time.monotonic() < deadline:
+                        (text, url) = response.result(deadline - time.monotonic())
+                    else:
+                        raise concurrent.futures.TimeoutError()
+                except concurrent.futures.TimeoutError:
+                    self.logger.info(
+                        'Deferred %d replies due to the deadline.',
+                        len(replies) - index)
+                    break
+                except Exception:
+                    self.logger.exception('Failed to respond to the reply #%d.', reply.id)
+                    continue
+                self.sendReply(reply, text, url)
+                responded_count += 1
+        finally:
+            # Neither start nor wait for responses which will never be sent.
+            # The worker threads are daemons so that they do not delay the exit either.
+            for response in responses:
+                response.cancel()
+            executor.shutdown(wait=False)
+
+        self.logger.debug('Responded to %d replies.', responded_count)
+        return responded_count
+
     def respondReply(self, reply):
         """
         Reply to the specified incoming reply.
         """
 
         (text, url) = self.getResponse(reply.user.id, reply.text)
+        self.sendReply(reply, text, url)
+
+    def sendReply(self, reply, text, url=None):
+        """
+        Sends the specified response to the incoming reply.
+        """
+
         self.microblog.post(text, url, reply)
+        self.microblog.mark_replied(reply)
         self.logger.info(
             'Sent a reply to @%s: %s',
             reply.user.screen_name, text)
 
-    def respondNewMessage(self):
-        message = self.getNewMessage()
+        if self.state_store:
+            last_replied_status_id = self.state_store.get('last_replied_status_id')
+            if last_replied_status_id is None or reply.id > last_replied_status_id:
+                self.state_store.set('last_replied_status_id', reply.id)
+
+    def respondNewMessage(self, message=None):
+        if message is None:
+            message = self.getNewMessage()
         if message:
             self.respondMessage(message)
+            if self.state_store:
+                self.state_store.set('last_sent_message_id', message.id)
 
     def respondMessage(self, message):
         """
@@ -414,13 +847,14 @@ class Nagato(object):
 
         self.logger.debug('Executing...')
         self.respondNewMessage()
-        self.respondNewReply()
+        self.respondNewReplies()
 
         # Post randomly roughly once a day.
         if not random.randrange(60 * 24):
             self.postRandomPhrase()
 
-        self.logger.info('The home timeline speed is %d statuses/s', self.getTimelineSpeed())
+        self.updateTimelineSpeed()
+        self.logger.info('The home timeline speed is %d statuses/h', self.getTimelineSpeed())
         self.logger.debug('Terminating...')
 
 # vim:set fenc=utf-8 ts=4 sw=4:
@@ -0,0 +1,92 @@
+"""
+Operations of a Nagato instance which send independent requests concurrently
+with the AsyncMicroblogApi, kept apart from nagato so that importing it stays light.
+"""
+
+import asyncio
+import random
+import time
+from microblog import id_set
+from microblog.async_microblog_api import ExecutorAsyncMicroblogApi
+from nagato import get_random_phrase
+
+
+async def respond_new_message(nagato, microblog):
+    sent_messages = None
+    if not (nagato.state_store and nagato.state_store.get('last_sent_message_id') is not None):
+        sent_messages = await microblog.get_sent_messages()
+    last_sent_message_id = nagato.getLastSentMessageId(sent_messages)
+    messages = await microblog.get_received_messages(last_sent_message_id + 1)
+    message = nagato.getNewMessage(last_sent_message_id, messages)
+    if message:
+        await asyncio.get_running_loop().run_in_executor(None, nagato.respondNewMessage, message)
+
+
+async def respond_new_replies(nagato, microblog, max_count=None, deadline=None):
+    # Verify the credential without blocking the event loop
+    # so that the microblog API has it cached when checking replies.
+    credential = await microblog.verify_credentials()
+    my_statuses = None
+    if not (nagato.state_store and nagato.state_store.get('last_replied_status_id') is not None):
+        my_statuses = await microblog.get_user_statuses(credential.id)
+    max_replied_status_id = nagato.getLastRepliedStatusId(my_statuses)
+    replies = await microblog.get_replies(max_replied_status_id + 1)
+    new_replies = nagato.getNewReplies(max_count, max_replied_status_id, replies)
+    # Generating responses may take a while with book searches.
+    return await asyncio.get_running_loop().run_in_executor(None, nagato.respondReplies, new_replies, deadline)
+
+
+async def update_timeline_speed(nagato, microblog):
+    statuses = await microblog.get_home_statuses(nagato.timeline_speed.last_id)
+    # The keyword extractor learning the statuses and the state store may write files.
+    await asyncio.get_running_loop().run_in_executor(None, nagato.updateTimelineSpeed, statuses)
+
+
+async def refollow(nagato, microblog=None):
+    """
+    Follows new followers and removes ex-followers
+    retrieving friends, followers and pending follow requests concurrently.
+    """
+
+    microblog = microblog or ExecutorAsyncMicroblogApi(nagato.microblog)
+    snapshot = nagato.state_store.get('refollow') if nagato.state_store else None
+    loaded = nagato.loadFriendIds(snapshot)
+    requests = [
+        microblog.get_follower_ids(),
+        microblog.get_pending_friend_ids(),
+    ]
+    if not loaded:
+        friends_retrieved_at = time.time()
+        requests.append(microblog.get_friend_ids())
+    results = await asyncio.gather(*requests)
+    follower_ids = id_set.to_id_array([results[0]])
+    outgoing_ids = id_set.to_id_array([results[1]])
+    if loaded:
+        (friend_ids, friends_retrieved_at) = loaded
+    else:
+        friend_ids = id_set.to_id_array([results[2]])
+        nagato.logger.debug('Retrieved %d friends.', len(friend_ids))
+    await asyncio.get_running_loop().run_in_executor(
+        None, nagato.updateFriendships, snapshot, friend_ids, friends_retrieved_at, follower_ids, outgoing_ids)
+
+
+async def run(nagato, microblog=None):
+    """
+    Executes the bot in the same way as Nagato.run()
+    but sends independent requests concurrently with the AsyncMicroblogApi,
+    which runs the synchronous microblog API in the default executor if not specified.
+    """
+
+    microblog = microblog or ExecutorAsyncMicroblogApi(nagato.microblog)
+    nagato.logger.debug('Executing...')
+    await asyncio.gather(
+        respond_new_message(nagato, microblog),
+        respond_new_replies(nagato, microblog),
+        update_timeline_speed(nagato, microblog))
+
+    # Post randomly roughly once a day.
+    if not random.randrange(60 * 24):
+        await microblog.post(get_random_phrase())
+
+    nagato.logger.info('The home timeline speed is %d statuses/h', nagato.timeline_speed.get_speed())
+    nagato.logger.debug('Terminating...')
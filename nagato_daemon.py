@@ -0,0 +1,132 @@
+"""
+A long-running process which keeps a Nagato instance alive,
+responds to replies as they arrive in the stream,
+or polls them if the backend doesn't support streaming,
+and executes periodic tasks such as refollowing in between.
+"""
+
+import random
+import threading
+import time
+
+
+class NagatoDaemon(object):
+    """
+    A daemon which responds to streamed replies and executes periodic tasks.
+    Calls to Nagato from the stream and the tasks are serialized with a lock.
+    """
+
+    def __init__(self, nagato, tasks=None, min_backoff=1, max_backoff=300, poll_interval=60):
+        """
+        Initializes a new instance with a list of (interval in seconds, function) as tasks.
+        The stream is reconnected after an exponential backoff
+        from min_backoff up to max_backoff seconds.
+        Replies are polled every poll_interval seconds instead if the backend doesn't support streaming.
+        """
+
+        self.nagato = nagato
+        self.logger = nagato.getLogger()
+        self.tasks = list(tasks or [])
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.backoff = min_backoff
+        self.poll_interval = poll_interval
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        # The maximum ID of replies already responded to by this daemon,
+        # which drops replies both retrieved on connection and streamed.
+        self.last_reply_id = None
+
+    def stop(self):
+        self.stopped.set()
+
+    def catch_up(self):
+        """
+        Responds to replies received while disconnected.
+        """
+
+        self.backoff = self.min_backoff
+        with self.lock:
+            replies = [reply for reply in self.nagato.getNewReplies()
+                       if self.last_reply_id is None or reply.id > self.last_reply_id]
+            try:
+                responded_count = self.nagato.respondReplies(replies)
+            finally:
+                # Never retry replies which failed, otherwise one of them would fail on every reconnection.
+                for reply in replies:
+                    self.last_reply_id = max(reply.id, self.last_reply_id or 0)
+        self.logger.info(
+            'Connected to the stream and responded to %d of %d missed replies.', responded_count, len(replies))
+
+    def respond_reply(self, reply):
+        with self.lock:
+            if self.last_reply_id is not None and reply.id <= self.last_reply_id:
+                self.logger.debug('Skipped the reply #%d already responded to.', reply.id)
+                return
+            if reply.user.id == self.nagato.credential.id:
+                return
+            self.last_reply_id = reply.id
+            try:
+                self.nagato.respondReply(reply)
+            except Exception:
+                # Keep streaming the following replies.
+                self.logger.exception('Failed to respond to the reply #%d.', reply.id)
+
+    def poll_replies(self):
+        """
+        Responds to new replies every poll_interval seconds until stopped.
+        """
+
+        while not self.stopped.is_set():
+            try:
+                with self.lock:
+                    self.nagato.respondNewReplies()
+            except Exception:
+                self.logger.exception('Failed to respond to new replies.')
+            self.stopped.wait(self.poll_interval)
+
+    def run_tasks(self):
+        """
+        Executes each task every interval until stopped.
+        """
+
+        now = time.monotonic()
+        schedule = [[now + interval, interval, function] for (interval, function) in self.tasks]
+        while schedule and not self.stopped.is_set():
+            task = min(schedule, key=lambda task: task[0])
+            if self.stopped.wait(max(task[0] - time.monotonic(), 0)):
+                break
+            try:
+                with self.lock:
+                    task[2]()
+            except Exception:
+                self.logger.exception('Failed to execute a periodic task.')
+            task[0] = time.monotonic() + task[1]
+
+    def run(self):
+        """
+        Streams replies and executes the tasks until stopped.
+        """
+
+        scheduler = threading.Thread(target=self.run_tasks, daemon=True)
+        scheduler.start()
+        try:
+            while not self.stopped.is_set():
+                try:
+                    self.nagato.microblog.stream_replies(self.respond_reply, self.catch_up)
+                    self.logger.warning('The stream was closed.')
+                except NotImplementedError:
+                    self.logger.info('Polling replies every %d seconds without streaming.', self.poll_interval)
+                    self.poll_replies()
+                    break
+                except Exception as e:
+                    self.logger.warning('The stream was disconnected: %s', e)
+
+                # Add jitter not to reconnect at the same time as other clients.
+                delay = self.backoff * random.uniform(0.5, 1)
+                self.backoff = min(self.backoff * 2, self.max_backoff)
+                self.logger.info('Reconnecting in %.1f seconds...', delay)
+                self.stopped.wait(delay)
+        finally:
+            self.stopped.set()
+            scheduler.join()
@@ -0,0 +1,103 @@
+import array
+import bisect
+import collections
+import mmap
+import os
+import random
+import threading
+
+
+class PhrasePool:
+    """
+    A pool of phrases in a UTF-8 text file with a phrase per line.
+    The file is memory-mapped with an index of line offsets
+    so that a random phrase is read without scanning the whole file,
+    and it is reloaded only when it is modified.
+    """
+
+    def __init__(self, path, weight=None, recent_count=0, max_retries=10):
+        """
+        Initializes a new instance for the phrase file at the path.
+        Phrases are chosen in proportion to weight(phrase) if the function is specified.
+        The last recent_count phrases are avoided up to max_retries times.
+        """
+
+        self.path = path
+        self.weight = weight
+        self.recent = collections.deque(maxlen=recent_count)
+        self.max_retries = max_retries
+        self.lock = threading.Lock()
+        self.mtime = None
+        self.mmap = None
+        self.offsets = array.array('Q')
+        self.cumulative_weights = None
+
+    def load(self):
+        """
+        Loads the phrase file if it is modified since it was loaded last time.
+        """
+
+        mtime = os.stat(self.path).st_mtime_ns
+        if mtime == self.mtime:
+            return
+
+        if self.mmap:
+            self.mmap.close()
+            self.mmap = None
+        self.offsets = array.array('Q')
+        self.recent.clear()
+        with open(self.path, mode='rb') as phrase_file:
+            if os.fstat(phrase_file.fileno()).st_size:
+                self.mmap = mmap.mmap(phrase_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        # Index the start and end offsets of non-empty lines.
+        start = 0
+        size = len(self.mmap) if self.mmap else 0
+        while start < size:
+            end = self.mmap.find(b'\n', start)
+            if end < 0:
+                end = size
+            if self.mmap[start:end].strip():
+                self.offsets.extend((start, end))
+            start = end + 1
+
+        if self.weight:
+            self.cumulative_weights = array.array('d')
+            total_weight = 0
+            for index in range(len(self)):
+                total_weight += self.weight(self.get(index))
+                self.cumulative_weights.append(total_weight)
+        self.mtime = mtime
+
+    def __len__(self):
+        return len(self.offsets) // 2
+
+    def get(self, index):
+        start = self.offsets[index * 2]
+        end = self.offsets[index * 2 + 1]
+        return self.mmap[start:end].decode('utf-8').strip()
+
+    def choose_index(self):
+        if self.cumulative_weights and self.cumulative_weights[-1] > 0:
+            return bisect.bisect_right(
+                self.cumulative_weights, random.random() * self.cumulative_weights[-1])
+        return random.randrange(len(self))
+
+    def choice(self):
+        """
+        Gets a random phrase.
+        """
+
+        with self.lock:
+            self.load()
+            if not len(self):
+                raise IndexError('There is no phrase in %s.' % self.path)
+
+            index = self.choose_index()
+            for _ in range(self.max_retries):
+                if index not in self.recent:
+                    break
+                index = self.choose_index()
+            if self.recent.maxlen:
+                self.recent.append(index)
+            return self.get(index)
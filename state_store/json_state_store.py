@@ -0,0 +1,48 @@
+import json
+import os
+import tempfile
+import threading
+from .state_store import StateStore
+
+
+class JsonStateStore(StateStore):
+    """
+    A state store which saves the state in a local JSON file.
+    The file is replaced atomically so that it is never left half-written.
+    """
+
+    def __init__(self, path):
+        assert path, 'The state file path is mandatory but not set.'
+        self.path = path
+        self.lock = threading.Lock()
+        self.state = None
+
+    def load(self):
+        if self.state is None:
+            try:
+                with open(self.path, mode='r', encoding='utf-8') as state_file:
+                    self.state = json.load(state_file)
+            except FileNotFoundError:
+                self.state = {}
+        return self.state
+
+    def get(self, key, default=None):
+        with self.lock:
+            return self.load().get(key, default)
+
+    def update(self, values):
+        with self.lock:
+            state = dict(self.load())
+            state.update(values)
+            directory = os.path.dirname(os.path.abspath(self.path))
+            (fd, temp_path) = tempfile.mkstemp(dir=directory, prefix='.state-', suffix='.json')
+            try:
+                with os.fdopen(fd, mode='w', encoding='utf-8') as temp_file:
+                    json.dump(state, temp_file, ensure_ascii=False)
+                    temp_file.flush()
+                    os.fsync(temp_file.fileno())
+                os.replace(temp_path, self.path)
+            except BaseException:
+                os.remove(temp_path)
+                raise
+            self.state = state
@@ -0,0 +1,23 @@
+from abc import ABC
+from abc import abstractmethod
+
+
+class StateStore(ABC):
+    """
+    A key-value store which keeps the bot state between invocations.
+    Values must be JSON-serializable.
+    """
+
+    @abstractmethod
+    def get(self, key, default=None):
+        pass
+
+    @abstractmethod
+    def update(self, values):
+        """
+        Sets all the specified key-value pairs at once.
+        """
+        pass
+
+    def set(self, key, value):
+        self.update({key: value})
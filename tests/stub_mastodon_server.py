@@ -0,0 +1,129 @@
+import http.server
+import json
+import threading
+import urllib.parse
+
+ACCOUNTS = {
+    15498: {'id': '15498', 'username': 'nagato', 'acct': 'nagato'},
+    1: {'id': '1', 'username': 'kyon', 'acct': 'kyon'},
+}
+
+
+def create_status(status_id, account_id, content, in_reply_to_id=None):
+    return {
+        'id': str(status_id),
+        'content': content,
+        'account': ACCOUNTS[account_id],
+        'created_at': '2021-01-01T10:00:00.000Z',
+        'in_reply_to_id': str(in_reply_to_id) if in_reply_to_id else None,
+        'in_reply_to_account_id': None,
+        'visibility': 'public',
+        'mentions': [],
+    }
+
+
+def create_notification(notification_id, notification_type, status=None):
+    notification = {
+        'id': str(notification_id),
+        'type': notification_type,
+        'created_at': '2021-01-01T10:00:00.000Z',
+        'account': ACCOUNTS[1],
+    }
+    if status:
+        notification['status'] = status
+    return notification
+
+
+class StubMastodonHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def respond(self, status, body, headers={}):
+        body = json.dumps(body).encode('UTF-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for (name, value) in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def stream(self):
+        server = self.server
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        events = server.stream_events.pop(0) if server.stream_events else []
+        for (event, data) in events:
+            self.wfile.write(('event: %s\ndata: %s\n\n' % (event, json.dumps(data))).encode('UTF-8'))
+        self.wfile.flush()
+        server.stream_connections += 1
+        if not server.stream_events:
+            server.drained.set()
+        self.close_connection = True
+
+    def notifications(self, params):
+        # Notifications are sorted in descending order of IDs.
+        notifications = [notification for notification in self.server.notifications
+                         if notification['type'] in params.get('types[]', [notification['type']])
+                         and int(notification['id']) > int(params.get('since_id', ['0'])[0])
+                         and ('max_id' not in params or int(notification['id']) < int(params['max_id'][0]))]
+        page = notifications[:int(params.get('limit', ['40'])[0])]
+        headers = {}
+        if page:
+            headers['Link'] = '<http://%s:%d/api/v1/notifications?max_id=%s>; rel="next"' % (
+                self.server.server_address + (page[-1]['id'],))
+        self.respond(200, page, headers)
+
+    def do_GET(self):
+        url = urllib.parse.urlparse(self.path)
+        params = urllib.parse.parse_qs(url.query)
+        self.server.requests.append((url.path, params))
+        if url.path == '/api/v1/accounts/verify_credentials':
+            self.respond(200, ACCOUNTS[15498])
+        elif url.path == '/api/v1/accounts/15498/statuses':
+            self.respond(200, [])
+        elif url.path == '/api/v1/notifications':
+            self.notifications(params)
+        elif url.path == '/api/v1/streaming/user':
+            self.stream()
+        else:
+            self.respond(404, {'error': 'Not found'})
+
+    def do_POST(self):
+        length = int(self.headers['Content-Length'])
+        params = urllib.parse.parse_qs(self.rfile.read(length).decode('UTF-8'))
+        if self.server.unauthorized:
+            self.respond(401, {'error': 'The access token is invalid'})
+            return
+        self.server.posts.append(params)
+        self.respond(200, create_status(100 + len(self.server.posts), 15498, params['status'][0]))
+
+
+class StubMastodonServer(http.server.ThreadingHTTPServer):
+    """
+    A local server which fakes a part of Mastodon API including the user stream.
+    """
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), StubMastodonHandler)
+        self.url = 'http://127.0.0.1:%d' % self.server_address[1]
+        self.requests = []
+        self.posts = []
+        self.notifications = []
+        self.stream_events = []
+        self.stream_connections = 0
+        self.drained = threading.Event()
+        self.unauthorized = False
+        self.thread = threading.Thread(target=self.serve_forever)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        self.thread.join()
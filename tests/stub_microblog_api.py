@@ -12,17 +12,20 @@ class StubMicroblogApi(microblog_api.MicroblogApi):
         self.posts = []
         self.home_statuses = []
         self.user_statuses = {}
+        self.user_status_requests = []
         self.replies = []
         self.sent_messages = []
 
     def verify_credentials(self):
         return self.me
 
-    def get_home_statuses(self):
-        return self.home_statuses
+    def get_home_statuses(self, since_id=None):
+        return [status for status in self.home_statuses if since_id is None or status.id > since_id]
 
-    def get_user_statuses(self, user_id, max_id=None):
-        return self.user_statuses[user_id]
+    def get_user_statuses(self, user_id, max_id=None, since_id=None):
+        self.user_status_requests.append((user_id, max_id, since_id))
+        return [status for status in self.user_statuses[user_id]
+                if (max_id is None or status.id <= max_id) and (since_id is None or status.id > since_id)]
 
     def get_replies(self, since_id=None):
         return self.replies
@@ -58,7 +61,7 @@ class StubMicroblogApi(microblog_api.MicroblogApi):
         self.blocking_ids.remove(user_id)
 
     def post(self, text, url=None, in_reply_to=None):
-        pass
+        self.posts.append((text, url, in_reply_to))
 
     def send(self, text, user_id):
         pass
@@ -0,0 +1,12 @@
+from state_store.state_store import StateStore
+
+
+class StubStateStore(StateStore):
+    def __init__(self):
+        self.state = {}
+
+    def get(self, key, default=None):
+        return self.state.get(key, default)
+
+    def update(self, values):
+        self.state.update(values)
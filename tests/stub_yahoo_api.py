@@ -0,0 +1,8 @@
+class StubYahooApi:
+    def __init__(self):
+        self.requests = []
+
+    def api(self, apiurl, params, method='GET'):
+        params['appid'] = 'stub'
+        self.requests.append((apiurl, params, method))
+        return {'url': apiurl, 'query': params.get('query'), 'count': len(self.requests)}
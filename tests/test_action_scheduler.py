@@ -0,0 +1,65 @@
+from .stub_microblog_api import StubMicroblogApi
+from .stub_state_store import StubStateStore
+from microblog.action_scheduler import ActionScheduler
+from microblog.microblog_api import RateLimit
+from microblog.microblog_api import RateLimitError
+import time
+import unittest
+
+
+class ActionSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.microblog = StubMicroblogApi()
+        self.microblog.friend_ids = {1, 2}
+        self.state_store = StubStateStore()
+
+    def test_token_bucket(self):
+        scheduler = ActionScheduler(self.microblog, self.state_store, capacity=2, rate=0)
+        (done, deferred) = scheduler.run([('remove', 1), ('follow', 3), ('follow', 4)])
+        self.assertEqual([('remove', 1), ('follow', 3)], done)
+        self.assertEqual([('follow', 4)], deferred)
+        self.assertEqual({2, 3}, self.microblog.friend_ids)
+
+        # The next invocation resumes the queue waiting for tokens.
+        scheduler = ActionScheduler(self.microblog, self.state_store, capacity=2, rate=1000, time_limit=1)
+        self.assertEqual([('follow', 4)], list(scheduler.queue))
+        (done, deferred) = scheduler.run([('follow', 5), ('follow', 4)])
+        self.assertEqual([('follow', 4), ('follow', 5)], done)
+        self.assertEqual([], deferred)
+
+    def test_rate_limit(self):
+        reset = time.time() + 60
+
+        def follow(user_id):
+            if len(self.microblog.friend_ids) >= 3:
+                raise RateLimitError('Rate limit exceeded')
+            self.microblog.friend_ids.add(user_id)
+
+        self.microblog.follow = follow
+        self.microblog.get_rate_limit = lambda action: RateLimit(300, 1, reset)
+        scheduler = ActionScheduler(self.microblog, self.state_store)
+        (done, deferred) = scheduler.run([('follow', 3), ('follow', 4)])
+        self.assertEqual([('follow', 3)], done)
+        self.assertEqual([('follow', 4)], deferred)
+
+        # Nothing is sent until the rate limit is reset.
+        self.microblog.get_rate_limit = lambda action: None
+        scheduler = ActionScheduler(self.microblog, self.state_store)
+        self.assertEqual(([], [('follow', 4)]), scheduler.run())
+
+        self.microblog.get_rate_limit = lambda action: RateLimit(300, 0, reset)
+        scheduler = ActionScheduler(self.microblog, self.state_store)
+        scheduler.blocked_until = 0
+        self.assertEqual(([], [('follow', 4)]), scheduler.run())
+
+    def test_error(self):
+        def follow(user_id):
+            if user_id == 3:
+                raise IOError('The user is not found.')
+            self.microblog.friend_ids.add(user_id)
+
+        self.microblog.follow = follow
+        scheduler = ActionScheduler(self.microblog, self.state_store)
+        # The failed action is dropped instead of blocking the following ones.
+        self.assertEqual(([('follow', 4)], []), scheduler.run([('follow', 3), ('follow', 4)]))
+        self.assertEqual({1, 2, 4}, self.microblog.friend_ids)
@@ -0,0 +1,39 @@
+from .stub_keyword_extraction import StubKeywordExtraction
+from keyword_extraction.budgeted_keyword_extraction import BudgetedKeywordExtraction
+import unittest
+
+
+class BudgetedKeywordExtractionTest(unittest.TestCase):
+    def test_get_payload(self):
+        extraction = BudgetedKeywordExtraction(StubKeywordExtraction(), max_bytes=41, min_length=4)
+        sentence = '\n'.join([
+            'Nagato reads a book.',
+            'I walked 1234 steps.',
+            'ok',
+            'I walked 5678 steps.',
+            'Nagato is cute.',
+            'She is the alien interface.',
+        ])
+
+        (payload, report) = extraction.get_payload(sentence)
+        # Recent lines are kept in the original order within the budget.
+        self.assertEqual('Nagato reads a book.\nI walked 1234 steps.', payload)
+        self.assertEqual(2, report.kept_lines)
+        self.assertEqual(len(payload), report.kept_bytes)
+        self.assertEqual(1, report.duplicate_lines)
+        self.assertEqual(1, report.boilerplate_lines)
+        self.assertEqual(2, report.dropped_lines)
+        self.assertEqual(len(sentence) - len(payload), report.dropped_bytes)
+
+        self.assertEqual(['Nagato', 'reads', 'a', 'book', 'I', 'walked', 'steps'], extraction.extract(sentence))
+        self.assertEqual(len(payload), extraction.kept_bytes)
+
+        # A shorter older line fills the rest of the budget which a longer one does not fit in.
+        extraction.max_bytes = 37
+        self.assertEqual('Nagato reads a book.\nNagato is cute.', extraction.get_payload(sentence)[0])
+
+    def test_short_japanese_line(self):
+        extraction = BudgetedKeywordExtraction(StubKeywordExtraction())
+        (payload, report) = extraction.get_payload('長門有希の本\nw')
+        self.assertEqual('長門有希の本', payload)
+        self.assertEqual(1, report.boilerplate_lines)
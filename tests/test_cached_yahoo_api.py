@@ -0,0 +1,69 @@
+from .stub_yahoo_api import StubYahooApi
+from cached_yahoo_api import CachedYahooApi
+import os
+import tempfile
+import time
+import unittest
+
+
+class CachedYahooApiTest(unittest.TestCase):
+    def setUp(self):
+        self.yapi = StubYahooApi()
+
+    def test_cache(self):
+        api = CachedYahooApi(self.yapi, ttls={'http://example.com/nocache': 0}, max_size=2)
+
+        first = api.api('http://example.com/search', {'query': '長門  有希'})
+        self.assertEqual(first, api.api('http://example.com/search', {'query': '長門 有希 '}))
+        self.assertEqual((1, 1), (api.hits, api.misses))
+
+        # POST requests and other endpoints are cached separately.
+        api.api('http://example.com/search', {'query': '長門 有希'}, 'POST')
+        api.api('http://example.com/nocache', {'query': '長門 有希'})
+        api.api('http://example.com/nocache', {'query': '長門 有希'})
+        self.assertEqual(4, len(self.yapi.requests))
+
+        # The least recently used entry is evicted.
+        api.api('http://example.com/search', {'query': '朝倉 涼子'})
+        api.api('http://example.com/search', {'query': '長門 有希'})
+        self.assertEqual(6, len(self.yapi.requests))
+        self.assertEqual((1, 4), (api.hits, api.misses))
+
+    def test_ttl(self):
+        api = CachedYahooApi(self.yapi, default_ttl=-1)
+        api.api('http://example.com/search', {'query': '長門'})
+        api.api('http://example.com/search', {'query': '長門'})
+        self.assertEqual(2, len(self.yapi.requests))
+
+    def test_expiry(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for path in (None, os.path.join(directory, 'cache.sqlite3')):
+                self.yapi.requests.clear()
+                api = CachedYahooApi(self.yapi, ttls={'http://example.com/search': 0.1}, path=path)
+                api.api('http://example.com/search', {'query': '長門'})
+                api.api('http://example.com/search', {'query': '長門'})
+                time.sleep(0.2)
+                # The expired response is retrieved again.
+                api.api('http://example.com/search', {'query': '長門'})
+                self.assertEqual(2, len(self.yapi.requests))
+                self.assertEqual((1, 2), (api.hits, api.misses))
+                if path:
+                    api.cache.connection.close()
+
+    def test_sqlite(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'cache.sqlite3')
+            api = CachedYahooApi(self.yapi, max_size=2, path=path)
+            api.api('http://example.com/search', {'query': '長門'})
+            first = api.api('http://example.com/search', {'query': '朝倉'})
+            api.api('http://example.com/search', {'query': '喜緑'})
+            api.cache.connection.close()
+
+            # Responses survive while the least recently used one is evicted.
+            api = CachedYahooApi(self.yapi, max_size=2, path=path)
+            self.assertEqual(first, api.api('http://example.com/search', {'query': '朝倉'}))
+            api.api('http://example.com/search', {'query': '喜緑'})
+            api.api('http://example.com/search', {'query': '長門'})
+            self.assertEqual((2, 1), (api.hits, api.misses))
+            self.assertEqual(4, len(self.yapi.requests))
+            api.cache.connection.close()
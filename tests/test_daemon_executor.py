@@ -0,0 +1,12 @@
+from daemon_executor import DaemonThreadPoolExecutor
+import unittest
+
+
+class DaemonThreadPoolExecutorTest(unittest.TestCase):
+    def test_submit(self):
+        with DaemonThreadPoolExecutor(max_workers=2) as executor:
+            self.assertEqual([1, 4, 9], list(executor.map(lambda x: x * x, [1, 2, 3])))
+            future = executor.submit(int, 'Nagato')
+            self.assertRaises(ValueError, future.result)
+            self.assertTrue(all(thread.daemon for thread in executor.threads))
+        self.assertRaises(RuntimeError, executor.submit, int, '1')
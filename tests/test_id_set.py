@@ -0,0 +1,18 @@
+from microblog import id_set
+import unittest
+
+
+class IdSetTest(unittest.TestCase):
+    def test_id_set(self):
+        ids = id_set.to_id_array([[9, 3, 1], {5, 3}, []])
+        self.assertEqual([1, 3, 5, 9], ids.tolist())
+        self.assertTrue(id_set.contains(ids, 5))
+        self.assertFalse(id_set.contains(ids, 4))
+        self.assertFalse(id_set.contains(ids, 10))
+        self.assertEqual([1, 5], list(id_set.difference(ids, id_set.to_id_array([[0, 3, 9, 10]]))))
+        self.assertEqual([], list(id_set.difference(id_set.to_id_array([]), ids)))
+
+    def test_encode(self):
+        for ids in [[], [1], [1, 3, 5, 9], [-1, 2 ** 62, 2 ** 63 - 1]]:
+            ids = id_set.to_id_array([ids])
+            self.assertEqual(ids, id_set.decode(id_set.encode(ids)))
@@ -0,0 +1,52 @@
+from intent_router import IntentRouter
+import nagato
+import re
+import unittest
+import unittest.mock
+
+
+class IntentRouterTest(unittest.TestCase):
+    def test_classify(self):
+        intent_router = nagato.create_intent_router()
+        self.assertEqual('book_recommendation', intent_router.classify('@nagato お勧めの本は？'))
+        self.assertEqual('book_recommendation', intent_router.classify('おはよう。流速とおもしろい書籍を教えて'))
+        self.assertEqual('greeting', intent_router.classify('流速は？おやすみ'))
+        self.assertEqual('timeline_speed', intent_router.classify('流速は？'))
+        self.assertIsNone(intent_router.classify('長門は俺の嫁'))
+
+        intent_router.register('marriage', '(俺|私)の嫁')
+        self.assertEqual('marriage', intent_router.classify('長門は俺の嫁'))
+        self.assertEqual('greeting', intent_router.classify('俺の嫁におはよう'))
+
+    def test_overlap(self):
+        intent_router = IntentRouter()
+        intent_router.register('timeline_speed', '流速')
+        intent_router.register('question', '今の流')
+        self.assertEqual('timeline_speed', intent_router.classify('今の流速は？'))
+        self.assertEqual('question', intent_router.classify('今の流行は？'))
+
+    def test_duplicate(self):
+        intent_router = IntentRouter()
+        intent_router.register('greeting', 'おはよう')
+        with self.assertRaises(AssertionError):
+            intent_router.register('greeting', 'こんにちは')
+
+    def test_concurrent_compile(self):
+        intent_router = IntentRouter()
+        intent_router.register('timeline_speed', '流速')
+        intents = []
+        compile = re.compile
+
+        def compile_and_classify(pattern):
+            # Another classification while compiling each pattern never sees them half-compiled.
+            if not intents and not pattern.startswith('(?P<'):
+                intents.append(None)
+                intents.append(intent_router.classify('流速は？'))
+            return compile(pattern)
+
+        with unittest.mock.patch('intent_router.re.compile', side_effect=compile_and_classify):
+            self.assertEqual('timeline_speed', intent_router.classify('流速は？'))
+        self.assertEqual([None, 'timeline_speed'], intents)
+
+    def test_empty(self):
+        self.assertIsNone(IntentRouter().classify('おはよう'))
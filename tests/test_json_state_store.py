@@ -0,0 +1,35 @@
+from state_store.json_state_store import JsonStateStore
+import json
+import os
+import tempfile
+import unittest
+
+
+class JsonStateStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'state.json')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_get_default(self):
+        store = JsonStateStore(self.path)
+        self.assertIsNone(store.get('last_replied_status_id'))
+        self.assertEqual(0, store.get('last_replied_status_id', 0))
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_update(self):
+        store = JsonStateStore(self.path)
+        store.set('last_replied_status_id', 12)
+        store.update({'last_sent_message_id': 3, 'refollow': {'friend_ids': [1, 2]}})
+
+        with open(self.path, encoding='utf-8') as state_file:
+            self.assertEqual(
+                {'last_replied_status_id': 12, 'last_sent_message_id': 3, 'refollow': {'friend_ids': [1, 2]}},
+                json.load(state_file))
+        self.assertEqual(['state.json'], os.listdir(self.directory.name))
+
+        store = JsonStateStore(self.path)
+        self.assertEqual(12, store.get('last_replied_status_id'))
+        self.assertEqual({'friend_ids': [1, 2]}, store.get('refollow'))
@@ -0,0 +1,69 @@
+from .stub_keyword_extraction import StubKeywordExtraction
+from .stub_state_store import StubStateStore
+from keyword_extraction.key_phrase_cache import KeyPhraseCache
+from keyword_extraction.key_phrase_cache import get_signature
+from keyword_extraction.key_phrase_cache import get_similarity
+import unittest
+
+LINES = ['Nagato reads a book number %d in the clubroom.' % i for i in range(40)]
+
+
+class CountingKeywordExtraction(StubKeywordExtraction):
+    def __init__(self):
+        self.sentences = []
+
+    def extract(self, sentence):
+        self.sentences.append(sentence)
+        return super().extract(sentence)
+
+
+class KeyPhraseCacheTest(unittest.TestCase):
+    def test_similarity(self):
+        signature = get_signature(LINES)
+        self.assertEqual(1.0, get_similarity(signature, get_signature(LINES)))
+        self.assertGreater(get_similarity(signature, get_signature(['Asakura Ryoko'] + LINES[:-1])), 0.9)
+        self.assertLess(get_similarity(signature, get_signature(['Suzumiya Haruhi is the god.'])), 0.1)
+
+    def test_reuse(self):
+        state_store = StubStateStore()
+        saved_states = []
+        update = state_store.update
+        state_store.update = lambda values: (saved_states.append(sorted(values)), update(values))
+        extraction = CountingKeywordExtraction()
+        cache = KeyPhraseCache(state_store, threshold=0.8)
+        (key_phrases, reused, similarity) = cache.extract(1, '\n'.join(LINES), extraction)
+        self.assertFalse(reused)
+        self.assertEqual(0.0, similarity)
+        self.assertEqual([['key_phrase_counts', 'key_phrases']], saved_states)
+
+        # A new status barely changes the timeline while the key phrases are loaded from the state.
+        cache = KeyPhraseCache(state_store, threshold=0.8)
+        self.assertEqual(
+            (key_phrases, True),
+            cache.extract(1, '\n'.join(['Asakura Ryoko'] + LINES[:-1]), extraction)[:2])
+        # Only the counts are saved when the key phrases are reused.
+        self.assertEqual(['key_phrase_counts'], saved_states[-1])
+        self.assertFalse(cache.extract(2, '\n'.join(LINES), extraction)[1])
+        self.assertFalse(cache.extract(1, 'Suzumiya Haruhi is the god.', extraction)[1])
+        self.assertEqual(3, len(extraction.sentences))
+        self.assertEqual(3, sum(1 for values in saved_states if 'key_phrases' in values))
+        # The reuse rate counts lookups in the previous instance too.
+        self.assertAlmostEqual(1 / 4, cache.get_reuse_rate())
+        self.assertAlmostEqual(1 / 4, KeyPhraseCache(state_store).get_reuse_rate())
+
+    def test_merge(self):
+        extraction = CountingKeywordExtraction()
+        state_store = StubStateStore()
+        cache = KeyPhraseCache(state_store, threshold=0.8, merges=True)
+        cache.extract(1, '\n'.join(LINES), extraction)
+        entry = state_store.get('key_phrases')['1']
+        (key_phrases, reused, similarity) = cache.extract(1, '\n'.join(['Asakura Ryoko'] + LINES[:-1]), extraction)
+        # Only the new line is extracted and its key phrases come first.
+        self.assertTrue(reused)
+        self.assertEqual('Asakura Ryoko', extraction.sentences[-1])
+        self.assertEqual(['Asakura', 'Ryoko', 'Nagato'], key_phrases[:3])
+        # The signature stays the one of the fully extracted text so that gradual changes are extracted again.
+        merged_entry = state_store.get('key_phrases')['1']
+        self.assertEqual(key_phrases, merged_entry['key_phrases'])
+        self.assertEqual(entry['signature'], merged_entry['signature'])
+        self.assertEqual(entry['updated_at'], merged_entry['updated_at'])
@@ -0,0 +1,61 @@
+from .stub_book_search import StubBookSearch
+from book_search.local_book_search import LocalBookSearch
+from book_search.local_book_search import build_index
+from book_search.tiered_book_search import TieredBookSearch
+import json
+import os
+import tempfile
+import unittest
+
+
+class LocalBookSearchTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.catalog_path = os.path.join(self.directory.name, 'catalog.jsonl')
+        self.index_path = os.path.join(self.directory.name, 'books.idx')
+        books = [
+            {'name': '涼宮ハルヒの憂鬱', 'url': 'https://www.example.com/1', 'popularity': 10},
+            {'name': '長門有希ちゃんの消失', 'url': 'https://www.example.com/2',
+             'description': '長門有希のスピンオフ', 'popularity': 5},
+            {'name': '涼宮ハルヒの消失', 'url': 'https://www.example.com/3', 'popularity': 8},
+            {'name': '涼宮ハルヒの消失', 'url': 'https://www.example.com/3', 'popularity': 8},
+        ]
+        with open(self.catalog_path, mode='w', encoding='utf-8') as catalog:
+            for book in books:
+                catalog.write(json.dumps(book, ensure_ascii=False) + '\n')
+        build_index(self.catalog_path, self.index_path)
+        self.book_search = LocalBookSearch(self.index_path)
+
+    def tearDown(self):
+        self.book_search.close()
+        self.directory.cleanup()
+
+    def test_search(self):
+        def search(queries):
+            (book, result_count) = self.book_search.search(queries)
+            return (book.url if book else None, result_count)
+
+        self.assertEqual(('https://www.example.com/3', 2), search(['涼宮ハルヒ']))
+        self.assertEqual(('https://www.example.com/3', 2), search(['消失']))
+        self.assertEqual(('https://www.example.com/2', 1), search(['スピンオフ', '消失']))
+        self.assertEqual((None, 0), search(['有希', '憂鬱']))
+        self.assertEqual((None, 0), search(['宮の']))
+        self.assertEqual((None, 0), search(['古泉']))
+
+    def test_search_many(self):
+        (books, result_count) = self.book_search.search_many(['消失'])
+        self.assertEqual(2, result_count)
+        self.assertEqual(['https://www.example.com/3', 'https://www.example.com/2'], [book.url for book in books])
+        self.assertEqual('長門有希のスピンオフ', books[1].description)
+        (books, result_count) = self.book_search.search_many(['消失'], 1)
+        self.assertEqual((['https://www.example.com/3'], 2), ([book.url for book in books], result_count))
+        self.assertEqual(([], 0), self.book_search.search_many(['古泉']))
+
+    def test_tiered_search(self):
+        path = os.path.join(self.directory.name, 'learned.jsonl')
+        book_search = TieredBookSearch(self.book_search, StubBookSearch(), path)
+        self.assertEqual('https://www.example.com/1', book_search.search(['憂鬱'])[0].url)
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual('Cute nagato book', book_search.search(['古泉'])[0].name)
+        with open(path, encoding='utf-8') as catalog:
+            self.assertEqual('Cute nagato book', json.loads(catalog.readline())['name'])
@@ -0,0 +1,71 @@
+from .stub_mastodon_server import StubMastodonServer
+from .stub_mastodon_server import create_notification
+from .stub_mastodon_server import create_status
+from .stub_state_store import StubStateStore
+from microblog.identity_cache import IdentityCache
+from microblog.mastodon_api import MastodonApi
+from microblog.microblog_api import AuthenticationError
+import unittest
+
+
+class MastodonApiTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StubMastodonServer()
+        self.server.start()
+        self.state_store = StubStateStore()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def get_notification_requests(self):
+        return [params for (path, params) in self.server.requests if path == '/api/v1/notifications']
+
+    def test_notification_cursor(self):
+        self.server.notifications = [
+            create_notification(i, 'mention', create_status(10 + i, 1, '@nagato %d' % i))
+            for i in range(5, 0, -1)]
+        mapi = MastodonApi('token', self.server.url, self.state_store)
+        mapi.notification_limit = 2
+
+        # Only the latest page is retrieved without the cursor.
+        self.assertEqual([15, 14], [int(reply.id) for reply in mapi.get_replies(0)])
+        self.assertEqual([5, 4], [reply.notification_id for reply in mapi.get_replies(0)])
+
+        mapi.mark_replied(mapi.get_replies(0)[1])
+        self.assertEqual(4, self.state_store.get('mastodon_notification_id'))
+
+        # New mentions are retrieved across pages since the cursor restored from the store.
+        self.server.notifications[0:0] = [
+            create_notification(i, 'mention', create_status(10 + i, 1, '@nagato %d' % i))
+            for i in range(9, 5, -1)]
+        self.server.requests.clear()
+        mapi = MastodonApi('token', self.server.url, self.state_store)
+        mapi.notification_limit = 2
+        self.assertEqual([19, 18, 17, 16, 15], [int(reply.id) for reply in mapi.get_replies(0)])
+        self.assertEqual(3, len(self.get_notification_requests()))
+        self.assertEqual(['mention'], self.get_notification_requests()[0]['types[]'])
+        self.assertEqual(['4'], self.get_notification_requests()[0]['since_id'])
+
+        # Mentions to statuses already replied to are filtered out.
+        self.assertEqual([19, 18], [int(reply.id) for reply in mapi.get_replies(18)])
+
+    def test_identity_cache(self):
+        identity_cache = IdentityCache(self.state_store)
+        mapi = MastodonApi('token', self.server.url, identity_cache=identity_cache)
+        self.assertEqual([], self.server.requests)
+        self.assertEqual('nagato', mapi.verify_credentials().screen_name)
+        self.assertEqual(1, len(self.server.requests))
+
+        # Another instance with the same token reuses the cached identity without any request.
+        mapi = MastodonApi('token', self.server.url, identity_cache=identity_cache)
+        self.assertEqual('15498', mapi.verify_credentials().id)
+        self.assertEqual(1, len(self.server.requests))
+
+        # The identity is verified again after an authentication error.
+        self.server.unauthorized = True
+        with self.assertRaises(AuthenticationError):
+            mapi.post('Nagato is cute.')
+        self.assertIsNone(identity_cache.get(mapi.identity_key))
+        self.server.unauthorized = False
+        self.assertEqual('nagato', mapi.verify_credentials().screen_name)
+        self.assertEqual(2, len([path for (path, params) in self.server.requests if 'verify_credentials' in path]))
@@ -0,0 +1,63 @@
+from .stub_book_search import StubBookSearch
+from .stub_keyword_extraction import StubKeywordExtraction
+from .stub_microblog_api import StubMicroblogApi
+from microblog import microblog_status
+from microblog import microblog_user
+from microblog.memoizing_microblog_api import MemoizingMicroblogApi
+from nagato import Nagato
+import datetime
+import logging
+import unittest
+
+
+class MemoizingMicroblogApiTest(unittest.TestCase):
+    def setUp(self):
+        self.stub = StubMicroblogApi()
+        self.microblog = MemoizingMicroblogApi(self.stub)
+
+    def test_respond_replies(self):
+        me = self.stub.me
+        user = microblog_user.MicroblogUser(1, 'kyon')
+        status: type = microblog_status.MicroblogStatus
+        created_at: type = datetime.datetime
+        self.stub.user_statuses[me.id] = [
+            status(20, '@kyon ...', me, created_at(2021, 1, 1, 9, 0, 0), 10, 1),
+        ]
+        self.stub.user_statuses[user.id] = [
+            status(5, 'Nagato is cute.', user, created_at(2021, 1, 1, 7, 0, 0), None, None),
+        ]
+        self.stub.replies = [
+            status(12, '@nagato お勧めの本は？', user, created_at(2021, 1, 1, 10, 1, 0), None, None),
+            status(11, '@nagato お勧めの本は？', user, created_at(2021, 1, 1, 10, 0, 0), None, None),
+        ]
+        nagato = Nagato(self.microblog, StubBookSearch(), StubKeywordExtraction())
+
+        with self.assertLogs('nagato', logging.DEBUG) as logs:
+            self.microblog.logger = logging.getLogger('nagato')
+            with self.microblog:
+                self.assertEqual(2, nagato.respondNewReplies())
+
+        # The timeline of the user is retrieved once for two requests.
+        self.assertEqual([11, 12], [post[2].id for post in self.stub.posts])
+        self.assertEqual([(me.id, None, None), (user.id, None, None)], self.stub.user_status_requests)
+        self.assertIn('Saved %d of' % self.microblog.saved_call_count, logs.output[-1])
+        self.assertEqual({}, self.microblog.results)
+
+    def test_invalidate(self):
+        self.stub.friend_ids = {1}
+        friend_ids = self.microblog.get_friend_ids()
+        friend_ids.add(2)
+        # Results can be modified by callers without affecting the memoized ones.
+        self.assertEqual({1}, self.microblog.get_friend_ids())
+        self.microblog.follow(3)
+        self.assertEqual({1, 3}, self.microblog.get_friend_ids())
+        self.assertEqual(1, self.microblog.saved_call_count)
+
+        me = self.microblog.verify_credentials()
+        self.stub.user_statuses = {me.id: [], 1: []}
+        self.microblog.get_user_statuses(me.id)
+        self.microblog.get_user_statuses(1)
+        self.microblog.post('Hello')
+        self.microblog.get_user_statuses(me.id)
+        self.microblog.get_user_statuses(1)
+        self.assertEqual([(me.id, None, None), (1, None, None), (me.id, None, None)], self.stub.user_status_requests)
@@ -0,0 +1,32 @@
+from microblog.microblog_status import MicroblogStatus
+from microblog.microblog_user import MicroblogUser
+from microblog.twitter_status import Tweet
+import datetime
+import twitter
+import unittest
+
+
+class MicroblogStatusTest(unittest.TestCase):
+    def test_tweet(self):
+        tweet = Tweet(twitter.Status.NewFromJsonDict({
+            'id': 10,
+            'text': 'Nagato is cute.',
+            'created_at': 'Fri Jan 01 10:00:00 +0000 2021',
+            'user': {'id': 1, 'screen_name': 'kyon'},
+        }))
+
+        self.assertEqual(10, tweet.id)
+        self.assertEqual('kyon', tweet.user.screen_name)
+        self.assertEqual(datetime.datetime(2021, 1, 1, 10, tzinfo=datetime.timezone.utc), tweet.created_at)
+        self.assertEqual(datetime.timedelta(hours=9), tweet.created_at.utcoffset())
+        # Statuses do not have __dict__ to keep them compact.
+        with self.assertRaises(AttributeError):
+            tweet.extra = None
+
+    def test_created_at(self):
+        user = MicroblogUser(1, 'kyon')
+        created_at = datetime.datetime(2021, 1, 1, 10, tzinfo=datetime.timezone.utc)
+        self.assertEqual(created_at, MicroblogStatus(10, 'Nagato is cute.', user, created_at, None, None).created_at)
+        # Only subclasses which decode it lazily can omit created_at.
+        with self.assertRaises(AssertionError):
+            MicroblogStatus(10, 'Nagato is cute.', user, None, None, None)
@@ -1,11 +1,20 @@
 from .stub_book_search import StubBookSearch
 from .stub_keyword_extraction import StubKeywordExtraction
 from .stub_microblog_api import StubMicroblogApi
+from .stub_state_store import StubStateStore
+from book_search.book import Book
+from microblog import id_set
 from microblog import microblog_status
 from microblog import microblog_user
 import datetime
 import logging
 import nagato
+import os
+import subprocess
+import sys
+import textwrap
+import threading
+import time
 import unittest
 
 
@@ -26,6 +35,7 @@ class NagatoTest(unittest.TestCase):
         self.nagato.microblog.friend_ids = {3, 6, 9, 12, 15}
         self.nagato.refollow()
         self.assertEqual({2, 4, 6, 8, 10, 12, 14, 16}, self.nagato.microblog.follower_ids)
+        self.assertEqual({2, 4, 6, 8, 10, 12, 14, 16}, self.nagato.microblog.friend_ids)
 
     def test_book_recommendation(self):
         user = microblog_user.MicroblogUser(15498, 'nagato')
@@ -41,3 +51,260 @@ class NagatoTest(unittest.TestCase):
         (response_text, response_url) = self.nagato.getResponse(15498, 'お勧めの本は？')
         self.assertEqual('Cute nagato book', response_text)
         self.assertEqual('https://www.example.com/#cute_nagato_book', response_url)
+
+    def test_respond_new_replies(self):
+        me = self.microblog.me
+        user = microblog_user.MicroblogUser(1, 'kyon')
+        status: type = microblog_status.MicroblogStatus
+        created_at: type = datetime.datetime
+        self.microblog.user_statuses[me.id] = [
+            status(20, '@kyon ...', me, created_at(2021, 1, 1, 9, 0, 0), 10, 1),
+        ]
+        self.microblog.replies = [
+            status(13, '@nagato おやすみ', user, created_at(2021, 1, 1, 10, 2, 0), None, None),
+            status(12, '@nagato こんばんは', user, created_at(2021, 1, 1, 10, 1, 0), None, None),
+            status(11, '@nagato おはよう', user, created_at(2021, 1, 1, 10, 0, 0), None, None),
+            status(10, '@nagato こんにちは', user, created_at(2021, 1, 1, 8, 0, 0), None, None),
+        ]
+
+        self.nagato.state_store = StubStateStore()
+        self.assertEqual(0, self.nagato.respondNewReplies(deadline=0))
+        self.assertEqual([], self.microblog.posts)
+
+        self.assertEqual(2, self.nagato.respondNewReplies(max_count=2))
+        self.assertEqual([11, 12], [post[2].id for post in self.microblog.posts])
+
+        # Replies already responded to are skipped in the next invocation.
+        self.microblog.posts = []
+        self.assertEqual(1, self.nagato.respondNewReplies())
+        self.assertEqual([13], [post[2].id for post in self.microblog.posts])
+
+        self.microblog.posts = []
+        self.assertEqual(0, self.nagato.respondNewReplies())
+        self.assertEqual([], self.microblog.posts)
+
+    def test_respond_new_replies_concurrently(self):
+        me = self.microblog.me
+        status: type = microblog_status.MicroblogStatus
+        created_at: type = datetime.datetime
+        self.microblog.user_statuses[me.id] = []
+        self.microblog.replies = []
+        for i in range(3):
+            user = microblog_user.MicroblogUser(i + 1, 'user%d' % (i + 1))
+            self.microblog.user_statuses[user.id] = [
+                status(i, 'Nagato is cute.', user, created_at(2021, 1, 1, 9, 0, 0), None, None),
+            ]
+            self.microblog.replies.append(
+                status(10 + i, '@nagato お勧めの本は？', user, created_at(2021, 1, 1, 10, i, 0), None, None))
+
+        # Every search waits for the others so that it never finishes unless they run concurrently.
+        barrier = threading.Barrier(3, timeout=5)
+
+        def search(queries):
+            barrier.wait()
+            return (Book('Book for %s' % threading.get_ident(), None), 1)
+
+        self.book_search.search = search
+        self.nagato.max_workers = 3
+        self.assertEqual(3, self.nagato.respondNewReplies())
+        self.assertEqual([10, 11, 12], [post[2].id for post in self.microblog.posts])
+
+    def test_respond_replies_with_errors(self):
+        user = microblog_user.MicroblogUser(1, 'kyon')
+        status: type = microblog_status.MicroblogStatus
+        created_at: type = datetime.datetime
+        replies = [status(10 + i, '@nagato %d' % i, user, created_at(2021, 1, 1, 10, i, 0), None, None)
+                   for i in range(3)]
+        released = threading.Event()
+
+        def get_response(user_id, text):
+            if text == '@nagato 0':
+                raise IOError('Failed')
+            if text == '@nagato 2':
+                # A response which does not finish until the deadline.
+                released.wait(5)
+            return (text, None)
+
+        self.nagato.getResponse = get_response
+        self.nagato.max_workers = 3
+        try:
+            # The failed reply is skipped and the slow one is deferred without waiting for it.
+            started_at = time.monotonic()
+            self.assertEqual(1, self.nagato.respondReplies(replies, time.monotonic() + 0.2))
+        finally:
+            released.set()
+        self.assertLess(time.monotonic() - started_at, 5)
+        self.assertEqual([11], [post[2].id for post in self.microblog.posts])
+
+    def test_respond_replies_exit(self):
+        # The process exits by the deadline without waiting for the slow response.
+        script = textwrap.dedent('''
+            import datetime
+            import nagato
+            import time
+            from microblog import microblog_status
+            from microblog import microblog_user
+            from tests.stub_book_search import StubBookSearch
+            from tests.stub_keyword_extraction import StubKeywordExtraction
+            from tests.stub_microblog_api import StubMicroblogApi
+
+            instance = nagato.Nagato(StubMicroblogApi(), StubBookSearch(), StubKeywordExtraction())
+            instance.getResponse = lambda user_id, text: time.sleep(5)
+            user = microblog_user.MicroblogUser(1, 'kyon')
+            reply = microblog_status.MicroblogStatus(
+                10, '@nagato', user, datetime.datetime(2021, 1, 1, 10, 0, 0), None, None)
+            instance.respondReplies([reply], time.monotonic() + 0.2)
+        ''')
+        started_at = time.monotonic()
+        subprocess.run(
+            [sys.executable, '-c', script],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            check=True,
+            timeout=10)
+        self.assertLess(time.monotonic() - started_at, 4)
+
+    def test_state_store(self):
+        me = self.microblog.me
+        user = microblog_user.MicroblogUser(1, 'kyon')
+        status: type = microblog_status.MicroblogStatus
+        created_at: type = datetime.datetime
+        # The most recent status is not a reply, which the timeline scan cannot handle.
+        self.microblog.user_statuses[me.id] = [
+            status(30, '春は、あけぼの。', me, created_at(2021, 1, 1, 11, 0, 0), None, None),
+        ]
+        self.microblog.replies = [
+            status(12, '@nagato こんばんは', user, created_at(2021, 1, 1, 10, 1, 0), None, None),
+            status(11, '@nagato おはよう', user, created_at(2021, 1, 1, 10, 0, 0), None, None),
+        ]
+        self.nagato.state_store = StubStateStore()
+        self.nagato.state_store.set('last_replied_status_id', 10)
+
+        self.assertEqual(2, self.nagato.respondNewReplies())
+        self.assertEqual(12, self.nagato.state_store.get('last_replied_status_id'))
+        self.assertEqual(0, self.nagato.respondNewReplies())
+
+        self.nagato.microblog.follower_ids = {2, 4, 6}
+        self.nagato.microblog.friend_ids = {3, 6}
+        self.nagato.refollow()
+        snapshot = self.nagato.state_store.get('refollow')
+        self.assertEqual([2, 4, 6], id_set.decode(snapshot['friend_ids']).tolist())
+        self.assertEqual([2, 4, 6], id_set.decode(snapshot['follower_ids']).tolist())
+
+        # Friends are loaded from the snapshot while followers are retrieved every time.
+        self.nagato.microblog.follower_ids = {2, 6, 8}
+        self.nagato.microblog.iter_friend_id_pages = lambda: self.fail('Friends are retrieved.')
+        self.nagato.refollow()
+        self.assertEqual({2, 6, 8}, self.nagato.microblog.friend_ids)
+        snapshot = self.nagato.state_store.get('refollow')
+        self.assertEqual([2, 6, 8], id_set.decode(snapshot['friend_ids']).tolist())
+
+    def test_recommend_book_concurrently(self):
+        books = [
+            Book('Nagato Yuki and Asakura Ryoko', 'https://www.example.com/1'),
+            Book('Nagato Yuki', 'https://www.example.com/2'),
+            Book('Asakura Ryoko', 'https://www.example.com/3'),
+            Book('Suzumiya Haruhi and Nagato Yuki', 'https://www.example.com/4'),
+            Book('Suzumiya Haruhi', 'https://www.example.com/5'),
+            Book('Kyon', 'https://www.example.com/6'),
+        ]
+        searched_queries = []
+        lock = threading.Lock()
+
+        def search(queries):
+            with lock:
+                searched_queries.append(frozenset(queries))
+            hits = [book for book in books if all(query in book.name for query in queries)]
+            return (hits[0] if hits else None, len(hits))
+
+        self.book_search.search = search
+        key_phrase_lists = [
+            [],
+            ['Nagato'],
+            ['Nagato', 'Yuki', 'Ryoko'],
+            ['Koizumi', 'Haruhi', 'Mikuru', 'Yuki', 'Nagato', 'Kyon'],
+            ['Yuki', 'Tsuruya', 'Asakura', 'Kimidori', 'Haruhi', 'Ryoko'],
+        ]
+        for key_phrases in key_phrase_lists:
+            self.nagato.search_concurrency = 1
+            expected_book = self.nagato.recommendBook(key_phrases)
+            self.nagato.search_concurrency = 4
+            searched_queries.clear()
+            self.assertIs(expected_book, self.nagato.recommendBook(key_phrases))
+            self.assertEqual(len(searched_queries), len(set(searched_queries)))
+
+        # The search stops within the budget with and without concurrency.
+        self.nagato.search_max_queries = 2
+        for search_concurrency in (1, 4):
+            self.nagato.search_concurrency = search_concurrency
+            searched_queries.clear()
+            self.nagato.recommendBook(key_phrase_lists[-1])
+            self.assertEqual(2, len(searched_queries))
+
+    def test_recommend_book_by_ranking(self):
+        books = [
+            Book('Suzumiya Haruhi', 'https://www.example.com/1', 'A story of the SOS Brigade.'),
+            Book('Nagato Yuki', 'https://www.example.com/2', 'Nagato Yuki and Asakura Ryoko go shopping.'),
+            Book('Nagato Yuki and Suzumiya Haruhi', 'https://www.example.com/3'),
+            Book('Kyon', 'https://www.example.com/4'),
+        ]
+        searched_queries = []
+
+        def search_many(queries, max_results=50):
+            searched_queries.append((queries, max_results))
+            hits = [book for book in books if all(query in book.name for query in queries)]
+            return (hits[:max_results], len(hits))
+
+        self.book_search.search_many = search_many
+        self.nagato.search_rerank_results = 50
+        self.assertIsNone(self.nagato.recommendBook([]))
+        # The book matching the most key phrases in its name or description is recommended.
+        book = self.nagato.recommendBook(['Haruhi', 'Nagato', 'Ryoko', 'Asakura'])
+        self.assertEqual('https://www.example.com/2', book.url)
+        self.assertEqual([(['Haruhi'], 50), (['Nagato'], 50)], searched_queries)
+
+        # Ties are broken by the order of search results for the top key phrases.
+        self.assertEqual('https://www.example.com/1', self.nagato.recommendBook(['Haruhi', 'Kyon']).url)
+        self.nagato.search_concurrency = 4
+        self.assertEqual('https://www.example.com/1', self.nagato.recommendBook(['Haruhi', 'Kyon']).url)
+
+    def test_timeline_speed(self):
+        user = microblog_user.MicroblogUser(1, 'kyon')
+        status: type = microblog_status.MicroblogStatus
+        now = datetime.datetime.now(datetime.timezone.utc)
+        self.microblog.home_statuses = [
+            status(i, 'Nagato is cute.', user, now - datetime.timedelta(minutes=i * 10), None, None)
+            for i in range(6, 0, -1)]
+        self.nagato.state_store = StubStateStore()
+
+        (response_text, response_url) = self.nagato.getResponse(1, '流速は？')
+        speed = self.nagato.getTimelineSpeed()
+        self.assertEqual('流速 %d' % speed, response_text)
+
+        self.microblog.home_statuses.insert(0, status(7, 'Nagato is cute.', user, now, None, None))
+        self.microblog.user_statuses[self.microblog.me.id] = []
+        self.nagato.run()
+        self.assertLess(speed, self.nagato.getTimelineSpeed())
+        self.assertEqual(7, self.nagato.state_store.get('timeline_speed')['last_id'])
+
+    def test_stale_timeline_speed(self):
+        user = microblog_user.MicroblogUser(1, 'kyon')
+        status: type = microblog_status.MicroblogStatus
+        now = datetime.datetime.now(datetime.timezone.utc)
+        # The state was saved from statuses 2 days ago and never updated since then.
+        estimator = nagato.TimelineSpeedEstimator()
+        estimator.update(
+            [status(i, 'Nagato is cute.', user, now - datetime.timedelta(days=2, minutes=i), None, None)
+             for i in range(10, 0, -1)],
+            now=(now - datetime.timedelta(days=2)).timestamp())
+        self.nagato.state_store = StubStateStore()
+        self.nagato.state_store.set('timeline_speed', estimator.to_dict())
+        self.nagato = nagato.Nagato(
+            self.microblog, self.book_search, self.keyphrase_extraction, state_store=self.nagato.state_store)
+        self.microblog.home_statuses = [
+            status(100 - i, 'Nagato is cute.', user, now - datetime.timedelta(minutes=i), None, None)
+            for i in range(50)]
+
+        # New statuses are counted instead of answering from the stale state.
+        (response_text, response_url) = self.nagato.getResponse(1, '流速は？')
+        self.assertNotEqual('流速 0', response_text)
+        self.assertEqual(100, self.nagato.state_store.get('timeline_speed')['last_id'])
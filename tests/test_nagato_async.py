@@ -0,0 +1,80 @@
+from .stub_book_search import StubBookSearch
+from .stub_keyword_extraction import StubKeywordExtraction
+from .stub_microblog_api import StubMicroblogApi
+from .stub_state_store import StubStateStore
+from microblog import id_set
+from microblog import microblog_status
+from microblog import microblog_user
+from microblog.async_microblog_api import ExecutorAsyncMicroblogApi
+import asyncio
+import datetime
+import nagato
+import nagato_async
+import threading
+import unittest
+
+
+class NagatoAsyncTest(unittest.TestCase):
+    def setUp(self):
+        self.microblog = StubMicroblogApi()
+        self.nagato = nagato.Nagato(self.microblog, StubBookSearch(), StubKeywordExtraction())
+
+    def test_run_async(self):
+        me = self.microblog.me
+        user = microblog_user.MicroblogUser(1, 'kyon')
+        status: type = microblog_status.MicroblogStatus
+        created_at: type = datetime.datetime
+        self.microblog.user_statuses[me.id] = [
+            status(20, '@kyon ...', me, created_at(2021, 1, 1, 9, 0, 0), 10, 1),
+        ]
+        self.microblog.replies = [
+            status(12, '@nagato おやすみ', user, created_at(2021, 1, 1, 10, 1, 0), None, None),
+            status(11, '@nagato おはよう', user, created_at(2021, 1, 1, 10, 0, 0), None, None),
+        ]
+        self.microblog.home_statuses = [
+            status(30, 'Nagato is cute.', user, datetime.datetime.now(datetime.timezone.utc), None, None),
+        ]
+
+        # Independent requests wait for each other so that they never finish unless sent concurrently.
+        barrier = threading.Barrier(3, timeout=5)
+
+        def wait_for_others(function):
+            def wrapper(*args, **kwargs):
+                barrier.wait()
+                return function(*args, **kwargs)
+            return wrapper
+
+        for name in ['get_sent_messages', 'get_user_statuses', 'get_home_statuses']:
+            setattr(self.microblog, name, wait_for_others(getattr(self.microblog, name)))
+
+        # All the new replies are responded to as run() does.
+        asyncio.run(nagato_async.run(self.nagato))
+        self.assertEqual([11, 12], [post[2].id for post in self.microblog.posts if post[2]])
+        self.assertEqual(30, self.nagato.timeline_speed.last_id)
+
+    def test_refollow_async(self):
+        self.nagato.state_store = StubStateStore()
+        self.microblog.follower_ids = {2, 4, 6, 8}
+        self.microblog.friend_ids = {3, 6, 9}
+        asyncio.run(nagato_async.refollow(self.nagato))
+        self.assertEqual({2, 4, 6, 8}, self.microblog.friend_ids)
+        self.assertEqual([2, 4, 6, 8], list(id_set.decode(self.nagato.state_store.get('refollow')['friend_ids'])))
+
+    def test_update_timeline_speed_async(self):
+        user = microblog_user.MicroblogUser(1, 'kyon')
+        self.microblog.home_statuses = [microblog_status.MicroblogStatus(
+            30, 'Nagato is cute.', user, datetime.datetime.now(datetime.timezone.utc), None, None)]
+        threads = []
+        update = self.nagato.updateTimelineSpeed
+        self.nagato.updateTimelineSpeed = \
+            lambda statuses: (threads.append(threading.current_thread()), update(statuses))
+
+        async def update_timeline_speed():
+            await nagato_async.update_timeline_speed(
+                self.nagato, ExecutorAsyncMicroblogApi(self.microblog))
+            return threading.current_thread()
+
+        # Counting statuses may write files, which must not block the event loop.
+        loop_thread = asyncio.run(update_timeline_speed())
+        self.assertNotIn(loop_thread, threads)
+        self.assertEqual(30, self.nagato.timeline_speed.last_id)
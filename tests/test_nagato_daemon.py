@@ -0,0 +1,143 @@
+from .stub_book_search import StubBookSearch
+from .stub_keyword_extraction import StubKeywordExtraction
+from .stub_mastodon_server import StubMastodonServer
+from .stub_mastodon_server import create_notification
+from .stub_mastodon_server import create_status
+from .stub_microblog_api import StubMicroblogApi
+from microblog import microblog_status
+from microblog import microblog_user
+from microblog.mastodon_api import MastodonApi
+from nagato import Nagato
+from nagato_daemon import NagatoDaemon
+import datetime
+import threading
+import unittest
+
+
+class ScriptedStreamMicroblogApi(StubMicroblogApi):
+    """
+    A stub microblog API which streams scripted replies or raises a scripted error on each connection.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.connections = []
+        self.on_drained = None
+
+    def stream_replies(self, on_reply, on_connect=None):
+        if not self.connections:
+            self.on_drained()
+            return
+        connection = self.connections.pop(0)
+        if isinstance(connection, Exception):
+            raise connection
+        on_connect()
+        for reply in connection:
+            on_reply(reply)
+
+
+class NagatoDaemonTest(unittest.TestCase):
+    def test_fake_streaming_endpoint(self):
+        server = StubMastodonServer()
+        server.stream_events = [
+            [
+                ('notification', create_notification(1, 'mention', create_status(11, 1, '@nagato おはよう'))),
+                ('notification', create_notification(2, 'follow')),
+            ],
+            [],
+        ]
+        server.start()
+        try:
+            mapi = MastodonApi('token', server.url)
+            daemon = NagatoDaemon(Nagato(mapi, StubBookSearch(), StubKeywordExtraction()), min_backoff=0.01)
+            daemon_thread = threading.Thread(target=daemon.run)
+            daemon_thread.start()
+            self.assertTrue(server.drained.wait(10))
+            daemon.stop()
+            daemon_thread.join(10)
+            self.assertFalse(daemon_thread.is_alive())
+        finally:
+            server.stop()
+
+        # Only the mention is responded to and the stream is reconnected after it is closed.
+        self.assertEqual(['11'], [post['in_reply_to_id'][0] for post in server.posts])
+        self.assertEqual(2, server.stream_connections)
+
+    def test_reconnect(self):
+        microblog = ScriptedStreamMicroblogApi()
+        me = microblog.me
+        user = microblog_user.MicroblogUser(1, 'kyon')
+        status: type = microblog_status.MicroblogStatus
+        created_at: type = datetime.datetime
+        microblog.user_statuses[me.id] = []
+        reply = status(11, '@nagato おはよう', user, created_at(2021, 1, 1, 10, 0, 0), None, None)
+        microblog.replies = [reply]
+        microblog.connections = [
+            [reply, status(12, '@nagato こんにちは', user, created_at(2021, 1, 1, 10, 1, 0), None, None)],
+            IOError('Disconnected'),
+            [],
+        ]
+        nagato = Nagato(microblog, StubBookSearch(), StubKeywordExtraction())
+        task_executed = threading.Event()
+        daemon = NagatoDaemon(nagato, [(0.01, task_executed.set)], min_backoff=0.01)
+
+        def on_drained():
+            self.assertTrue(task_executed.wait(5))
+            daemon.stop()
+
+        microblog.on_drained = on_drained
+        daemon.run()
+
+        # The reply retrieved on connection is not responded to again when streamed.
+        self.assertEqual([11, 12], [post[2].id for post in microblog.posts])
+        self.assertEqual([], microblog.connections)
+
+    def test_failed_reply(self):
+        microblog = ScriptedStreamMicroblogApi()
+        user = microblog_user.MicroblogUser(1, 'kyon')
+        status: type = microblog_status.MicroblogStatus
+        created_at: type = datetime.datetime
+        microblog.user_statuses[microblog.me.id] = []
+        microblog.replies = [status(11, '@nagato 失敗', user, created_at(2021, 1, 1, 10, 0, 0), None, None)]
+        microblog.connections = [
+            [status(12, '@nagato 失敗', user, created_at(2021, 1, 1, 10, 1, 0), None, None)],
+            [status(13, '@nagato おはよう', user, created_at(2021, 1, 1, 10, 2, 0), None, None)],
+        ]
+        nagato = Nagato(microblog, StubBookSearch(), StubKeywordExtraction())
+        get_response = nagato.getResponse
+
+        def fail(user_id, text):
+            if '失敗' in text:
+                raise IOError('Failed')
+            return get_response(user_id, text)
+
+        nagato.getResponse = fail
+        daemon = NagatoDaemon(nagato, min_backoff=0.01)
+        microblog.on_drained = daemon.stop
+        daemon.run()
+
+        # Failed replies are skipped instead of being retried on every reconnection.
+        self.assertEqual([13], [post[2].id for post in microblog.posts])
+
+    def test_polling(self):
+        microblog = StubMicroblogApi()
+        user = microblog_user.MicroblogUser(1, 'kyon')
+        status: type = microblog_status.MicroblogStatus
+        microblog.user_statuses[microblog.me.id] = []
+        microblog.replies = [status(11, '@nagato おはよう', user, datetime.datetime(2021, 1, 1), None, None)]
+        nagato = Nagato(microblog, StubBookSearch(), StubKeywordExtraction())
+        daemon = NagatoDaemon(nagato, poll_interval=0.01)
+        post = microblog.post
+
+        def post_and_stop(text, url=None, in_reply_to=None):
+            post(text, url, in_reply_to)
+            daemon.stop()
+
+        microblog.post = post_and_stop
+        daemon_thread = threading.Thread(target=daemon.run)
+        daemon_thread.start()
+        daemon_thread.join(10)
+
+        # Replies are polled without streaming.
+        self.assertFalse(daemon_thread.is_alive())
+        self.assertEqual([11], [post[2].id for post in microblog.posts])
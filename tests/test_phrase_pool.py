@@ -0,0 +1,38 @@
+from phrase_pool import PhrasePool
+import os
+import tempfile
+import unittest
+
+
+class PhrasePoolTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'phrases.txt')
+        self.write('春は、あけぼの。\n夏は、夜。\n\n秋は、夕暮。\n冬は、つとめて。')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, text, mtime=None):
+        with open(self.path, mode='w', encoding='utf-8') as phrase_file:
+            phrase_file.write(text)
+        if mtime:
+            os.utime(self.path, (mtime, mtime))
+
+    def test_choice(self):
+        pool = PhrasePool(self.path, recent_count=3, max_retries=1000)
+        phrases = [pool.choice() for _ in range(4)]
+        self.assertEqual({'春は、あけぼの。', '夏は、夜。', '秋は、夕暮。', '冬は、つとめて。'}, set(phrases))
+
+        # The file is reloaded only when it is modified.
+        self.write('YUKI.N>見えてる？\n', 1)
+        self.assertEqual('YUKI.N>見えてる？', pool.choice())
+        self.assertEqual('YUKI.N>見えてる？', pool.choice())
+
+        self.write('', 2)
+        with self.assertRaises(IndexError):
+            pool.choice()
+
+    def test_weight(self):
+        pool = PhrasePool(self.path, weight=lambda phrase: 1 if phrase.startswith('秋') else 0)
+        self.assertEqual({'秋は、夕暮。'}, set(pool.choice() for _ in range(10)))
@@ -0,0 +1,27 @@
+from text_normalization import normalize_text
+from text_normalization import prepare_text
+import unittest
+
+
+class TextNormalizationTest(unittest.TestCase):
+    def test_normalize_text(self):
+        # Mentions, hashtags and links are anchors in Mastodon statuses.
+        self.assertEqual('長門は"可愛い" 見て', normalize_text(
+            '<p><span class="h-card"><a href="https://example.com/@kyon" class="u-url mention">'
+            '@<span>kyon</span></a></span> 長門は&quot;可愛い&quot; '
+            '<a href="https://example.com/tags/nagato" class="mention hashtag" rel="tag">#<span>nagato</span></a>'
+            '<br>見て <a href="https://example.com/books" rel="nofollow">'
+            '<span class="invisible">https://</span><span class="">example.com/books</span></a></p>'))
+        self.assertEqual('長門有希の本 & 、こんにちは', normalize_text(
+            'RT @kyon: 長門有希の本 https://t.co/abc #長門 &amp; @nagato、こんにちは'))
+
+    def test_prepare_text(self):
+        texts = ['Nagato is cute.', '<p>Nagato  is cute.</p>', '@kyon', '長門有希', 'She is Nagato.']
+        self.assertEqual('Nagato is cute.\n長門有希\nShe is Nagato.', prepare_text(texts))
+        # Texts are dropped after the budget is exhausted.
+        self.assertEqual('Nagato is cute.\n長門有希', prepare_text(texts, 28))
+        self.assertEqual('長門', prepare_text(['長門有希'], 8))
+        # Texts already normalized are only deduplicated and joined.
+        self.assertEqual(
+            'Nagato is cute.\n@kyon',
+            prepare_text(['Nagato is cute.', '@kyon', '@kyon'], normalizes=False))
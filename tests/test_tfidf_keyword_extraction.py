@@ -0,0 +1,32 @@
+from keyword_extraction import tfidf_keyword_extraction
+import os
+import tempfile
+import unittest
+
+
+class TfidfKeywordExtractionTest(unittest.TestCase):
+    def test_tokenize_words(self):
+        self.assertEqual(
+            ['涼宮ハルヒ', '憂鬱', '2006年', '長門有希', 'sos団'],
+            tfidf_keyword_extraction.tokenize_words(
+                '<p>涼宮ハルヒの憂鬱は2006年の@kyon 長門有希と<a href="https://example.com/">SOS団</a>&amp;の</p>'))
+        self.assertEqual(
+            ['長門', '門有', '有希', '本棚'],
+            tfidf_keyword_extraction.get_ngram_tokenizer(2)('長門有希の本棚'))
+
+    def test_extract(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'tfidf.tsv.gz')
+            extraction = tfidf_keyword_extraction.TfidfKeywordExtraction(path)
+            extraction.learn(['今日の天気は晴れ', '今日の天気は雨', '今日は読書'])
+
+            extraction = tfidf_keyword_extraction.TfidfKeywordExtraction(path, max_phrases=2)
+            self.assertEqual(3, extraction.document_count)
+            self.assertEqual(['長門有希', '読書'], extraction.extract('今日は長門有希と読書。長門有希も。'))
+            self.assertEqual(4, extraction.document_count)
+
+            # Extracted sentences are saved only when flushed.
+            self.assertEqual(3, tfidf_keyword_extraction.TfidfKeywordExtraction(path).document_count)
+            with extraction:
+                pass
+            self.assertEqual(4, tfidf_keyword_extraction.TfidfKeywordExtraction(path).document_count)
@@ -0,0 +1,51 @@
+from microblog import microblog_status
+from microblog import microblog_user
+from timeline_speed import TimelineSpeedEstimator
+import datetime
+import unittest
+
+
+class TimelineSpeedEstimatorTest(unittest.TestCase):
+    def setUp(self):
+        self.user = microblog_user.MicroblogUser(1, 'kyon')
+        self.now = datetime.datetime(2021, 1, 1, 12, 0, 0, tzinfo=datetime.timezone.utc).timestamp()
+
+    def get_statuses(self, ids_and_minutes):
+        return [microblog_status.MicroblogStatus(
+                    status_id, '', self.user,
+                    datetime.datetime.fromtimestamp(self.now - minutes * 60, datetime.timezone.utc),
+                    None, None)
+                for (status_id, minutes) in ids_and_minutes]
+
+    def test_get_speed(self):
+        estimator = TimelineSpeedEstimator(window=60)
+        self.assertTrue(estimator.is_empty())
+        self.assertEqual(0, estimator.get_speed(self.now))
+
+        # 6 statuses in the last 30 minutes
+        estimator.update(self.get_statuses([(6, 0), (5, 5), (4, 10), (3, 15), (2, 20), (1, 29)]), now=self.now)
+        self.assertEqual(6, estimator.last_id)
+        self.assertEqual(12, estimator.get_speed(self.now))
+
+        # 4 more statuses in the next 30 minutes while statuses older than an hour are evicted
+        now = self.now + 30 * 60
+        estimator = TimelineSpeedEstimator.from_dict(estimator.to_dict(), window=60)
+        estimator.update(self.get_statuses([(10, -30), (9, -25), (8, -20), (7, -10)]), now=now)
+        self.assertEqual(10, estimator.get_speed(now))
+        self.assertEqual(8, estimator.get_speed(now + 10 * 60))
+
+        # Statuses after a gap restart counting.
+        estimator.update(self.get_statuses([(20, -40), (19, -39)]), contiguous=False, now=now)
+        self.assertEqual(60, estimator.get_speed(self.now + 40 * 60))
+
+    def test_is_stale(self):
+        estimator = TimelineSpeedEstimator(window=60)
+        self.assertTrue(estimator.is_stale(300, self.now))
+        estimator.update(self.get_statuses([(1, 0)]), now=self.now)
+        self.assertFalse(estimator.is_stale(300, self.now + 300))
+        self.assertTrue(estimator.is_stale(300, self.now + 301))
+
+        # An update without new statuses is still an update.
+        estimator = TimelineSpeedEstimator.from_dict(estimator.to_dict(), window=60)
+        estimator.update([], now=self.now + 600)
+        self.assertFalse(estimator.is_stale(300, self.now + 600))
@@ -0,0 +1,75 @@
+from .stub_microblog_api import StubMicroblogApi
+from microblog import microblog_status
+from microblog import microblog_user
+from microblog.user_timeline_cache import UserTimelineCache
+import datetime
+import os
+import tempfile
+import unittest
+
+
+class UserTimelineCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.microblog = StubMicroblogApi()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'timelines.sqlite3')
+        self.user = microblog_user.MicroblogUser(1, 'kyon')
+        self.now = datetime.datetime.now(datetime.timezone.utc)
+        self.microblog.user_statuses[self.user.id] = []
+
+    def add_status(self, status_id, text, age=0):
+        created_at = self.now - datetime.timedelta(seconds=age)
+        status = microblog_status.MicroblogStatus(status_id, text, self.user, created_at, None, None)
+        self.microblog.user_statuses[self.user.id].insert(0, status)
+
+    def test_get_statuses(self):
+        cache = UserTimelineCache(self.microblog, self.path, max_count=3, max_age=60)
+        self.add_status(1, 'Expired', 120)
+        self.add_status(2, '<p>Nagato is cute.</p>')
+        self.add_status(3, 'She is Nagato.')
+        self.assertEqual([3, 2], [status.id for status in cache.get_statuses(self.user.id)])
+        self.assertEqual('Nagato is cute.', cache.get_statuses(self.user.id)[1].text)
+
+        # Only new statuses are retrieved and the oldest ones are evicted.
+        self.add_status(4, 'Do you know Nagato?')
+        self.add_status(5, 'How cute she is!')
+        cache = UserTimelineCache(self.microblog, self.path, max_count=3, max_age=60)
+        self.assertEqual([5, 4, 3], [status.id for status in cache.get_statuses(self.user.id)])
+        self.assertEqual(
+            [(1, None, None), (1, None, 3), (1, None, 3)],
+            self.microblog.user_status_requests)
+
+    def test_gap(self):
+        cache = UserTimelineCache(self.microblog, self.path, max_count=10, max_age=60)
+        self.add_status(1, 'Nagato is cute.')
+        cache.get_statuses(self.user.id)
+
+        # A full page of new statuses may not reach the cached ones.
+        self.microblog.user_timeline_limit = 2
+        self.add_status(2, 'She is Nagato.')
+        self.add_status(3, 'Do you know Nagato?')
+        self.assertEqual([3, 2], [status.id for status in cache.get_statuses(self.user.id)])
+
+    def test_save(self):
+        cache = UserTimelineCache(self.microblog, self.path, max_count=3, max_age=60)
+        saved_keys = []
+        save = cache.save
+        cache.save = lambda key, statuses, now: (saved_keys.append(key), save(key, statuses, now))
+        self.add_status(1, 'Nagato is cute.')
+        cache.get_statuses(self.user.id)
+        self.assertEqual(['1'], saved_keys)
+
+        # The timeline is not saved without new statuses.
+        cache.get_statuses(self.user.id)
+        self.assertEqual(['1'], saved_keys)
+
+        # Each user has its own row which is saved and loaded separately.
+        other_user = microblog_user.MicroblogUser(2, 'haruhi')
+        self.microblog.user_statuses[other_user.id] = [microblog_status.MicroblogStatus(
+            2, 'I am the god.', other_user, self.now, None, None)]
+        cache.get_statuses(other_user.id)
+        self.assertEqual(['1', '2'], saved_keys)
+        self.assertEqual(
+            [(1, 'Nagato is cute.')],
+            [(status.id, status.text) for status in UserTimelineCache(self.microblog, self.path).load('1')])
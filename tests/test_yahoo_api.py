@@ -0,0 +1,73 @@
+from yahoo_api import YahooApi
+import gzip
+import http.server
+import json
+import threading
+import unittest
+import urllib.parse
+
+
+class StubYahooApiHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def respond(self, params):
+        server = self.server
+        server.requests.append((self.command, self.path, params, self.client_address))
+        if server.failures:
+            server.failures -= 1
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        body = gzip.compress(json.dumps({'query': params['query'][0]}).encode('UTF-8'))
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.respond(urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query))
+
+    def do_POST(self):
+        length = int(self.headers['Content-Length'])
+        self.respond(urllib.parse.parse_qs(self.rfile.read(length).decode('UTF-8')))
+
+
+class YahooApiTest(unittest.TestCase):
+    def setUp(self):
+        self.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), StubYahooApiHandler)
+        self.server.requests = []
+        self.server.failures = 0
+        self.url = 'http://127.0.0.1:%d/search' % self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+        self.yapi = YahooApi('appid', backoff_factor=0)
+
+    def tearDown(self):
+        self.yapi.session.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def test_keep_alive(self):
+        self.assertEqual({'query': '長門'}, self.yapi.api(self.url, {'query': '長門'}))
+        self.assertEqual({'query': '有希'}, self.yapi.api(self.url, {'query': '有希'}, 'POST'))
+        self.assertEqual(['GET', 'POST'], [request[0] for request in self.server.requests])
+        self.assertEqual(['appid', 'appid'], [request[2]['appid'][0] for request in self.server.requests])
+        # Both requests are sent over the same connection.
+        self.assertEqual(1, len(set(request[3] for request in self.server.requests)))
+
+    def test_retry(self):
+        self.server.failures = 2
+        self.assertEqual({'query': '長門'}, self.yapi.api(self.url, {'query': '長門'}))
+        self.assertEqual(3, len(self.server.requests))
+
+        self.server.failures = 4
+        with self.assertRaises(IOError):
+            self.yapi.api(self.url, {'query': '長門'})
@@ -0,0 +1,76 @@
+"""
+A text normalization pipeline which prepares statuses for key phrase extraction.
+Statuses are streamed through generators and each of them is scanned once by a compiled regular expression.
+"""
+
+import html
+import re
+
+# Elements which are not a part of sentences.
+# Mastodon wraps mentions, hashtags and links in anchors whose texts are split by spans,
+# so anchors are removed as a whole before other HTML tags.
+# The lookahead skips most characters without trying every alternative.
+NOISE_RE = re.compile(r'''
+    (?=[<@#＃A-Za-z])
+    (?:
+        <a\b[^>]*>.*?</a>
+        | <[^>]*>
+        | \b[A-Za-z][A-Za-z0-9+.-]*://\S+
+        | (?<![\w@])@[A-Za-z0-9_]+(?:@[A-Za-z0-9.-]+)?:?
+        | (?<!\w)[#＃]\w+
+        | (?<!\S)RT(?=[\s:])
+    )
+''', re.VERBOSE | re.DOTALL)
+
+
+def normalize_text(text):
+    """
+    Removes HTML tags, mentions, URLs, hashtags and retweet markers from the text,
+    decodes HTML entities and collapses whitespaces.
+    """
+
+    text = NOISE_RE.sub(' ', text)
+    if '&' in text:
+        text = html.unescape(text)
+    return ' '.join(text.split())
+
+
+def iter_normalized_texts(texts, dedupe=True, normalizes=True):
+    """
+    Yields non-empty normalized texts in order
+    skipping ones which are the same as a preceding one if dedupe is True.
+    Texts are yielded as they are if normalizes is False, such as ones already normalized.
+    """
+
+    seen_texts = set()
+    for text in texts:
+        if normalizes:
+            text = normalize_text(text)
+        if not text:
+            continue
+        if dedupe:
+            if text in seen_texts:
+                continue
+            seen_texts.add(text)
+        yield text
+
+
+def prepare_text(texts, max_bytes=None, separator='\n', dedupe=True, normalizes=True):
+    """
+    Joins normalized texts with the separator up to max_bytes bytes in UTF-8 if specified.
+    Texts after the budget is exhausted are not even normalized.
+    """
+
+    prepared_texts = []
+    size = 0
+    separator_size = len(separator.encode('UTF-8'))
+    for text in iter_normalized_texts(texts, dedupe, normalizes):
+        text_size = len(text.encode('UTF-8')) + (separator_size if prepared_texts else 0)
+        if max_bytes is not None and size + text_size > max_bytes:
+            if not prepared_texts:
+                # Truncate the first text at a character boundary rather than returning nothing.
+                prepared_texts.append(text.encode('UTF-8')[:max_bytes].decode('UTF-8', 'ignore'))
+            break
+        prepared_texts.append(text)
+        size += text_size
+    return separator.join(prepared_texts)
@@ -0,0 +1,91 @@
+import time
+
+
+class TimelineSpeedEstimator:
+    """
+    A streaming estimator of the timeline speed
+    which counts statuses in per-minute buckets within a sliding window.
+    """
+
+    def __init__(self, window=24 * 60):
+        """
+        Initializes a new instance with a window in minutes.
+        """
+
+        self.window = window
+        # Counts of statuses keyed by minutes since the epoch.
+        self.buckets = {}
+        # The first minute since when all the statuses have been counted.
+        self.first_minute = None
+        self.last_id = None
+        # The time of the last update in seconds since the epoch.
+        self.updated_at = None
+
+    @classmethod
+    def from_dict(cls, state, window=24 * 60):
+        estimator = cls(window)
+        if state:
+            estimator.buckets = {int(minute): count for (minute, count) in state['buckets'].items()}
+            estimator.first_minute = state['first_minute']
+            estimator.last_id = state['last_id']
+            estimator.updated_at = state.get('updated_at')
+        return estimator
+
+    def to_dict(self):
+        return {
+            'buckets': {str(minute): count for (minute, count) in self.buckets.items()},
+            'first_minute': self.first_minute,
+            'last_id': self.last_id,
+            'updated_at': self.updated_at,
+        }
+
+    def is_empty(self):
+        return self.last_id is None
+
+    def is_stale(self, max_age, now=None):
+        """
+        Returns true if the estimator has not been updated for max_age seconds.
+        """
+
+        if self.is_empty() or self.updated_at is None:
+            return True
+        return (time.time() if now is None else now) - self.updated_at > max_age
+
+    def update(self, statuses, contiguous=True, now=None):
+        """
+        Counts the specified new statuses.
+        If they may not be contiguous with statuses counted before,
+        counting restarts from the oldest one of them.
+        """
+
+        self.updated_at = time.time() if now is None else now
+        if not statuses:
+            return
+
+        minutes = [int(status.created_at.timestamp() // 60) for status in statuses]
+        if not contiguous or self.first_minute is None:
+            self.buckets = {}
+            self.first_minute = min(minutes)
+        for minute in minutes:
+            self.buckets[minute] = self.buckets.get(minute, 0) + 1
+        self.last_id = max(status.id for status in statuses)
+        self.evict(now)
+
+    def evict(self, now=None):
+        current_minute = int((time.time() if now is None else now) // 60)
+        self.buckets = {
+            minute: count for (minute, count) in self.buckets.items()
+            if current_minute - self.window < minute}
+
+    def get_speed(self, now=None):
+        """
+        Gets the number of statuses per hour within the window.
+        """
+
+        if self.first_minute is None:
+            return 0
+        current_minute = int((time.time() if now is None else now) // 60)
+        count = sum(count for (minute, count) in self.buckets.items()
+                    if current_minute - self.window < minute <= current_minute)
+        minutes = min(max(current_minute - self.first_minute + 1, 1), self.window)
+        return count * 60 / minutes
@@ -1,26 +1,47 @@
-import json
-import urllib.parse
-import urllib.request
+import requests
+import requests.adapters
+import urllib3.util.retry
 
 
 class YahooApi:
-    def __init__(self, appid):
+    def __init__(
+            self,
+            appid,
+            connect_timeout=3.05,
+            read_timeout=10,
+            retries=3,
+            backoff_factor=0.5,
+            pool_maxsize=10):
+        """
+        Initializes a new instance with a session which keeps persistent connections per host.
+        Requests are retried with an exponential backoff on connection errors, timeouts and 5xx errors.
+        """
+
         self.appid = appid
+        self.timeout = (connect_timeout, read_timeout)
+        retry = urllib3.util.retry.Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset(['GET', 'POST']))
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=pool_maxsize, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
 
     def api(self, apiurl, params, method='GET'):
         params['appid'] = self.appid
-        params = urllib.parse.urlencode(params, encoding='UTF-8')
         if method == 'GET':
-            response = urllib.request.urlopen("%s?%s" % (apiurl, params))
+            response = self.session.get(apiurl, params=params, timeout=self.timeout)
         elif method == 'POST':
-            # Encode the query string to bytes
-            params = params.encode('UTF-8')
-            response = urllib.request.urlopen(apiurl, params)
+            response = self.session.post(apiurl, data=params, timeout=self.timeout)
         else:
             raise NotImplementedError('Method %s is not supported.' % method)
 
-        response = response.read().decode('UTF-8')
-        response = json.loads(response)
+        # Responses are decoded from gzip by the session if compressed.
+        response.raise_for_status()
+        response.encoding = 'UTF-8'
+        response = response.json()
 
         # Handle errors
         if not isinstance(response, type({})):